@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+bench_archive_index.py — archive_index.py: sync cost and duplicate lookups
+==========================================================================
+For each archive size N, generates N synthetic articles and times:
+
+- cold:     building site/archive_index.json from nothing (every file read)
+- warm:     loading it and syncing an unchanged folder (one directory scan)
+- checkout: the same after every mtime changed, as on a fresh git checkout
+- rehash:   what skipping the index costs: sha256 of every archive file
+
+then checks --probes attachments against the index — exact copies of
+archive files under new names, the same articles re-zipped (different
+bytes, same text), and new articles — and reports the time per lookup
+(hashing + text extraction of the attachment itself; the index part is a
+dict hit) and whether each came back as bytes / text / no match as
+expected. Any wrong answer makes the exit code 1.
+
+  python3 bench/bench_archive_index.py --sizes 100 1000 5000 --probes 300
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from synth_corpus import generate, synth_article, write_docx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from archive_index import ArchiveIndex
+
+
+def rezip(data: bytes) -> bytes:
+    # Same parts, stored instead of deflated: what a re-save does to the bytes, not the text
+    out = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(data)) as src, zipfile.ZipFile(out, "w", zipfile.ZIP_STORED) as dst:
+        for info in src.infolist():
+            dst.writestr(info.filename, src.read(info))
+    return out.getvalue()
+
+
+def probes(paths: list, count: int, seed: int) -> list:
+    """
+    [(attachment bytes, expected "bytes" | "text" | None), ...], a third of each.
+    """
+    rng = random.Random(seed)
+    out = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            out.append((rng.choice(paths).read_bytes(), "bytes"))
+        elif kind == 1:
+            out.append((rezip(rng.choice(paths).read_bytes()), "text"))
+        else:
+            _, paragraphs = synth_article(rng, 10**6 + i)
+            buf = io.BytesIO()
+            write_docx(buf, paragraphs)
+            out.append((buf.getvalue(), None))
+    return out
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    ap.add_argument("--probes", type=int, default=300)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    bad = 0
+    print(f"{'N':>6} {'cold s':>8} {'warm s':>8} {'checkout s':>11} {'rehash s':>9} {'lookup ms':>10} "
+          f"{'bytes/text/new hits':>20}")
+    for n in args.sizes:
+        tmp = Path(tempfile.mkdtemp(prefix="kidder-index-"))
+        try:
+            folder, path = tmp / "archive", tmp / "site" / "archive_index.json"
+            paths = generate(folder, n, args.seed)
+
+            def cold():
+                index = ArchiveIndex(path, folder)
+                index.sync()
+                index.save()
+
+            cold_s, _ = timed(cold)
+            warm_s, warm = timed(lambda: ArchiveIndex(path, folder).sync())
+            now = time.time()
+            for p in paths:
+                os.utime(p, (now + 60, now + 60))
+            checkout_s, checkout = timed(lambda: ArchiveIndex(path, folder).sync())
+            rehash_s, _ = timed(lambda: [hashlib.sha256(p.read_bytes()).hexdigest() for p in paths])
+            if warm["hashed"] or checkout["hashed"]:
+                print(f"  unexpected rehash: warm {warm}, checkout {checkout}")
+                bad += 1
+
+            index = ArchiveIndex(path, folder)
+            index.sync()
+            cases = probes(paths, args.probes, args.seed)
+            counts = {"bytes": 0, "text": 0, None: 0}
+            t0 = time.perf_counter()
+            for data, expected in cases:
+                _, how, _ = index.match(data)
+                counts[how] += 1
+                bad += how != expected
+            lookup_ms = (time.perf_counter() - t0) * 1000 / max(1, len(cases))
+            print(f"{n:>6} {cold_s:>8.2f} {warm_s:>8.3f} {checkout_s:>11.3f} {rehash_s:>9.3f} {lookup_ms:>10.2f} "
+                  f"{counts['bytes']:>8}/{counts['text']}/{counts[None]}")
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    print("All lookups as expected." if not bad else f"{bad} unexpected result(s).")
+    sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
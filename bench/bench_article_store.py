@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+bench_article_store.py — linear-scan upserts vs ArticleStore
+============================================================
+For each archive size N, builds N synthetic articles, then times:
+- load:   building the store (old path: the sourceFile dedup dict)
+- upsert: re-processing `--updates` existing articles + the same number of new ones
+- export: sorted export
+
+The linear path is the pre-ArticleStore loop in process_articles.main()
+(scan the list for a matching sourceFile, then replace or append).
+
+  python3 bench/bench_article_store.py --sizes 100 10000 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from article_store import ArticleStore
+
+
+def synth_article(i: int) -> dict:
+    return {
+        "sourceFile": f"Synthetic Article {i:06d} (2025-01-01).docx",
+        "title": f"Synthetic Article {i}",
+        "date": f"20{10 + i % 16:02d}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+        "summary": "A synthetic summary.",
+        "topics": ["Local"],
+        "wordCount": 700,
+        "text": f"Synthetic Article {i}\nLocal Commentaries\nbody text {i} " * 20,
+    }
+
+
+def linear_upsert(articles: list, article: dict):
+    existing_entry = None
+    for idx_a, a in enumerate(articles):
+        if a.get("sourceFile") == article["sourceFile"]:
+            existing_entry = idx_a
+            break
+    if existing_entry is None:
+        articles.append(article)
+    else:
+        articles[existing_entry] = article
+
+
+def linear_export(articles: list) -> list:
+    dedup = {}
+    for a in articles:
+        sf = a.get("sourceFile")
+        if sf:
+            dedup[sf] = a
+    return sorted(dedup.values(), key=lambda x: (x.get("date") or "", x.get("title") or ""), reverse=True)
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 100000])
+    ap.add_argument("--updates", type=int, default=500, help="Existing articles re-upserted per size (same number added)")
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'N':>8} {'impl':<8} {'load ms':>9} {'upsert us/op':>13} {'export ms':>10}")
+    for n in args.sizes:
+        base = [synth_article(i) for i in range(n)]
+        k = min(args.updates, n)
+        touched = [dict(base[i]) for i in rng.sample(range(n), k)] + [synth_article(n + j) for j in range(k)]
+
+        articles, t_load = timed(lambda: list(base))
+        _, t_up = timed(lambda: [linear_upsert(articles, a) for a in touched])
+        _, t_exp = timed(lambda: linear_export(articles))
+        print(f"{n:>8} {'linear':<8} {t_load * 1e3:>9.2f} {t_up / len(touched) * 1e6:>13.1f} {t_exp * 1e3:>10.2f}")
+
+        store, t_load = timed(lambda: ArticleStore(base))
+        _, t_up = timed(lambda: [store.upsert(a) for a in touched])
+        _, t_exp = timed(store.export)
+        print(f"{n:>8} {'store':<8} {t_load * 1e3:>9.2f} {t_up / len(touched) * 1e6:>13.1f} {t_exp * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
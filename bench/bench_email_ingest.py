@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+bench_email_ingest.py — email_ingest.py against the local IMAP stand-in
+=======================================================================
+Loads bench/fake_imap.py with --messages synthetic mails (columns with
+signatures, photos and second attachments, forwarded columns, newsletters
+without any .docx), then ingests the UNSEEN backlog once per implementation,
+each on a fresh mailbox:
+
+- rfc822:        the original loop, one FETCH (RFC822) per message (the
+                 whole mail) plus a STORE per message with a .docx
+- per-message:   BODYSTRUCTURE + Subject/From, then only the .docx
+                 sections, then a STORE, message by message
+- batched:       email_ingest.ingest() — the same fetches as UID FETCH over
+                 message sets (--batch messages each) and one UID STORE
+
+and reports bytes sent by the server, IMAP commands, wall time, and both per
+message. The saved files must match byte for byte (exit code 1 otherwise).
+The stand-in's --latency and --mbps model the round trip and the link.
+
+  python3 bench/bench_email_ingest.py --messages 200 --latency 0.02 --mbps 50
+"""
+
+import argparse
+import contextlib
+import email
+import imaplib
+import io
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from fake_imap import start_server, synth_mailbox
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO / "scripts"))
+
+from email_ingest import HEADERS, decode_mime_words, ingest, safe_filename, unique_target
+from imap_fetch import decode_part, docx_parts, parse_fetch
+
+
+def old_ingest(M, ids: list, out_dir: Path) -> list:
+    # The pre-BODYSTRUCTURE loop from email_ingest.main(), verbatim apart from the return value
+    saved = []
+    for msg_id in ids:
+        typ, msg_data = M.fetch(msg_id, "(RFC822)")
+        if typ != "OK":
+            continue
+
+        raw = msg_data[0][1]
+        msg = email.message_from_bytes(raw)
+
+        subj = decode_mime_words(msg.get("Subject", "") or "")
+        sender = decode_mime_words(msg.get("From", "") or "")
+
+        saved_this_msg = False
+
+        for part in msg.walk():
+            cdisp = part.get("Content-Disposition", "") or ""
+            if "attachment" not in cdisp.lower():
+                continue
+
+            filename = part.get_filename()
+            if not filename:
+                continue
+            filename = decode_mime_words(filename)
+
+            if not filename.lower().endswith(".docx"):
+                continue
+
+            payload = part.get_payload(decode=True)
+            if not payload:
+                continue
+
+            clean = safe_filename(Path(filename).name)
+            target = out_dir / clean
+
+            if target.exists():
+                stem = target.stem
+                suffix = target.suffix
+                n = 2
+                while True:
+                    alt = out_dir / f"{stem} ({n}){suffix}"
+                    if not alt.exists():
+                        target = alt
+                        break
+                    n += 1
+
+            target.write_bytes(payload)
+            print(f"Email: {subj}")
+            print(f"From:  {sender}")
+            print(f"  Saved: {target}")
+            saved.append(target)
+            saved_this_msg = True
+
+        if saved_this_msg:
+            M.store(msg_id, "+FLAGS", "\\Seen")
+    return saved
+
+
+def fetch_docx(M, msg_id: bytes):
+    # The per-message BODYSTRUCTURE fetch email_ingest.py had before batching, verbatim
+    typ, data = M.fetch(msg_id, f"(BODYSTRUCTURE {HEADERS})")
+    if typ != "OK":
+        return None
+    items = parse_fetch(data).get(int(msg_id), {})
+    header = next((v for k, v in items.items() if k.startswith("BODY[HEADER")), None) or b""
+    msg = email.message_from_bytes(header if isinstance(header, bytes) else header.encode("utf-8"))
+    subj = decode_mime_words(msg.get("Subject", "") or "")
+    sender = decode_mime_words(msg.get("From", "") or "")
+
+    parts = docx_parts(items.get("BODYSTRUCTURE"))
+    if not parts:
+        return subj, sender, []
+    typ, data = M.fetch(msg_id, "(" + " ".join(f"BODY.PEEK[{p['section']}]" for p in parts) + ")")
+    if typ != "OK":
+        return None
+    bodies = parse_fetch(data).get(int(msg_id), {})
+    return subj, sender, [(p["filename"], decode_part(bodies.get(f"BODY[{p['section']}]"), p["encoding"]))
+                          for p in parts]
+
+
+def per_message_ingest(M, ids: list, out_dir: Path) -> list:
+    saved = []
+    for msg_id in ids:
+        got = fetch_docx(M, msg_id)
+        if got is None:
+            continue
+        subj, sender, attachments = got
+
+        for filename, payload in attachments:
+            if not payload:
+                continue
+            target = unique_target(out_dir, safe_filename(Path(filename).name))
+            target.write_bytes(payload)
+            print(f"Email: {subj}")
+            print(f"From:  {sender}")
+            print(f"  Saved: {target}")
+            saved.append(target)
+
+        M.store(msg_id, "+FLAGS", "\\Seen")
+    return saved
+
+
+def batched_ingest(M, ids: list, out_dir: Path, batch: int = 200) -> list:
+    return ingest(M, [int(i) for i in ids], out_dir, batch)[0]
+
+
+def run_impl(name: str, fn, mails: list, out_dir: Path, args) -> dict:
+    server, port, stats, box = start_server(mails, latency=args.latency, mbps=args.mbps)
+    try:
+        M = imaplib.IMAP4("127.0.0.1", port)
+        M.login("bench", "bench")
+        M.select("INBOX")
+        # The stand-in numbers UIDs 1..N, so sequence numbers and UIDs coincide
+        _, data = M.search(None, "UNSEEN")
+        ids = data[0].split()
+        with stats["lock"]:
+            out0, cmd0 = stats["bytesOut"], stats["commands"]
+        out_dir.mkdir(parents=True)
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            saved = fn(M, ids, out_dir)
+        wall = time.perf_counter() - t0
+        with stats["lock"]:
+            sent, commands = stats["bytesOut"] - out0, stats["commands"] - cmd0
+        M.logout()
+        unseen = sum(1 for m in box.messages if "\\Seen" not in m["flags"])
+    finally:
+        server.shutdown()
+        server.server_close()
+    n = max(1, len(ids))
+    return {"impl": name, "messages": len(ids), "saved": len(saved), "bytes": sent, "commands": commands,
+            "seconds": round(wall, 3), "bytesPerMessage": sent // n, "msPerMessage": round(wall * 1000 / n, 2),
+            "leftUnseen": unseen}
+
+
+def saved_files(folder: Path) -> dict:
+    return {p.name: p.read_bytes() for p in folder.glob("*.docx")}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--latency", type=float, default=0.02, help="Stand-in delay per command (seconds)")
+    ap.add_argument("--mbps", type=float, default=50, help="Stand-in download cap in Mbit/s (0 = none)")
+    ap.add_argument("--batch", type=int, default=200, help="email_ingest.py --batch")
+    ap.add_argument("--out", default="", help="Results JSON (default: bench/results/email-ingest-<timestamp>.json)")
+    args = ap.parse_args()
+
+    out_path = Path(args.out) if args.out else (
+        REPO / "bench" / "results" / f"email-ingest-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+
+    mails = synth_mailbox(args.messages, args.seed)
+    total = sum(map(len, mails))
+    print(f"{len(mails)} mails, {total / 2**20:.1f} MB in the mailbox; latency {args.latency}s, "
+          f"{args.mbps or 'uncapped'} Mbit/s")
+
+    tmp = Path(tempfile.mkdtemp(prefix="kidder-imap-"))
+    results = []
+    try:
+        impls = (("rfc822", old_ingest), ("per-message", per_message_ingest),
+                 ("batched", lambda M, ids, out: batched_ingest(M, ids, out, args.batch)))
+        for name, fn in impls:
+            r = run_impl(name, fn, mails, tmp / name, args)
+            results.append(r)
+            print(f"  {name:<12} {r['bytes'] / 2**20:8.2f} MB  {r['commands']:>5} cmds  {r['seconds']:7.2f}s   "
+                  f"per message: {r['bytesPerMessage'] / 1024:8.1f} KB {r['msPerMessage']:8.1f} ms   "
+                  f"saved={r['saved']} left unseen={r['leftUnseen']}")
+        reference = saved_files(tmp / "rfc822")
+        same = all(saved_files(tmp / name) == reference for name, _ in impls[1:])
+        print(f"Saved files identical: {same}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps({
+        "createdAt": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"messages": args.messages, "seed": args.seed, "latency": args.latency, "mbps": args.mbps,
+                   "batch": args.batch, "mailboxBytes": total},
+        "results": results,
+        "identical": same,
+    }, indent=2), encoding="utf-8")
+    print(f"Results: {out_path}")
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
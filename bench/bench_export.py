@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+bench_export.py — data.json export: one json.dumps string vs streamed
+=====================================================================
+For each archive size N, writes N synthetic articles (~4 KB of text each) as
+data.json twice — once fresh, once again unchanged (the change check) — with:
+
+- dumps:  write_json_if_changed(), the whole payload as one string
+- stream: write_json_stream(), one article at a time
+
+Each (impl, N) runs in its own process, so "peak RSS" is that process's whole
+footprint. Articles come from a generator for the streamed export (as from the
+--db cursor); the dumps path needs the full list. "export peak" is the
+tracemalloc peak during the two writes alone, on top of whatever was live
+(measured in a second, untimed pass).
+
+  python3 bench/bench_export.py --sizes 1000 10000 30000
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from atomic_io import write_json_if_changed
+from json_stream import peak_rss_bytes, write_json_stream
+
+WORDS = "council village budget lake road school county water library bridge".split()
+# Prebuilt so generating an article costs next to nothing next to encoding it
+BODIES = [" ".join(WORDS[(r + k) % len(WORDS)] for k in range(600)) for r in range(len(WORDS))]
+
+
+def synth_article(i: int) -> dict:
+    body = BODIES[i % len(BODIES)]
+    return {
+        "sourceFile": f"Synthetic Article {i:06d} (2025-01-01).docx",
+        "title": f"Synthetic Article {i}",
+        "date": f"20{10 + i % 16:02d}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+        "dateISO": f"20{10 + i % 16:02d}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+        "dateSource": "filename",
+        "summary": "A synthetic summary of a synthetic article.",
+        "topics": ["Local", "Government"],
+        "wordCount": 600,
+        "text": f"Synthetic Article {i}\n{body}",
+        "updatedAt": "2026-01-01T00:00:00",
+    }
+
+
+def run_one(impl: str, n: int, out: Path) -> dict:
+    # Not in export order; the order makes no difference to the cost
+    gen = lambda: (synth_article(i) for i in range(n))
+    articles = list(gen()) if impl == "dumps" else None
+
+    def write_twice():
+        size = 0
+        for generated_at in ("2026-01-01T00:00:00", "2026-01-02T00:00:00"):
+            if impl == "dumps":
+                write_json_if_changed(out, {"generatedAt": generated_at, "articles": articles, "errors": []})
+                size = out.stat().st_size
+            else:
+                size = write_json_stream(out, {"generatedAt": generated_at}, "articles", gen(), {"errors": []})["bytes"]
+        out.unlink()
+        return size
+
+    # Timed without tracemalloc (it slows small allocations down a lot), then traced
+    t0 = time.perf_counter()
+    size = write_twice()
+    wall = time.perf_counter() - t0
+    tracemalloc.start()
+    write_twice()
+    _, export_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"bytes": size, "seconds": wall, "exportPeak": export_peak, "peakRss": peak_rss_bytes()}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 30000])
+    ap.add_argument("--one", nargs=2, metavar=("IMPL", "N"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.one:
+        with tempfile.TemporaryDirectory(prefix="kidder-export-") as tmp:
+            print(json.dumps(run_one(args.one[0], int(args.one[1]), Path(tmp) / "data.json")))
+        return
+
+    print(f"{'N':>7} {'impl':<7} {'MB out':>8} {'2 writes s':>11} {'export peak MB':>15} {'peak RSS MB':>12}")
+    for n in args.sizes:
+        for impl in ("dumps", "stream"):
+            proc = subprocess.run([sys.executable, __file__, "--one", impl, str(n)],
+                                  capture_output=True, text=True, check=True)
+            r = json.loads(proc.stdout)
+            print(f"{n:>7} {impl:<7} {r['bytes'] / 2**20:>8.1f} {r['seconds']:>11.2f} "
+                  f"{r['exportPeak'] / 2**20:>15.1f} {r['peakRss'] / 2**20:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+bench_extractors.py — files/sec and peak memory for each .docx extractor
+========================================================================
+Each extractor runs in its own fresh interpreter over the same files, so
+peak RSS is not polluted by the others. "extra RSS" is peak RSS minus the
+RSS right after imports, i.e. what extraction itself costs. Pandoc's own
+memory is reported separately (peak RSS of the largest pandoc child).
+Without a pandoc binary on PATH its row says so instead of timing failures.
+
+  python3 bench/bench_extractors.py --folder KIDDER_ARTICLE_ARCHIVES --repeat 3
+"""
+
+import argparse
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO / "scripts"))
+
+
+def run_worker(name: str, folder: Path, repeat: int):
+    from process_articles import EXTRACTORS, normalize_text
+
+    fn = EXTRACTORS[name]
+    files = sorted(folder.glob("*.docx"))
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    ok = 0
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for p in files:
+            if normalize_text(fn(p)):
+                ok += 1
+    dt = time.perf_counter() - t0
+    n = len(files) * repeat
+    print(json.dumps({
+        "extractor": name,
+        "files": n,
+        "nonEmpty": ok,
+        "seconds": round(dt, 3),
+        "filesPerSec": round(n / dt, 1) if dt else 0.0,
+        "peakRssKB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "extraRssKB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss,
+        "childPeakRssKB": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss if ok else 0,
+    }))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--folder", default=str(REPO / "KIDDER_ARTICLE_ARCHIVES"))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--extractors", nargs="+", default=["native", "pandoc", "python-docx"])
+    ap.add_argument("--worker", default="", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, Path(args.folder), args.repeat)
+        return
+
+    print(f"{'extractor':<12} {'files/s':>9} {'peak RSS':>10} {'extra RSS':>10} {'pandoc RSS':>11} {'non-empty':>10}")
+    for name in args.extractors:
+        if name == "pandoc" and shutil.which("pandoc") is None:
+            print(f"{name:<12} unavailable: pandoc not found on PATH")
+            continue
+        res = subprocess.run(
+            [sys.executable, __file__, "--worker", name, "--folder", args.folder, "--repeat", str(args.repeat)],
+            capture_output=True, text=True, check=False,
+        )
+        if res.returncode != 0:
+            print(f"{name:<12} failed: {res.stderr.strip().splitlines()[-1:]}")
+            continue
+        r = json.loads(res.stdout.strip().splitlines()[-1])
+        child = f"{r['childPeakRssKB'] / 1024:.1f} MB" if r["childPeakRssKB"] else "-"
+        print(f"{name:<12} {r['filesPerSec']:>9.1f} {r['peakRssKB'] / 1024:>7.1f} MB "
+              f"{r['extraRssKB'] / 1024:>7.1f} MB {child:>11} "
+              f"{r['nonEmpty']:>4}/{r['files']}")
+
+
+if __name__ == "__main__":
+    main()
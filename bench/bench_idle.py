@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+bench_idle.py — email arrival to updated data.json with email_ingest.py --idle
+==============================================================================
+Starts the fake IMAP server (empty INBOX, hanging up on clients that idle
+longer than --idle-drop seconds, to exercise reconnects) and the fake OpenAI
+endpoint, then runs
+
+  email_ingest.py --idle --process --process-args "--output ... "
+
+against them and delivers --mails columns (each with a different archive
+.docx) --gap seconds apart. For every mail it records how long until
+
+- saved:     the .docx is in the archive folder
+- published: data.json holds one more article
+
+and reports p50 / max of both, the daemon's reconnects and the server's idle
+drops. (With the cron in kidder_autopublish.yml the same wait is up to two
+hours.)
+
+  python3 bench/bench_idle.py --mails 10 --gap 2 --idle-drop 5
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from email.policy import SMTP
+from pathlib import Path
+
+from fake_imap import REPO, _docx_pool, column_mail, start_server
+from fake_openai import start_server as start_openai
+
+SCRIPTS = REPO / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+from run_profile import percentile
+
+
+def article_count(path: Path) -> int:
+    try:
+        return len(json.loads(path.read_text(encoding="utf-8")).get("articles", []))
+    except (OSError, ValueError):
+        return 0
+
+
+def wait_for(check, timeout: float, step: float = 0.02):
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout:
+        if check():
+            return time.perf_counter()
+        time.sleep(step)
+    return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mails", type=int, default=10)
+    ap.add_argument("--gap", type=float, default=2.0, help="Seconds between deliveries")
+    ap.add_argument("--idle-drop", type=float, default=5.0, help="Server hangs up on clients idling this long")
+    ap.add_argument("--llm-latency", type=float, default=0.2, help="Fake OpenAI latency per request")
+    ap.add_argument("--timeout", type=float, default=60.0, help="Give up on a mail after this many seconds")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="", help="Results JSON (default: bench/results/idle-<timestamp>.json)")
+    args = ap.parse_args()
+
+    out_path = Path(args.out) if args.out else (
+        REPO / "bench" / "results" / f"idle-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+
+    rng = random.Random(args.seed)
+    pool = _docx_pool(rng, REPO / "KIDDER_ARTICLE_ARCHIVES")
+    picks = rng.sample(pool, min(args.mails, len(pool)))
+    mails = [column_mail(rng, i, [pick]).as_bytes(policy=SMTP) for i, pick in enumerate(picks)]
+
+    imap, port, stats, box = start_server([], idle_drop=args.idle_drop)
+    api, base_url, _ = start_openai(latency=args.llm_latency)
+    tmp = Path(tempfile.mkdtemp(prefix="kidder-idle-"))
+    archive, output = tmp / "archive", tmp / "site" / "data.json"
+    env = dict(os.environ, OPENAI_BASE_URL=base_url, OPENAI_API_KEY="fake",
+               KIDDER_GMAIL_USER="bench", KIDDER_GMAIL_APP_PASSWORD="bench")
+    process_args = (f"--output {output} --missing-csv {tmp / 'missing.csv'} "
+                    f"--extract-cache {tmp / 'extract-cache'} --llm-cache {tmp / 'llm_cache.json'}")
+    daemon = subprocess.Popen(
+        [sys.executable, str(SCRIPTS / "email_ingest.py"), "--idle", "--no-ssl", "--imap-host", "127.0.0.1",
+         "--imap-port", str(port), "--folder", str(archive), "--idle-timeout", "30",
+         "--process", "--process-args", process_args],
+        cwd=tmp, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+
+    results = []
+    try:
+        # The daemon is up once it is idling on the (empty) mailbox
+        wait_for(lambda: stats["byCommand"].get("IDLE", 0) > 0, 30)
+        print(f"{len(mails)} mails, {args.gap}s apart; server drops idlers after {args.idle_drop}s; "
+              f"fake LLM latency {args.llm_latency}s")
+        for i, raw in enumerate(mails):
+            time.sleep(args.gap)
+            t0 = time.perf_counter()
+            box.deliver(raw)
+            saved = wait_for(lambda: len(list(archive.glob("*.docx"))) > i, args.timeout)
+            published = wait_for(lambda: article_count(output) > i, args.timeout)
+            r = {"mail": i + 1,
+                 "savedSeconds": round(saved - t0, 3) if saved else None,
+                 "publishedSeconds": round(published - t0, 3) if published else None}
+            results.append(r)
+            print(f"  mail {i + 1:>3}: saved after {r['savedSeconds']}s, in data.json after {r['publishedSeconds']}s")
+    finally:
+        daemon.send_signal(signal.SIGINT)
+        try:
+            log, _ = daemon.communicate(timeout=30)
+        except subprocess.TimeoutExpired:
+            daemon.kill()
+            log, _ = daemon.communicate()
+        imap.shutdown()
+        api.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    saved = [r["savedSeconds"] for r in results if r["savedSeconds"] is not None]
+    published = [r["publishedSeconds"] for r in results if r["publishedSeconds"] is not None]
+    reconnects = sum(1 for line in log.splitlines() if "reconnecting" in line)
+    summary = {
+        "saved": {"p50": percentile(saved, 50), "max": max(saved, default=0.0), "count": len(saved)},
+        "published": {"p50": percentile(published, 50), "max": max(published, default=0.0),
+                      "count": len(published)},
+        "reconnects": reconnects,
+        "idleDrops": stats["idleDrops"],
+    }
+    print(f"Saved:     p50 {summary['saved']['p50']:.2f}s  max {summary['saved']['max']:.2f}s  "
+          f"({len(saved)}/{len(results)})")
+    print(f"Published: p50 {summary['published']['p50']:.2f}s  max {summary['published']['max']:.2f}s  "
+          f"({len(published)}/{len(results)})")
+    print(f"Server idle drops {stats['idleDrops']}, daemon reconnects {reconnects}")
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps({
+        "createdAt": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"mails": len(mails), "gap": args.gap, "idleDrop": args.idle_drop,
+                   "llmLatency": args.llm_latency},
+        "summary": summary,
+        "results": results,
+    }, indent=2), encoding="utf-8")
+    print(f"Results: {out_path}")
+    sys.exit(0 if len(published) == len(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
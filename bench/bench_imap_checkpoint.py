@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+bench_imap_checkpoint.py — email_ingest.py polls: UNSEEN search vs UID checkpoint
+=================================================================================
+Runs email_ingest.poll() against the local IMAP stand-in the way the cron
+job does (connect, SELECT, poll, logout), once per mode:
+
+- unseen:     --no-checkpoint, UID SEARCH UNSEEN over the whole mailbox
+- checkpoint: site/imap_checkpoint.json, UID SEARCH UID n+1:* (nothing at
+              all when SELECT's UIDNEXT shows no new mail)
+
+Scale: for each mailbox size N (already-ingested mail, all \\Seen) it times
+a quiet poll (nothing new) and a poll with one new column, and reports IMAP
+commands, bytes both ways and wall time. The stand-in resolves UID ranges
+through its UID order, as servers do, and tests flags message by message.
+
+Scenarios (exit code 1 if any comes out wrong):
+
+- read-first:   three columns arrive, someone reads one in the mail client
+                before the poll; UNSEEN saves 2, the checkpoint 3
+- first-run:    no checkpoint yet; mail from earlier UNSEEN runs is \\Seen
+                and only the unread columns are ingested
+- uidvalidity:  the server renumbers the mailbox (new UIDVALIDITY) and one
+                column arrives; the full rescan saves only that one (the
+                rest are duplicates per site/archive_index.json)
+
+  python3 bench/bench_imap_checkpoint.py --sizes 1000 10000 50000 --latency 0.02
+"""
+
+import argparse
+import contextlib
+import imaplib
+import io
+import json
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from email.message import EmailMessage
+from email.policy import SMTP
+from pathlib import Path
+
+from fake_imap import REPO, _docx_pool, column_mail, start_server
+
+sys.path.insert(0, str(REPO / "scripts"))
+
+from archive_index import ArchiveIndex
+from email_ingest import poll, select
+from imap_checkpoint import Checkpoint
+
+
+def filler_mail(i: int) -> bytes:
+    msg = EmailMessage()
+    msg["From"] = "County News <news@example.com>"
+    msg["To"] = "Kidder Archive <kidder.archive@example.com>"
+    msg["Subject"] = f"Chautauqua County Newsletter #{i}"
+    msg.set_content("This week in the county: road work, the budget hearing and the school board.\n")
+    return msg.as_bytes(policy=SMTP)
+
+
+class Run:
+    """
+    One archive folder + index + checkpoint, polled against one stand-in server.
+    """
+
+    def __init__(self, tmp: Path, port: int, stats: dict, mode: str):
+        self.port, self.stats, self.mode = port, stats, mode
+        self.folder = tmp / "archive"
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.index = ArchiveIndex(tmp / "site" / "archive_index.json", self.folder)
+        self.checkpoint = Checkpoint(tmp / "site" / "imap_checkpoint.json") if mode == "checkpoint" else None
+        self.args = argparse.Namespace(imap_host="127.0.0.1", mailbox="INBOX", search="", batch=200,
+                                       batch_mb=32, keep_duplicates=False)
+
+    def _counters(self) -> tuple:
+        with self.stats["lock"]:
+            return (self.stats["commands"], self.stats["byCommand"].get("UID SEARCH", 0),
+                    self.stats["bytesOut"], self.stats["bytesIn"])
+
+    def poll(self) -> dict:
+        M = imaplib.IMAP4("127.0.0.1", self.port)
+        M.login("bench", "bench")
+        before = self._counters()
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()) as log:
+            selected = select(M, "INBOX")
+            saved = poll(M, self.args, self.folder, self.index, self.checkpoint, selected)
+        wall = time.perf_counter() - t0
+        after = self._counters()
+        M.logout()
+        commands, searches, sent, received = (a - b for a, b in zip(after, before))
+        return {"saved": len(saved or []), "commands": commands, "searches": searches, "bytesOut": sent,
+                "bytesIn": received, "seconds": round(wall, 4), "log": log.getvalue()}
+
+
+def scale(sizes: list, latency: float, pool: list, rng: random.Random, tmp: Path) -> list:
+    rows = []
+    print(f"{'N':>7} {'mode':<11} {'quiet: cmds':>11} {'bytes':>7} {'ms':>7}   "
+          f"{'new: cmds':>9} {'bytes':>7} {'ms':>7} {'saved':>5}")
+    for n in sizes:
+        for mode in ("unseen", "checkpoint"):
+            server, port, stats, box = start_server([filler_mail(i) for i in range(n)], latency=latency)
+            try:
+                for m in box.messages:
+                    m["flags"].add("\\Seen")
+                run = Run(tmp / f"{mode}-{n}", port, stats, mode)
+                if run.checkpoint is not None:
+                    run.checkpoint.advance("127.0.0.1/INBOX", box.uidvalidity, box.uidnext - 1)
+                quiet = run.poll()
+                box.deliver(column_mail(rng, n, [rng.choice(pool)]).as_bytes(policy=SMTP))
+                new = run.poll()
+            finally:
+                server.shutdown()
+                server.server_close()
+            row = {"messages": n, "mode": mode, "quiet": quiet, "new": new}
+            for r in (quiet, new):
+                r.pop("log")
+            rows.append(row)
+            print(f"{n:>7} {mode:<11} {quiet['commands']:>11} {quiet['bytesOut'] + quiet['bytesIn']:>7} "
+                  f"{quiet['seconds'] * 1000:>7.1f}   {new['commands']:>9} {new['bytesOut'] + new['bytesIn']:>7} "
+                  f"{new['seconds'] * 1000:>7.1f} {new['saved']:>5}")
+    return rows
+
+
+def scenarios(pool: list, rng: random.Random, tmp: Path) -> list:
+    picks = iter(rng.sample(pool, min(len(pool), 12)))
+
+    def column(i: int) -> bytes:
+        return column_mail(rng, i, [next(picks)]).as_bytes(policy=SMTP)
+
+    results = []
+
+    def check(name: str, got, expected):
+        results.append({"scenario": name, "got": got, "expected": expected, "ok": got == expected})
+        print(f"  {name:<34} got {got}, expected {expected}" + ("" if got == expected else "   <-- WRONG"))
+
+    # Someone reads a column in the mail client before the poll
+    mails = [column(i) for i in range(3)]
+    for mode in ("unseen", "checkpoint"):
+        server, port, stats, box = start_server([])
+        try:
+            run = Run(tmp / f"read-first-{mode}", port, stats, mode)
+            run.poll()
+            for raw in mails:
+                box.deliver(raw)
+            box.messages[1]["flags"].add("\\Seen")
+            check(f"read-first ({mode}): saved", run.poll()["saved"], 3 if mode == "checkpoint" else 2)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    # First run with a checkpoint: what the UNSEEN runs left is \Seen and already archived
+    server, port, stats, box = start_server([column(i) for i in range(3, 7)])
+    try:
+        old = Run(tmp / "first-run", port, stats, "unseen")
+        for m in box.messages[:2]:
+            m["flags"].add("\\Seen")
+        old.poll()
+        # UIDs 3 and 4 came in through an UNSEEN run; 1 and 2 are still unread
+        for m in box.messages[:2]:
+            m["flags"].discard("\\Seen")
+        run = Run(tmp / "first-run", port, stats, "checkpoint")
+        check("first-run: saved", run.poll()["saved"], 2)
+        check("first-run: checkpoint lastUid", run.checkpoint.last_uid("127.0.0.1/INBOX", box.uidvalidity), 4)
+        quiet = run.poll()
+        check("first-run: searches when quiet", quiet["searches"], 0)
+
+        # The server renumbers; a new column arrives with UID 5 under the new UIDVALIDITY
+        box.renumber(box.uidvalidity + 1)
+        box.deliver(column(7))
+        resync = run.poll()
+        check("uidvalidity: saved", resync["saved"], 1)
+        check("uidvalidity: duplicates skipped", resync["log"].count("skipped"), 4)
+        check("uidvalidity: checkpoint lastUid", run.checkpoint.last_uid("127.0.0.1/INBOX", box.uidvalidity), 5)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    ap.add_argument("--latency", type=float, default=0.02, help="Stand-in delay per command (seconds)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="", help="Results JSON (default: bench/results/imap-checkpoint-<timestamp>.json)")
+    args = ap.parse_args()
+
+    out_path = Path(args.out) if args.out else (
+        REPO / "bench" / "results" / f"imap-checkpoint-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+
+    rng = random.Random(args.seed)
+    pool = _docx_pool(rng, REPO / "KIDDER_ARTICLE_ARCHIVES")
+    tmp = Path(tempfile.mkdtemp(prefix="kidder-checkpoint-"))
+    try:
+        print(f"Poll cost by mailbox size (latency {args.latency}s per command)")
+        rows = scale(args.sizes, args.latency, pool, rng, tmp)
+        print("Scenarios")
+        checks = scenarios(pool, rng, tmp)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    bad = sum(1 for c in checks if not c["ok"])
+    print("All scenarios as expected." if not bad else f"{bad} unexpected result(s).")
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps({
+        "createdAt": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"sizes": args.sizes, "latency": args.latency, "seed": args.seed},
+        "results": rows,
+        "scenarios": checks,
+    }, indent=2), encoding="utf-8")
+    print(f"Results: {out_path}")
+    sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+bench_normalize.py — text_normalize.py vs the chained re.sub / replace passes
+=============================================================================
+Checks that the shared module gives exactly what the old per-script functions
+gave, then measures MB/s for both:
+
+- body:  normalize_text() vs fix_hard_wrapped_lines(normalize_whitespace(
+         fix_mojibake(raw))) over the raw extracted text of every archive file
+         (and vs the same without fix_mojibake, as process_articles.py ran it:
+         the archive has no mojibake, so its normalized text must not change)
+- title: fold_title() vs rename_unknown_docx_dates.norm_title() and
+         clean_title() vs rename_articles_from_datajson.clean_title(), over
+         the archive's filenames, data.json titles and the date map titles
+
+Besides the real archive, --fuzz N random strings built from the characters
+the passes care about (spaces, tabs, CR/LF, mojibake fragments, NBSP, dashes,
+quotes, "?", "PJ" suffixes) are compared too. Any mismatch is printed and the
+exit code is 1.
+
+The "old" functions below are verbatim copies of the pre-text_normalize code.
+
+  python3 bench/bench_normalize.py --repeat 20 --fuzz 20000
+"""
+
+import argparse
+import csv
+import json
+import random
+import re
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO / "scripts"))
+
+from docx_native import extract_docx_text
+from text_normalize import clean_title, fold_title, normalize_text
+
+
+def old_normalize_whitespace(s: str) -> str:
+    s = s.replace("\r\n", "\n").replace("\r", "\n")
+    s = re.sub(r"[ \t]+", " ", s)
+    s = re.sub(r"\n{3,}", "\n\n", s)
+    return s.strip()
+
+
+def old_fix_hard_wrapped_lines(s: str) -> str:
+    s = re.sub(r"\n(?!\n)", " ", s)
+    s = re.sub(r"[ \t]+", " ", s).strip()
+    return s
+
+
+def old_fix_mojibake(s: str) -> str:
+    return (s.replace("â€™", "’").replace("â€˜", "‘")
+             .replace("â€”", "—").replace("â€“", "–")
+             .replace("â€œ", "“").replace("â€�", "”")
+             .replace("Â", ""))
+
+
+def old_norm_title(s: str) -> str:
+    s = str(s).strip()
+    s = old_fix_mojibake(s)
+    s = unicodedata.normalize("NFKC", s)
+    s = s.replace("–", "-").replace("—", "-")
+    s = s.replace("’", "'").replace("‘", "'").replace("“", '"').replace("”", '"')
+    s = re.sub(r"\s+", " ", s).strip()
+    s = re.sub(r"[?]+$", "-", s)
+    s = re.sub(r"\s*-\s*$", "-", s)
+    return s.lower()
+
+
+def old_clean_title(title: str) -> str:
+    t = (title or "").strip()
+    junk_patterns = [
+        r"\bP\.?\s*J\.?\b",
+        r"\bPost[-\s]?Journal\b",
+        r"\bJamestown\s+Post[-\s]?Journal\b",
+        r"\bLocal\s+Commentaries?\b",
+        r"\bOpinion\s*&\s*Commentar(y|ies)\b",
+        r"\bOpinion\s+and\s+Commentar(y|ies)\b",
+    ]
+    t2 = t
+    for pat in junk_patterns:
+        t2 = re.sub(rf"(\s*[-—:|]\s*{pat}\s*)$", "", t2, flags=re.IGNORECASE).strip()
+        t2 = re.sub(rf"(\s*\(\s*{pat}\s*\)\s*)$", "", t2, flags=re.IGNORECASE).strip()
+    t2 = re.sub(r"\s*[-—:|]\s*(PJ)\s*$", "", t2, flags=re.IGNORECASE).strip()
+    t2 = re.sub(r"\(\s*PJ\s*\)\s*$", "", t2, flags=re.IGNORECASE).strip()
+    t2 = re.sub(r"\s+", " ", t2).strip()
+    return t2 if t2 else (t or "Untitled")
+
+
+def old_normalize_text(s: str) -> str:
+    return old_fix_hard_wrapped_lines(old_normalize_whitespace(old_fix_mojibake(s)))
+
+
+def old_process_articles_text(s: str) -> str:
+    # What process_articles.py ran (no mojibake pass)
+    return old_fix_hard_wrapped_lines(old_normalize_whitespace(s))
+
+
+FUZZ_PIECES = [" ", "  ", "\t", "\n", "\n\n", "\r", "\r\n", "\xa0", "\u2009", "\x0b", "\x1c", "\u2028", "\u3000",
+               "Â", "â€", "™", "â€™", "â€œ", "â€�", "–", "—", "’", "“", "”", "?", "-", " - ",
+               "PJ", "p.j.", "(PJ)", " - Post Journal", "Local Commentary", "ﬁ", "a", "Word"]
+
+
+def fuzz_strings(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield "".join(rng.choice(FUZZ_PIECES) for _ in range(rng.randint(0, 24)))
+
+
+def archive_titles(folder: Path) -> list:
+    titles = [re.sub(r"\s*\((\d{4}-\d{2}-\d{2})\)\.docx$", "", p.name, flags=re.I).strip()
+              for p in folder.glob("*.docx")]
+    data = REPO / "site" / "data.json"
+    if data.exists():
+        titles += [a.get("title") or "" for a in json.loads(data.read_text(encoding="utf-8")).get("articles", [])]
+    for name in ("date_map.normalized.csv", "rename_map.csv", "Corrected_unknown_dates.cleaned.csv"):
+        path = REPO / name
+        if path.exists():
+            with path.open(newline="", encoding="utf-8") as f:
+                for row in csv.reader(f):
+                    titles += row
+    return titles
+
+
+def compare(label: str, new_fn, old_fn, inputs: list) -> int:
+    bad = 0
+    for s in inputs:
+        a, b = new_fn(s), old_fn(s)
+        if a != b:
+            bad += 1
+            if bad <= 5:
+                print(f"  MISMATCH {label}: {s!r}\n    new={a!r}\n    old={b!r}")
+    print(f"  {label:<12} {len(inputs):>7} inputs, {bad} mismatches")
+    return bad
+
+
+def throughput(fn, inputs: list, repeat: int) -> float:
+    size = sum(len(s.encode("utf-8")) for s in inputs) * repeat
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for s in inputs:
+            fn(s)
+    return size / 2**20 / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--folder", default=str(REPO / "KIDDER_ARTICLE_ARCHIVES"))
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--fuzz", type=int, default=20000)
+    args = ap.parse_args()
+
+    folder = Path(args.folder)
+    bodies = [extract_docx_text(p) for p in sorted(folder.glob("*.docx"))]
+    titles = archive_titles(folder)
+    fuzz = list(fuzz_strings(args.fuzz))
+    print(f"{len(bodies)} article bodies ({sum(map(len, bodies)) / 2**20:.2f} MB raw), {len(titles)} titles, "
+          f"{len(fuzz)} fuzz strings")
+
+    print("Equivalence:")
+    bad = compare("body", normalize_text, old_normalize_text, bodies)
+    bad += compare("body as-run", normalize_text, old_process_articles_text, bodies)
+    bad += compare("body fuzz", normalize_text, old_normalize_text, fuzz)
+    bad += compare("fold_title", fold_title, old_norm_title, titles + fuzz)
+    bad += compare("clean_title", clean_title, old_clean_title, titles + fuzz)
+
+    print(f"Throughput (MB/s, {args.repeat} passes):")
+    for label, new_fn, old_fn, inputs in (("body", normalize_text, old_process_articles_text, bodies),
+                                          ("fold_title", fold_title, old_norm_title, titles),
+                                          ("clean_title", clean_title, old_clean_title, titles)):
+        old = throughput(old_fn, inputs, args.repeat)
+        new = throughput(new_fn, inputs, args.repeat)
+        print(f"  {label:<12} old {old:8.1f}   new {new:8.1f}   x{new / old:.2f}")
+    sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+bench_packing.py — requests and tokens per article vs --pack size
+=================================================================
+Runs a full process_articles.py rebuild of the archive (or a synthetic one)
+against the fake OpenAI endpoint once per --pack setting and reports
+requests, usage tokens (the fake counts ~4 chars/token) and wall time per
+article. --drop-rate makes the fake leave articles out of packed replies,
+so the split-and-retry path is part of the measurement.
+
+  python3 bench/bench_packing.py --packs 1 4 8 --drop-rate 0.05
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fake_openai import start_server
+from synth_corpus import generate
+
+REPO = Path(__file__).resolve().parent.parent
+
+RX_API = re.compile(r"API: (\d+) requests, (\d+) tokens for (\d+) articles")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--folder", default=str(REPO / "KIDDER_ARTICLE_ARCHIVES"))
+    ap.add_argument("--synthetic", type=int, default=0, help="Use N synthetic articles instead of --folder")
+    ap.add_argument("--packs", type=int, nargs="+", default=[1, 4, 8])
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--latency", type=float, default=0.05)
+    ap.add_argument("--drop-rate", type=float, default=0.0)
+    args = ap.parse_args()
+
+    server, base_url, stats = start_server(latency=args.latency, pack_drop_rate=args.drop_rate)
+    env = dict(os.environ, OPENAI_BASE_URL=base_url, OPENAI_API_KEY="fake")
+    tmp = Path(tempfile.mkdtemp(prefix="kidder-pack-"))
+    try:
+        folder = Path(args.folder)
+        if args.synthetic:
+            folder = tmp / "archive"
+            generate(folder, args.synthetic)
+        baseline = None
+        print(f"{len(list(folder.glob('*.docx')))} files, workers={args.workers}, drop rate {args.drop_rate}")
+        for pack in args.packs:
+            out = tmp / f"pack{pack}" / "data.json"
+            t0 = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, str(REPO / "scripts" / "process_articles.py"),
+                 "--folder", str(folder), "--output", str(out),
+                 "--missing-csv", str(tmp / f"pack{pack}" / "missing.csv"),
+                 "--workers", str(args.workers), "--pack", str(pack), "--no-llm-cache"],
+                env=env, capture_output=True, text=True, check=False,
+            )
+            wall = time.perf_counter() - t0
+            m = RX_API.search(proc.stdout)
+            if not m:
+                print(f"  pack={pack}: no API summary (exit {proc.returncode})\n{proc.stderr[-2000:]}")
+                continue
+            calls, tokens, n = (int(g) for g in m.groups())
+            data = json.loads(out.read_text(encoding="utf-8"))
+            per_article = tokens / n
+            baseline = baseline or per_article
+            print(f"  pack={pack:<3} {wall:6.2f}s  articles={len(data['articles']):<5} errors={len(data['errors']):<3} "
+                  f"requests={calls:<5} ({calls / n:.3f}/article)  tokens/article={per_article:7.1f} "
+                  f"(x{per_article / baseline:.3f})")
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
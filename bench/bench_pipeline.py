@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+bench_pipeline.py — end-to-end scaling benchmark on a synthetic archive
+=======================================================================
+For each N: generates N synthetic articles (bench/synth_corpus.py), mails
+each one as a column to the local IMAP stand-in (bench/fake_imap.py), starts
+the fake OpenAI endpoint, then times
+- ingest:   email_ingest.py saving the N attachments into an empty archive
+- ingest-noop: email_ingest.py again, with nothing new in the mailbox
+- rebuild:  process_articles.py full run (every file extracted + inferred)
+- noop:     process_articles.py --resume with nothing changed
+- rename:   rename_articles_from_datajson.py dry run over the result
+
+and reports files/sec, p50/p95/max per-stage latency (from the --timings report) and
+peak RSS of each run. Results go to a JSON file so runs can be compared.
+
+  python3 bench/bench_pipeline.py --sizes 100 1000 10000 --workers 8 --latency 0.05
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from email.message import EmailMessage
+from email.policy import SMTP
+
+from fake_imap import DOCX_TYPE, start_server as start_imap
+from fake_openai import start_server
+from synth_corpus import generate
+
+REPO = Path(__file__).resolve().parent.parent
+SCRIPTS = REPO / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+from run_profile import stage_summary
+
+
+def run_timed(cmd: list, env: dict) -> dict:
+    """
+    Run cmd, returning wall seconds, exit code and peak RSS (KB) of that process tree.
+    """
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - t0
+    stderr = proc.stderr.read().decode("utf-8", errors="replace")
+    proc.stderr.close()
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return {"seconds": round(wall, 4), "exitCode": proc.returncode,
+            "peakRssKB": usage.ru_maxrss, "stderr": stderr[-2000:]}
+
+
+def column_mails(paths: list) -> list:
+    """
+    One small column mail per file (plain-text body + the .docx), as raw bytes.
+    """
+    mails = []
+    for i, path in enumerate(paths):
+        msg = EmailMessage()
+        msg["From"] = "Rolland Kidder <rkidder@example.com>"
+        msg["To"] = "Kidder Archive <kidder.archive@example.com>"
+        msg["Subject"] = f"Column: {path.stem}"
+        msg["Message-ID"] = f"<bench-{i}@example.com>"
+        msg.set_content("This week's column is attached.\n\n--\nRolland Kidder\n")
+        msg.add_attachment(path.read_bytes(), *DOCX_TYPE, filename=path.name)
+        mails.append(msg.as_bytes(policy=SMTP))
+    return mails
+
+
+def bench_size(n: int, args, env: dict, tmp: Path) -> dict:
+    work = tmp / f"n{n}"
+    folder = work / "archive"
+    out = work / "site" / "data.json"
+    timings = work / "timings.json"
+
+    t0 = time.perf_counter()
+    sources = generate(work / "outbox", n, seed=n)
+    mails = column_mails(sources)
+    gen_seconds = time.perf_counter() - t0
+
+    imap, port, _, _ = start_imap(mails, latency=args.imap_latency)
+    try:
+        ingest_cmd = [sys.executable, str(SCRIPTS / "email_ingest.py"), "--no-ssl",
+                      "--imap-host", "127.0.0.1", "--imap-port", str(port), "--folder", str(folder),
+                      "--index", str(work / "site" / "archive_index.json"),
+                      "--checkpoint", str(work / "site" / "imap_checkpoint.json")]
+        ingest = run_timed(ingest_cmd, env)
+        ingest["saved"] = len(list(folder.glob("*.docx")))
+        ingest["filesPerSec"] = round(ingest["saved"] / ingest["seconds"], 2) if ingest["seconds"] else 0.0
+        ingest_noop = run_timed(ingest_cmd, env)
+    finally:
+        imap.shutdown()
+        imap.server_close()
+    del mails
+
+    base = [sys.executable, str(SCRIPTS / "process_articles.py"),
+            "--folder", str(folder), "--output", str(out),
+            "--missing-csv", str(work / "missing.csv"),
+            "--workers", str(args.workers), "--extract-workers", str(args.extract_workers),
+            "--no-llm-cache", "--log-dir", str(work / "logs")]
+
+    rebuild = run_timed(base + ["--timings", str(timings)], env)
+    rebuild["filesPerSec"] = round(n / rebuild["seconds"], 2) if rebuild["seconds"] else 0.0
+    stages = {}
+    if timings.exists():
+        files = json.loads(timings.read_text(encoding="utf-8"))["files"]
+        # The report splits normalize out of extract; the bench has always counted them together
+        stages["extract"] = stage_summary([f.get("extract", 0.0) + f.get("normalize", 0.0) for f in files])
+        stages["infer"] = stage_summary([f["infer"] for f in files if "infer" in f])
+
+    noop = run_timed(base + ["--resume"], env)
+
+    rename = run_timed([sys.executable, str(SCRIPTS / "rename_articles_from_datajson.py"),
+                        "--data", str(out), "--folder", str(folder),
+                        "--mapping", str(work / "rename_map.csv")], env)
+
+    if not args.keep:
+        shutil.rmtree(work, ignore_errors=True)
+
+    return {
+        "n": n,
+        "generateSeconds": round(gen_seconds, 3),
+        "ingest": ingest,
+        "ingestNoop": ingest_noop,
+        "rebuild": rebuild,
+        "stages": stages,
+        "noop": noop,
+        "rename": rename,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--extract-workers", type=int, default=0)
+    ap.add_argument("--latency", type=float, default=0.05, help="Fake API latency per request (seconds)")
+    ap.add_argument("--imap-latency", type=float, default=0.0, help="IMAP stand-in latency per command (seconds)")
+    ap.add_argument("--out", default="", help="Results JSON (default: bench/results/pipeline-<timestamp>.json)")
+    ap.add_argument("--keep", action="store_true", help="Keep generated corpora/output (printed temp dir)")
+    args = ap.parse_args()
+
+    out_path = Path(args.out) if args.out else (
+        REPO / "bench" / "results" / f"pipeline-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+
+    server, base_url, stats = start_server(latency=args.latency)
+    env = dict(os.environ, OPENAI_BASE_URL=base_url, OPENAI_API_KEY="fake",
+               KIDDER_GMAIL_USER="bench", KIDDER_GMAIL_APP_PASSWORD="bench")
+
+    results = []
+    tmp = Path(tempfile.mkdtemp(prefix="kidder-bench-"))
+    try:
+        for n in args.sizes:
+            r = bench_size(n, args, env, tmp)
+            results.append(r)
+            st = r["stages"]
+            print(f"N={n:<6} ingest {r['ingest']['seconds']:7.2f}s ({r['ingest']['filesPerSec']:7.1f} files/s, "
+                  f"saved {r['ingest']['saved']})  ingest-noop {r['ingestNoop']['seconds']:.2f}s")
+            if r["ingest"]["exitCode"] != 8 or r["ingest"]["saved"] != n:
+                print(r["ingest"]["stderr"])
+            print(f"{'':8} rebuild {r['rebuild']['seconds']:8.2f}s ({r['rebuild']['filesPerSec']:7.1f} files/s, "
+                  f"rss {r['rebuild']['peakRssKB'] / 1024:6.1f} MB)  "
+                  f"extract p50/p95 {st.get('extract', {}).get('p50', 0) * 1e3:.1f}/"
+                  f"{st.get('extract', {}).get('p95', 0) * 1e3:.1f} ms  "
+                  f"infer p50/p95 {st.get('infer', {}).get('p50', 0) * 1e3:.1f}/"
+                  f"{st.get('infer', {}).get('p95', 0) * 1e3:.1f} ms  "
+                  f"noop {r['noop']['seconds']:.2f}s  rename {r['rename']['seconds']:.2f}s")
+            if r["rebuild"]["exitCode"] not in (0, 8):
+                print(r["rebuild"]["stderr"])
+    finally:
+        server.shutdown()
+        if args.keep:
+            print(f"Kept work dir: {tmp}")
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps({
+        "createdAt": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {"workers": args.workers, "extractWorkers": args.extract_workers, "latency": args.latency,
+                   "imapLatency": args.imap_latency},
+        "apiRequests": stats["requests"],
+        "results": results,
+    }, indent=2), encoding="utf-8")
+    print(f"Results: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+bench_rate_limit.py — throughput under API throttling
+=====================================================
+Generates a synthetic archive, starts the fake OpenAI endpoint with a
+server-side requests-per-minute limit (429 + Retry-After past it, plus optional
+random 500s), then runs a full process_articles.py rebuild per mode:
+
+- no-retry:  --max-retries 0, no client budgets (every 429 becomes a file error)
+- adaptive:  no client budgets; Retry-After/backoff + adaptive concurrency only
+- budgeted:  --rpm set just under the server limit, so 429s are mostly avoided
+
+and reports wall time, articles/sec that actually made it into data.json,
+file errors, requests sent and 429s received.
+
+  python3 bench/bench_rate_limit.py --files 120 --server-rpm 600 --workers 16
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from fake_openai import start_server
+from synth_corpus import generate
+
+REPO = Path(__file__).resolve().parent.parent
+SCRIPTS = REPO / "scripts"
+
+
+def run_mode(name: str, extra: list, folder: Path, tmp: Path, args, env: dict, stats: dict) -> dict:
+    out = tmp / name / "data.json"
+    with stats["lock"]:
+        req0, thr0, err0 = stats["requests"], stats["throttled"], stats["errors"]
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, str(SCRIPTS / "process_articles.py"),
+         "--folder", str(folder), "--output", str(out),
+         "--missing-csv", str(tmp / name / "missing.csv"),
+         "--workers", str(args.workers), "--no-llm-cache"] + extra,
+        env=env, capture_output=True, text=True, check=False,
+    )
+    wall = time.perf_counter() - t0
+    data = json.loads(out.read_text(encoding="utf-8")) if out.exists() else {}
+    ok = len(data.get("articles", []))
+    limiter_line = next((l for l in proc.stdout.splitlines() if l.startswith("Rate limiter:")), "")
+    with stats["lock"]:
+        return {
+            "mode": name,
+            "args": extra,
+            "seconds": round(wall, 3),
+            "articles": ok,
+            "articlesPerSec": round(ok / wall, 3) if wall > 0 else 0.0,
+            "fileErrors": len(data.get("errors", [])),
+            "requests": stats["requests"] - req0,
+            "throttled": stats["throttled"] - thr0,
+            "serverErrors": stats["errors"] - err0,
+            "limiter": limiter_line.split(":", 1)[-1].strip(),
+            "exitCode": proc.returncode,
+        }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=120)
+    ap.add_argument("--workers", type=int, default=16)
+    ap.add_argument("--latency", type=float, default=0.2, help="Fake API latency per request (seconds)")
+    ap.add_argument("--server-rpm", type=float, default=600, help="Fake endpoint's requests-per-minute limit")
+    ap.add_argument("--error-rate", type=float, default=0.02, help="Fraction of requests answered with a 500")
+    ap.add_argument("--out", default="", help="Results JSON (default: bench/results/rate-limit-<timestamp>.json)")
+    args = ap.parse_args()
+
+    out_path = Path(args.out) if args.out else (
+        REPO / "bench" / "results" / f"rate-limit-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+
+    server, base_url, stats = start_server(latency=args.latency, rpm_limit=args.server_rpm,
+                                           error_rate=args.error_rate)
+    env = dict(os.environ, OPENAI_BASE_URL=base_url, OPENAI_API_KEY="fake")
+
+    modes = [
+        ("no-retry", ["--rpm", "0", "--tpm", "0", "--max-retries", "0"]),
+        ("adaptive", ["--rpm", "0", "--tpm", "0"]),
+        ("budgeted", ["--rpm", str(args.server_rpm * 0.9), "--tpm", "0"]),
+    ]
+
+    results = []
+    tmp = Path(tempfile.mkdtemp(prefix="kidder-ratelimit-"))
+    try:
+        folder = tmp / "archive"
+        generate(folder, args.files)
+        print(f"{args.files} files, workers={args.workers}, server limit {args.server_rpm:g} rpm, "
+              f"latency {args.latency}s, error rate {args.error_rate}")
+        for name, extra in modes:
+            # Let the server bucket refill between modes so each starts from the same burst
+            time.sleep(2.0)
+            r = run_mode(name, extra, folder, tmp, args, env, stats)
+            results.append(r)
+            print(f"  {name:<9} {r['seconds']:7.2f}s  {r['articlesPerSec']:6.2f} articles/s  "
+                  f"ok={r['articles']:<4} errors={r['fileErrors']:<4} requests={r['requests']:<5} "
+                  f"429s={r['throttled']:<5} 500s={r['serverErrors']}")
+            if r["limiter"]:
+                print(f"            {r['limiter']}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps({
+        "createdAt": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"files": args.files, "workers": args.workers, "latency": args.latency,
+                   "serverRpm": args.server_rpm, "errorRate": args.error_rate},
+        "results": results,
+    }, indent=2), encoding="utf-8")
+    print(f"Results: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+bench_workers.py — serial vs --workers throughput for process_articles.py
+=========================================================================
+Copies N archive .docx files into a temp folder, starts the fake OpenAI
+endpoint, and runs a full (non-resume) rebuild once per worker setting.
+
+  python3 bench/bench_workers.py --files 40 --latency 0.4 --workers 1 4 8
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fake_openai import start_server
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--folder", default=str(REPO / "KIDDER_ARTICLE_ARCHIVES"))
+    ap.add_argument("--files", type=int, default=40)
+    ap.add_argument("--latency", type=float, default=0.4)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = ap.parse_args()
+
+    src = sorted(Path(args.folder).glob("*.docx"))[: args.files]
+    if not src:
+        print(f"ERROR: no .docx files in {args.folder}")
+        sys.exit(1)
+
+    server, base_url, stats = start_server(latency=args.latency)
+    env = dict(os.environ, OPENAI_BASE_URL=base_url, OPENAI_API_KEY="fake")
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            folder = tmp / "archive"
+            folder.mkdir()
+            for p in src:
+                shutil.copy2(p, folder / p.name)
+
+            print(f"{len(src)} files, fake latency {args.latency}s")
+            baseline = None
+            for w in args.workers:
+                out = tmp / f"w{w}" / "data.json"
+                before = stats["requests"]
+                t0 = time.perf_counter()
+                subprocess.run(
+                    [sys.executable, str(REPO / "scripts" / "process_articles.py"),
+                     "--folder", str(folder), "--output", str(out),
+                     "--missing-csv", str(tmp / f"w{w}" / "missing.csv"),
+                     "--workers", str(w)],
+                    env=env, stdout=subprocess.DEVNULL, check=False,
+                )
+                dt = time.perf_counter() - t0
+                rate = len(src) / dt
+                baseline = baseline or rate
+                print(f"  workers={w:<3} {dt:7.2f}s  {rate:6.2f} files/s  "
+                      f"x{rate / baseline:5.2f}  requests={stats['requests'] - before}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
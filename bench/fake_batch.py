@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+fake_batch.py — offline stand-in for the OpenAI Batch API
+=========================================================
+Reads a batch input JSONL (as written by process_articles.py --batch-submit)
+and writes the matching output JSONL, answering each request with the same
+canned metadata as fake_openai.py. --fail-rate marks a random fraction of
+requests as failed, --drop-rate leaves some out entirely (like an expired batch).
+
+  python3 scripts/process_articles.py --resume --batch-submit /tmp/batch.jsonl
+  python3 bench/fake_batch.py /tmp/batch.jsonl /tmp/results.jsonl
+  python3 scripts/process_articles.py --resume --batch-collect /tmp/results.jsonl
+"""
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+
+from fake_openai import fake_metadata
+
+
+def answer(request: dict, n: int, failed: bool) -> dict:
+    line = {"id": f"batch_req_{n}", "custom_id": request.get("custom_id"), "response": None, "error": None}
+    if failed:
+        line["error"] = {"code": "server_error", "message": "Injected batch failure"}
+        return line
+    body = request.get("body") or {}
+    messages = body.get("messages") or [{}]
+    content = json.dumps(fake_metadata(messages[-1].get("content") or ""))
+    line["response"] = {
+        "status_code": 200,
+        "request_id": f"req_{n}",
+        "body": {
+            "id": f"chatcmpl-batch-{n}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+        },
+    }
+    return line
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("batch", help="Batch input JSONL")
+    ap.add_argument("results", help="Where to write the output JSONL")
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    ap.add_argument("--drop-rate", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    written = failed = dropped = 0
+    with Path(args.batch).open("r", encoding="utf-8") as src, \
+            Path(args.results).open("w", encoding="utf-8") as out:
+        for n, raw in enumerate(src, start=1):
+            if not raw.strip():
+                continue
+            if rng.random() < args.drop_rate:
+                dropped += 1
+                continue
+            fail = rng.random() < args.fail_rate
+            failed += fail
+            out.write(json.dumps(answer(json.loads(raw), n, fail)) + "\n")
+            written += 1
+
+    print(f"Wrote {written} results to {args.results} (failed={failed}, dropped={dropped})")
+
+
+if __name__ == "__main__":
+    main()
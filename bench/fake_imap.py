@@ -0,0 +1,693 @@
+#!/usr/bin/env python3
+"""
+fake_imap.py — local IMAP stand-in for email_ingest.py
+======================================================
+A single-mailbox IMAP4rev1 server, just big enough for email_ingest.py and
+the benches: LOGIN, SELECT/EXAMINE, SEARCH (ALL, SEEN, UNSEEN, SUBJECT,
+FROM, UID and message sets), FETCH / UID FETCH (UID, FLAGS, RFC822*,
+BODYSTRUCTURE, BODY[...] / BODY.PEEK[...] incl. HEADER.FIELDS and part
+numbers), STORE / UID STORE, IDLE, NOOP and LOGOUT. Any user/password is
+accepted.
+
+The mailbox is filled with synthetic but realistically shaped mails
+(synth_mailbox()): columns with a .docx attachment, a plain-text and an HTML
+body and an inline signature logo, some with a photo or a second column
+attached, some forwarded (message/rfc822), and newsletters with images and a
+PDF but no .docx. Real archive files are used as the attachments when
+KIDDER_ARTICLE_ARCHIVES is there.
+
+--latency delays every response (a network round trip) and --mbps caps the
+download rate, so bytes on the wire and round trips both show up in wall time.
+The server counts commands and bytes in/out. --deliver-every N has a new mail
+arrive every N seconds (clients in IDLE get "* n EXISTS" right away) and
+--idle-drop N hangs up on clients that idle longer than N seconds.
+
+  python3 bench/fake_imap.py --port 1143 --messages 50
+  KIDDER_GMAIL_USER=x KIDDER_GMAIL_APP_PASSWORD=x python3 scripts/email_ingest.py \\
+    --imap-host 127.0.0.1 --imap-port 1143 --no-ssl --folder /tmp/inbox
+
+Can also be started in-process via start_server() (used by the bench scripts).
+"""
+
+import argparse
+import bisect
+import email
+import random
+import re
+import select
+import socketserver
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from email.policy import SMTP
+from email.utils import format_datetime, getaddresses
+from io import BytesIO
+from pathlib import Path
+
+from synth_corpus import synth_article, write_docx
+
+REPO = Path(__file__).resolve().parent.parent
+DOCX_TYPE = ("application", "vnd.openxmlformats-officedocument.wordprocessingml.document")
+
+RX_ARG = re.compile(r'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|((?:[^\s()"\[\]]|\[[^\]]*\])+))')
+RX_SECTION = re.compile(r"^BODY(\.PEEK)?\[([^\]]*)\](?:<(\d+)(?:\.(\d+))?>)?$", re.IGNORECASE)
+RX_LITERAL = re.compile(rb"\{(\d+)\+?\}\r\n$")
+
+
+# ---------------------------------------------------------------------------
+# Synthetic mail
+# ---------------------------------------------------------------------------
+
+def _docx_pool(rng: random.Random, archive: Path) -> list:
+    """
+    (filename, bytes) pairs to attach: the real archive if it is there, else synth_corpus articles.
+    """
+    if archive.is_dir():
+        pool = [(p.name, p.read_bytes()) for p in sorted(archive.glob("*.docx"))]
+        if pool:
+            return pool
+    pool = []
+    for i in range(50):
+        name, paragraphs = synth_article(rng, i)
+        buf = BytesIO()
+        write_docx(buf, paragraphs)
+        pool.append((name, buf.getvalue()))
+    return pool
+
+
+def _text_body(rng: random.Random, words: int) -> str:
+    vocab = "the lake county board budget village meeting this week we will road school column thanks".split()
+    lines, line = [], []
+    for _ in range(words):
+        line.append(rng.choice(vocab))
+        if len(line) == 12:
+            lines.append(" ".join(line))
+            line = []
+    return "\n".join(lines + [" ".join(line), "", "--", "Rolland Kidder", "Sent from my iPhone"])
+
+
+def _with_bodies(msg: EmailMessage, rng: random.Random, text_words: int, images: int):
+    text = _text_body(rng, text_words)
+    msg.set_content(text)
+    html = "<html><body>" + "".join(f"<p>{line}</p>" for line in text.splitlines())
+    cids = [f"img{k}.{rng.randrange(10**9)}@example.com" for k in range(images)]
+    html += "".join(f'<img src="cid:{cid}">' for cid in cids) + "</body></html>"
+    msg.add_alternative(html, subtype="html")
+    html_part = msg.get_payload()[1]
+    for cid in cids:
+        html_part.add_related(rng.randbytes(rng.randint(15_000, 60_000)), "image", "png",
+                              cid=f"<{cid}>", disposition="inline", filename="image001.png")
+
+
+def _headers(msg: EmailMessage, rng: random.Random, i: int, subject: str, sender: str):
+    msg["From"] = sender
+    msg["To"] = "Kidder Archive <kidder.archive@example.com>"
+    msg["Subject"] = subject
+    msg["Date"] = format_datetime(datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(hours=7 * i))
+    msg["Message-ID"] = f"<{i}.{rng.randrange(10**12)}@example.com>"
+
+
+def column_mail(rng: random.Random, i: int, pool: list, extra_docx: bool = False, photo: bool = False) -> EmailMessage:
+    """
+    A column: text + HTML body with a signature logo, one .docx from `pool` (two with
+    extra_docx), optionally a photo.
+    """
+    name, data = pool[rng.randrange(len(pool))]
+    if i % 9 == 0:
+        # Non-ASCII names go out RFC 2231-encoded (and continued, when long)
+        name = name.replace(" ", " ’ ", 1).replace("'", "’")
+    msg = EmailMessage()
+    _headers(msg, rng, i, f"Column: {Path(name).stem}", "Rolland Kidder <rkidder@example.com>")
+    _with_bodies(msg, rng, rng.randint(40, 250), 1)
+    msg.add_attachment(data, *DOCX_TYPE, filename=name)
+    if extra_docx:
+        name2, data2 = pool[rng.randrange(len(pool))]
+        msg.add_attachment(data2, *DOCX_TYPE, filename=name2)
+    if photo:
+        msg.add_attachment(rng.randbytes(rng.randint(400_000, 2_500_000)), "image", "jpeg",
+                           filename=f"IMG_{rng.randint(1000, 9999)}.jpg")
+    return msg
+
+
+def synth_mail(rng: random.Random, i: int, pool: list) -> bytes:
+    roll = rng.random()
+    if roll < 0.55:
+        msg = column_mail(rng, i, pool, False, rng.random() < 0.3)
+    elif roll < 0.65:
+        msg = column_mail(rng, i, pool, True, False)
+    elif roll < 0.80:
+        inner = column_mail(rng, i, pool, False, rng.random() < 0.3)
+        msg = EmailMessage()
+        _headers(msg, rng, i, f"Fwd: {inner['Subject']}", "Post-Journal Editor <editor@example.com>")
+        msg.set_content(_text_body(rng, 60))
+        msg.add_attachment(inner)
+    else:
+        msg = EmailMessage()
+        _headers(msg, rng, i, f"Chautauqua County Newsletter #{i}", "County News <news@example.com>")
+        _with_bodies(msg, rng, rng.randint(300, 1500), rng.randint(2, 6))
+        msg.add_attachment(rng.randbytes(rng.randint(100_000, 400_000)), "application", "pdf",
+                           filename=f"newsletter-{i}.pdf")
+    return msg.as_bytes(policy=SMTP)
+
+
+def synth_mailbox(count: int, seed: int = 0, archive: Path = REPO / "KIDDER_ARTICLE_ARCHIVES") -> list:
+    """
+    `count` raw RFC 822 messages (bytes), as described in the module docstring.
+    """
+    rng = random.Random(seed)
+    pool = _docx_pool(rng, archive)
+    return [synth_mail(rng, i, pool) for i in range(count)]
+
+
+# ---------------------------------------------------------------------------
+# IMAP encoding of messages
+# ---------------------------------------------------------------------------
+
+def istr(s) -> bytes:
+    """
+    IMAP string: NIL, a quoted string, or a literal for anything quoting can't carry.
+    """
+    if s is None:
+        return b"NIL"
+    b = s if isinstance(s, bytes) else str(s).encode("utf-8")
+    if any(c > 126 or c in (10, 13, 0) for c in b):
+        return b"{%d}\r\n" % len(b) + b
+    return b'"' + b.replace(b"\\", b"\\\\").replace(b'"', b'\\"') + b'"'
+
+
+def raw_params(value: str) -> list:
+    """
+    The parameters of a Content-Type / Content-Disposition value exactly as written (RFC 2231
+    continuations left alone, as real servers report them).
+    """
+    out = []
+    for piece in re.findall(r';\s*([^=;\s]+)\s*=\s*("(?:[^"\\]|\\.)*"|[^;]*)', " ".join(value.split())):
+        k, v = piece
+        out.append((k, v[1:-1].replace('\\"', '"') if v.startswith('"') else v.strip()))
+    return out
+
+
+def plist(params: list) -> bytes:
+    if not params:
+        return b"NIL"
+    return b"(" + b" ".join(istr(k.upper()) + b" " + istr(v) for k, v in params) + b")"
+
+
+def disposition(part) -> bytes:
+    value = part.get("Content-Disposition")
+    if not value:
+        return b"NIL"
+    return b"(" + istr(value.split(";")[0].strip().upper()) + b" " + plist(raw_params(value)) + b")"
+
+
+def addresses(value) -> bytes:
+    if not value:
+        return b"NIL"
+    out = []
+    for name, addr in getaddresses([str(value)]):
+        mailbox, _, host = addr.partition("@")
+        out.append(b"(" + b" ".join((istr(name or None), b"NIL", istr(mailbox), istr(host or None))) + b")")
+    return b"(" + b"".join(out) + b")"
+
+
+def envelope(msg) -> bytes:
+    sender = msg.get("From")
+    return b"(" + b" ".join((
+        istr(msg.get("Date")), istr(msg.get("Subject")), addresses(sender), addresses(msg.get("Sender") or sender),
+        addresses(msg.get("Reply-To") or sender), addresses(msg.get("To")), addresses(msg.get("Cc")),
+        addresses(msg.get("Bcc")), istr(msg.get("In-Reply-To")), istr(msg.get("Message-ID")),
+    )) + b")"
+
+
+def part_body(part) -> bytes:
+    """
+    What BODY[n] returns for a part: its body as transferred (still encoded).
+    """
+    if part.get_content_type() == "message/rfc822":
+        return part.get_payload(0).as_bytes()
+    payload = part.get_payload()
+    return payload.encode("ascii", "surrogateescape") if isinstance(payload, str) else b""
+
+
+def bodystructure(part) -> bytes:
+    if part.get_content_maintype() == "multipart":
+        children = b"".join(b"(" + bodystructure(p) + b")" for p in part.get_payload())
+        ctype = part.get("Content-Type", "")
+        return (children + b" " + istr(part.get_content_subtype().upper()) + b" " + plist(raw_params(ctype)) +
+                b" " + disposition(part) + b" NIL NIL")
+    body = part_body(part)
+    fields = [istr(part.get_content_maintype().upper()), istr(part.get_content_subtype().upper()),
+              plist(raw_params(part.get("Content-Type", ""))), istr(part.get("Content-ID")),
+              istr(part.get("Content-Description")),
+              istr((part.get("Content-Transfer-Encoding") or "7bit").upper()), b"%d" % len(body)]
+    if part.get_content_type() == "message/rfc822":
+        inner = part.get_payload(0)
+        fields += [envelope(inner), b"(" + bodystructure(inner) + b")", b"%d" % body.count(b"\n")]
+    elif part.get_content_maintype() == "text":
+        fields.append(b"%d" % body.count(b"\n"))
+    fields += [b"NIL", disposition(part), b"NIL", b"NIL"]
+    return b" ".join(fields)
+
+
+def split_header(raw: bytes):
+    for sep in (b"\r\n\r\n", b"\n\n"):
+        i = raw.find(sep)
+        if i >= 0:
+            return raw[:i + len(sep)], raw[i + len(sep):]
+    return raw, b""
+
+
+def header_fields(header: bytes, names: set, exclude: bool = False) -> bytes:
+    out = []
+    keep = False
+    for line in header.splitlines(keepends=True):
+        if line[:1] in (b" ", b"\t"):
+            if keep:
+                out.append(line)
+            continue
+        if not line.strip():
+            continue
+        name = line.split(b":", 1)[0].strip().decode("ascii", "replace").upper()
+        keep = (name in names) != exclude
+        if keep:
+            out.append(line)
+    return b"".join(out) + b"\r\n"
+
+
+def section_part(msg, numbers: list):
+    part = msg
+    for n in numbers:
+        if part.get_content_type() == "message/rfc822":
+            part = part.get_payload(0)
+        if part.is_multipart():
+            kids = part.get_payload()
+            if n < 1 or n > len(kids):
+                return None
+            part = kids[n - 1]
+        elif n != 1:
+            return None
+    return part
+
+
+def section_bytes(raw: bytes, msg, section: str) -> bytes:
+    spec = section.upper()
+    m = re.match(r"^([\d.]*?)\.?(HEADER\.FIELDS\.NOT|HEADER\.FIELDS|HEADER|TEXT|MIME)?(?:\s*\((.*)\))?$", spec)
+    if not m:
+        return b""
+    numbers = [int(n) for n in m.group(1).split(".") if n]
+    what = m.group(2)
+    if not numbers:
+        source = raw
+    else:
+        part = section_part(msg, numbers)
+        if part is None:
+            return b""
+        if not what:
+            return part_body(part)
+        if what == "MIME":
+            return split_header(part.as_bytes())[0]
+        source = part.get_payload(0).as_bytes() if part.get_content_type() == "message/rfc822" else part.as_bytes()
+    header, text = split_header(source)
+    if what == "HEADER":
+        return header
+    if what == "TEXT":
+        return text
+    if what in ("HEADER.FIELDS", "HEADER.FIELDS.NOT"):
+        return header_fields(header, set((m.group(3) or "").split()), what.endswith("NOT"))
+    return source
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class Mailbox:
+    def __init__(self, mails: list, uidvalidity: int = 1):
+        self.lock = threading.Lock()
+        self.uidvalidity = uidvalidity
+        self.uidnext = 1
+        self.messages = []
+        for raw in mails:
+            self.deliver(raw)
+
+    def deliver(self, raw: bytes) -> int:
+        with self.lock:
+            uid = self.uidnext
+            self.uidnext += 1
+            self.messages.append({"uid": uid, "raw": raw, "flags": set(), "msg": None})
+            return uid
+
+    def renumber(self, uidvalidity: int):
+        """
+        What a server rebuilding its index does: new UIDVALIDITY, UIDs from 1 again.
+        """
+        with self.lock:
+            self.uidvalidity = uidvalidity
+            for uid, m in enumerate(self.messages, 1):
+                m["uid"] = uid
+            self.uidnext = len(self.messages) + 1
+
+    @staticmethod
+    def parsed(m: dict):
+        if m["msg"] is None:
+            m["msg"] = email.message_from_bytes(m["raw"])
+        return m["msg"]
+
+
+def parse_args(s: str) -> list:
+    stack = [[]]
+    pos = 0
+    while pos < len(s):
+        m = RX_ARG.match(s, pos)
+        if not m or m.end() == pos:
+            break
+        pos = m.end()
+        if m.group(1):
+            stack.append([])
+        elif m.group(2):
+            done = stack.pop()
+            stack[-1].append(done)
+        elif m.group(3) is not None:
+            stack[-1].append(re.sub(r"\\(.)", r"\1", m.group(3)))
+        else:
+            stack[-1].append(m.group(4))
+    while len(stack) > 1:
+        done = stack.pop()
+        stack[-1].append(done)
+    return stack[0]
+
+
+def message_set(spec: str, largest: int) -> set:
+    out = set()
+    for piece in spec.split(","):
+        a, sep, b = piece.partition(":")
+        lo = largest if a == "*" else int(a)
+        hi = lo if not sep else (largest if b == "*" else int(b))
+        lo, hi = min(lo, hi), max(lo, hi)
+        out.update(range(lo, hi + 1))
+    return out
+
+
+def make_handler(box: Mailbox, stats: dict, latency: float, mbps: float, idle_drop: float = 0.0):
+    class Handler(socketserver.StreamRequestHandler):
+        def send(self, data: bytes):
+            with stats["lock"]:
+                stats["bytesOut"] += len(data)
+            if mbps > 0:
+                time.sleep(len(data) * 8 / (mbps * 1e6))
+            self.wfile.write(data)
+
+        def read_command(self):
+            line = self.rfile.readline()
+            if not line:
+                return None
+            with stats["lock"]:
+                stats["bytesIn"] += len(line)
+            # Client literals ({n}) are read inline, after a continuation request
+            while True:
+                m = RX_LITERAL.search(line)
+                if not m:
+                    break
+                if not line.rstrip().endswith(b"+}"):
+                    self.wfile.write(b"+ go ahead\r\n")
+                data = self.rfile.read(int(m.group(1)))
+                rest = self.rfile.readline()
+                with stats["lock"]:
+                    stats["bytesIn"] += len(data) + len(rest)
+                line = line[:m.start()] + b'"' + data.replace(b"\\", b"\\\\").replace(b'"', b'\\"') + b'"' + rest
+            return line.decode("utf-8", "replace").rstrip("\r\n")
+
+        def handle(self):
+            self.selected = False
+            self.send(b"* OK [CAPABILITY IMAP4rev1 IDLE UIDPLUS] fake IMAP ready\r\n")
+            while True:
+                line = self.read_command()
+                if line is None:
+                    return
+                tag, _, rest = line.partition(" ")
+                cmd, _, args = rest.partition(" ")
+                cmd = cmd.upper()
+                uid = cmd == "UID"
+                if uid:
+                    cmd, _, args = args.partition(" ")
+                    cmd = cmd.upper()
+                with stats["lock"]:
+                    stats["commands"] += 1
+                    stats["byCommand"][("UID " if uid else "") + cmd] = \
+                        stats["byCommand"].get(("UID " if uid else "") + cmd, 0) + 1
+                if latency > 0:
+                    time.sleep(latency)
+                if cmd == "IDLE":
+                    if not self.idle(tag):
+                        return
+                    continue
+                try:
+                    out = self.dispatch(cmd, args, uid)
+                except Exception as e:  # noqa: BLE001 - a stand-in answers BAD rather than dropping the client
+                    out = [b"BAD " + str(e).encode("utf-8", "replace")]
+                untagged, status = out[:-1], out[-1]
+                self.send(b"".join(untagged) + tag.encode() + b" " + status + b"\r\n")
+                if cmd == "LOGOUT":
+                    return
+
+        def idle(self, tag: str) -> bool:
+            """
+            IDLE until the client's DONE, pushing "* n EXISTS" as mails are delivered. False
+            if the connection is to be closed (client gone, or --idle-drop reached).
+            """
+            self.send(b"+ idling\r\n")
+            with box.lock:
+                known = len(box.messages)
+            started = time.monotonic()
+            while True:
+                if select.select([self.connection], [], [], 0.02)[0]:
+                    line = self.rfile.readline()
+                    if not line:
+                        return False
+                    with stats["lock"]:
+                        stats["bytesIn"] += len(line)
+                    if line.strip().upper() == b"DONE":
+                        self.send(tag.encode() + b" OK IDLE terminated\r\n")
+                        return True
+                    self.send(tag.encode() + b" BAD expected DONE\r\n")
+                    return True
+                with box.lock:
+                    n = len(box.messages)
+                if n > known:
+                    self.send(b"* %d EXISTS\r\n" % n)
+                    known = n
+                if idle_drop and time.monotonic() - started > idle_drop:
+                    # What Gmail does to connections idling past its limit
+                    self.send(b"* BYE idle for too long\r\n")
+                    with stats["lock"]:
+                        stats["idleDrops"] += 1
+                    return False
+
+        def dispatch(self, cmd: str, args: str, uid: bool) -> list:
+            if cmd == "CAPABILITY":
+                return [b"* CAPABILITY IMAP4rev1 IDLE UIDPLUS\r\n", b"OK CAPABILITY completed"]
+            if cmd in ("LOGIN", "AUTHENTICATE"):
+                return [b"OK LOGIN completed"]
+            if cmd in ("NOOP", "CHECK"):
+                return [b"OK NOOP completed"]
+            if cmd == "LOGOUT":
+                return [b"* BYE fake IMAP signing off\r\n", b"OK LOGOUT completed"]
+            if cmd in ("SELECT", "EXAMINE"):
+                self.selected = True
+                with box.lock:
+                    n, v, nxt = len(box.messages), box.uidvalidity, box.uidnext
+                return [b"* FLAGS (\\Answered \\Flagged \\Deleted \\Seen \\Draft)\r\n",
+                        b"* %d EXISTS\r\n* 0 RECENT\r\n" % n,
+                        b"* OK [UIDVALIDITY %d] UIDs valid\r\n* OK [UIDNEXT %d] Predicted next UID\r\n" % (v, nxt),
+                        b"OK [READ-WRITE] " + cmd.encode() + b" completed"]
+            if not self.selected:
+                return [b"BAD no mailbox selected"]
+            if cmd == "SEARCH":
+                return self.search(parse_args(args), uid)
+            if cmd == "FETCH":
+                spec, _, items = args.partition(" ")
+                return self.fetch(spec, parse_args(items), uid)
+            if cmd == "STORE":
+                spec, _, rest = args.partition(" ")
+                return self.store(spec, parse_args(rest), uid)
+            return [b"BAD unknown command " + cmd.encode()]
+
+        def targets(self, spec: str, uid: bool) -> list:
+            """
+            (sequence number, message) pairs for a message set, in mailbox order.
+            """
+            with box.lock:
+                msgs = list(box.messages)
+            if not msgs:
+                return []
+            if uid:
+                wanted = message_set(spec, msgs[-1]["uid"])
+                return [(i, m) for i, m in enumerate(msgs, 1) if m["uid"] in wanted]
+            wanted = message_set(spec, len(msgs))
+            return [(i, msgs[i - 1]) for i in sorted(wanted) if 1 <= i <= len(msgs)]
+
+        def search(self, criteria: list, uid: bool) -> list:
+            with box.lock:
+                msgs = list(enumerate(box.messages, 1))
+                largest_uid = box.uidnext - 1
+            # Message sets resolved once per search, not per message
+            sets = {}
+            if len(criteria) > 1 and str(criteria[0]).upper() == "UID":
+                # As with a server's UID index, "UID n:*" only looks at messages from UID n on
+                wanted = sets["UID", criteria[1]] = message_set(criteria[1], largest_uid)
+                uid_of = lambda im: im[1]["uid"]
+                lo = bisect.bisect_left(msgs, min(wanted, default=0), key=uid_of)
+                hi = bisect.bisect_right(msgs, max(wanted, default=-1), key=uid_of)
+                msgs = msgs[lo:hi]
+            hits = []
+            for i, m in msgs:
+                ok, k = True, 0
+                while k < len(criteria):
+                    key = str(criteria[k]).upper()
+                    if key == "ALL":
+                        pass
+                    elif key == "UNSEEN":
+                        ok &= "\\Seen" not in m["flags"]
+                    elif key == "SEEN":
+                        ok &= "\\Seen" in m["flags"]
+                    elif key in ("SUBJECT", "FROM"):
+                        k += 1
+                        ok &= criteria[k].lower() in str(Mailbox.parsed(m).get(key, "")).lower()
+                    elif key == "UID":
+                        k += 1
+                        spec = criteria[k]
+                        if ("UID", spec) not in sets:
+                            sets["UID", spec] = message_set(spec, largest_uid)
+                        ok &= m["uid"] in sets["UID", spec]
+                    elif re.match(r"^[\d*:,]+$", key):
+                        if key not in sets:
+                            sets[key] = message_set(key, len(msgs))
+                        ok &= i in sets[key]
+                    else:
+                        return [b"BAD unsupported search key " + key.encode()]
+                    k += 1
+                if ok:
+                    hits.append(m["uid"] if uid else i)
+            return [b"* SEARCH" + b"".join(b" %d" % h for h in hits) + b"\r\n", b"OK SEARCH completed"]
+
+        def fetch(self, spec: str, items: list, uid: bool) -> list:
+            if len(items) == 1 and isinstance(items[0], list):
+                items = items[0]
+            names = [str(x) for x in items]
+            if uid and "UID" not in (n.upper() for n in names):
+                names.insert(0, "UID")
+            out = []
+            for i, m in self.targets(spec, uid):
+                fields = []
+                for name in names:
+                    fields.append(self.fetch_item(m, name))
+                out.append(b"* %d FETCH (" % i + b" ".join(fields) + b")\r\n")
+            return out + [b"OK FETCH completed"]
+
+        def fetch_item(self, m: dict, name: str) -> bytes:
+            up = name.upper()
+            raw = m["raw"]
+            if up == "UID":
+                return b"UID %d" % m["uid"]
+            if up == "FLAGS":
+                return b"FLAGS (" + " ".join(sorted(m["flags"])).encode() + b")"
+            if up == "RFC822.SIZE":
+                return b"RFC822.SIZE %d" % len(raw)
+            if up in ("RFC822", "RFC822.HEADER", "RFC822.TEXT"):
+                if up == "RFC822":
+                    m["flags"].add("\\Seen")
+                data = raw if up == "RFC822" else split_header(raw)[0 if up.endswith("HEADER") else 1]
+                return up.encode() + b" " + istr(data) if data else up.encode() + b' ""'
+            if up in ("BODYSTRUCTURE", "BODY"):
+                return up.encode() + b" (" + bodystructure(Mailbox.parsed(m)) + b")"
+            sm = RX_SECTION.match(name)
+            if not sm:
+                raise ValueError(f"unsupported FETCH item {name}")
+            peek, section, start, length = sm.groups()
+            if not peek:
+                m["flags"].add("\\Seen")
+            data = section_bytes(raw, Mailbox.parsed(m), section)
+            key = b"BODY[" + section.upper().encode() + b"]"
+            if start is not None:
+                data = data[int(start):int(start) + int(length)] if length else data[int(start):]
+                key += b"<%d>" % int(start)
+            return key + b" {%d}\r\n" % len(data) + data
+
+        def store(self, spec: str, args: list, uid: bool) -> list:
+            op = str(args[0]).upper()
+            flags = args[1] if len(args) > 1 and isinstance(args[1], list) else [str(a) for a in args[1:]]
+            flags = {str(f) for f in flags}
+            out = []
+            for i, m in self.targets(spec, uid):
+                with box.lock:
+                    if op.startswith("+"):
+                        m["flags"] |= flags
+                    elif op.startswith("-"):
+                        m["flags"] -= flags
+                    else:
+                        m["flags"] = set(flags)
+                if not op.endswith(".SILENT"):
+                    uid_item = b"UID %d " % m["uid"] if uid else b""
+                    out.append(b"* %d FETCH (%sFLAGS (" % (i, uid_item) + " ".join(sorted(m["flags"])).encode() + b"))\r\n")
+            return out + [b"OK STORE completed"]
+
+    return Handler
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def start_server(mails: list, port: int = 0, latency: float = 0.0, mbps: float = 0.0, idle_drop: float = 0.0):
+    """
+    Start the fake IMAP server on a background thread with `mails` (raw bytes) in INBOX.
+    Returns (server, port, stats, mailbox); call server.shutdown() when done, and
+    mailbox.deliver(raw) to have a mail arrive (idling clients are told at once),
+    mailbox.renumber(uidvalidity) for a UIDVALIDITY change.
+    stats counts "commands" (also "byCommand"), "bytesOut", "bytesIn" and "idleDrops".
+    """
+    box = Mailbox(mails)
+    stats = {"commands": 0, "byCommand": {}, "bytesOut": 0, "bytesIn": 0, "idleDrops": 0,
+             "lock": threading.Lock()}
+    server = _Server(("127.0.0.1", port), make_handler(box, stats, latency, mbps, idle_drop))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[1], stats, box
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=1143)
+    ap.add_argument("--messages", type=int, default=50, help="Synthetic mails in INBOX")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering each command")
+    ap.add_argument("--mbps", type=float, default=0.0, help="Download rate cap in Mbit/s (0 = none)")
+    ap.add_argument("--deliver-every", type=float, default=0.0, help="Deliver a new synthetic mail every N seconds")
+    ap.add_argument("--idle-drop", type=float, default=0.0, help="Drop (BYE) connections idling longer than N seconds")
+    args = ap.parse_args()
+
+    mails = synth_mailbox(args.messages, args.seed)
+    server, port, stats, box = start_server(mails, args.port, args.latency, args.mbps, args.idle_drop)
+    print(f"Fake IMAP server on 127.0.0.1:{port} with {len(mails)} mails "
+          f"({sum(map(len, mails)) / 2**20:.1f} MB; latency={args.latency}s, mbps={args.mbps or 'no cap'}). "
+          f"Ctrl-C to stop.")
+    try:
+        rng = random.Random(args.seed + 1)
+        pool = _docx_pool(rng, REPO / "KIDDER_ARTICLE_ARCHIVES")
+        i = len(mails)
+        while True:
+            if args.deliver_every <= 0:
+                time.sleep(3600)
+                continue
+            time.sleep(args.deliver_every)
+            uid = box.deliver(synth_mail(rng, i, pool))
+            i += 1
+            print(f"Delivered UID {uid}")
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"{stats['commands']} commands, {stats['bytesOut']} bytes out, {stats['bytesIn']} bytes in")
+
+
+if __name__ == "__main__":
+    main()
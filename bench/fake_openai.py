@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+fake_openai.py — local stand-in for the OpenAI chat completions endpoint
+=======================================================================
+Answers POST /v1/chat/completions with a canned metadata JSON after a fixed
+delay, so process_articles.py can be exercised offline:
+
+  python3 bench/fake_openai.py --port 8765 --latency 0.4
+  python3 bench/fake_openai.py --port 8765 --rpm-limit 300 --error-rate 0.05
+  OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake \\
+    python3 scripts/process_articles.py --folder ... --workers 8
+
+--rpm-limit enforces a server-side requests-per-minute budget (token bucket,
+one second of burst) and answers over-budget requests with 429 + Retry-After,
+like the real API; --error-rate injects random 500s.
+
+Packed prompts (process_articles.py --pack) get a JSON array keyed by
+sourceFile; --pack-drop-rate leaves random articles out of it, to exercise
+the split-and-retry path.
+
+Can also be started in-process via start_server() (used by the bench scripts).
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+RX_PACKED_HEADER = re.compile(r"^=== ARTICLE \d+ \| sourceFile: (.*) ===$", re.MULTILINE)
+
+
+def fake_metadata(user_content: str) -> dict:
+    article = user_content.split("ARTICLE:", 1)[-1].strip()
+    first_line = article.splitlines()[0].strip() if article else ""
+    return {
+        "title": first_line[:120] or "Untitled",
+        "date": "",
+        "summary": article[:200],
+        "topics": ["Local", "Commentary"],
+    }
+
+
+def fake_packed(user_content: str, drop_rate: float = 0.0) -> list:
+    """
+    Answer for a packed prompt: one metadata object per "=== ARTICLE n | sourceFile: ... ===" section.
+    """
+    heads = list(RX_PACKED_HEADER.finditer(user_content))
+    out = []
+    for i, m in enumerate(heads):
+        if drop_rate > 0 and random.random() < drop_rate:
+            continue
+        end = heads[i + 1].start() if i + 1 < len(heads) else len(user_content)
+        meta = fake_metadata("ARTICLE:\n" + user_content[m.end():end])
+        out.append(dict(sourceFile=m.group(1), **meta))
+    return out
+
+
+def admit(stats: dict, rpm_limit: float):
+    """
+    Server-side token bucket. Returns 0 if the request may proceed, else the
+    seconds until a slot frees up (sent as Retry-After).
+    """
+    if rpm_limit <= 0:
+        return 0.0
+    rate = rpm_limit / 60.0
+    burst = max(1.0, rate)
+    with stats["lock"]:
+        now = time.monotonic()
+        level = min(burst, stats["bucket"] + (now - stats["stamp"]) * rate)
+        stats["stamp"] = now
+        if level >= 1.0:
+            stats["bucket"] = level - 1.0
+            return 0.0
+        stats["bucket"] = level
+        return (1.0 - level) / rate
+
+
+def make_handler(latency: float, stats: dict, rpm_limit: float = 0, error_rate: float = 0.0,
+                 pack_drop_rate: float = 0.0):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def send_error_json(self, status: int, message: str, headers=None):
+            out = json.dumps({"error": {"message": message, "type": "fake_error"}}).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(out)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(out)
+
+        def do_POST(self):
+            n = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(n) or b"{}")
+            with stats["lock"]:
+                stats["requests"] += 1
+
+            wait = admit(stats, rpm_limit)
+            if wait > 0:
+                with stats["lock"]:
+                    stats["throttled"] += 1
+                self.send_error_json(429, "Rate limit reached", {
+                    "Retry-After": f"{wait:.3f}",
+                    "retry-after-ms": str(int(wait * 1000) + 1),
+                })
+                return
+            if error_rate > 0 and random.random() < error_rate:
+                with stats["lock"]:
+                    stats["errors"] += 1
+                self.send_error_json(500, "Injected server error")
+                return
+
+            if latency > 0:
+                time.sleep(latency)
+
+            messages = body.get("messages") or [{}]
+            user_content = messages[-1].get("content") or ""
+            if RX_PACKED_HEADER.search(user_content):
+                content = json.dumps(fake_packed(user_content, pack_drop_rate))
+            else:
+                content = json.dumps(fake_metadata(user_content))
+            # Rough token counts (~4 chars/token) so client-side TPM accounting has something to settle against
+            prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4
+            completion_tokens = len(content) // 4
+            resp = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens},
+            }
+            out = json.dumps(resp).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+    return Handler
+
+
+def start_server(port: int = 0, latency: float = 0.3, rpm_limit: float = 0, error_rate: float = 0.0,
+                 pack_drop_rate: float = 0.0):
+    """
+    Start the fake endpoint on a background thread.
+    Returns (server, base_url, stats); call server.shutdown() when done.
+    stats counts "requests" (all POSTs), "throttled" (429s) and "errors" (injected 500s).
+    """
+    stats = {"requests": 0, "throttled": 0, "errors": 0, "lock": threading.Lock(),
+             "bucket": max(1.0, rpm_limit / 60.0), "stamp": time.monotonic()}
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency, stats, rpm_limit, error_rate, pack_drop_rate))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    return server, base_url, stats
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.3, help="Seconds to wait before answering each request")
+    ap.add_argument("--rpm-limit", type=float, default=0, help="Answer 429 past this many requests/minute (0 = no limit)")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 500")
+    ap.add_argument("--pack-drop-rate", type=float, default=0.0, help="Fraction of packed articles left out of replies")
+    args = ap.parse_args()
+
+    server, base_url, _ = start_server(args.port, args.latency, args.rpm_limit, args.error_rate,
+                                       args.pack_drop_rate)
+    print(f"Fake OpenAI endpoint at {base_url} (latency={args.latency}s, rpm limit={args.rpm_limit or 'none'}, "
+          f"error rate={args.error_rate}). Ctrl-C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+synth_corpus.py — generate synthetic .docx articles shaped like the archive
+===========================================================================
+Each file is "{Title} (YYYY-MM-DD).docx" holding the usual header block
+(title, "Local Commentaries", date line, "Rolland Kidder") followed by
+~500-900 words of body paragraphs. The .docx is written directly with
+zipfile (no python-docx needed) and opens in Word, pandoc and python-docx.
+
+  python3 bench/synth_corpus.py --out /tmp/synth --count 1000
+"""
+
+import argparse
+import random
+import zipfile
+from datetime import date, timedelta
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+WORDS = (
+    "the lake bridge county village town board budget school winter summer snow ice fishing "
+    "election primary congress governor senate president party voters campaign tariff trade "
+    "sewer construction project contractor state department road expressway traffic bills "
+    "stadium football season church community neighbors family history memory newspaper "
+    "column readers opinion government local federal taxes energy electricity power plant "
+    "dunkirk jamestown chautauqua southern tier canada china war navy veterans freedom "
+    "people years time work good new old first last long great little own other right "
+    "and of to in that it is was for on with as his they at be this from have or by one "
+    "had not but what all were when we there can an which their said if do will each about"
+).split()
+
+TITLE_WORDS = (
+    "Lake Bridge Election Winter Summer Government Tariffs Sewers Snowplow Navy Stadium "
+    "Church Politics Neighborhood Power Plant History Lessons Sport Weather Old Friend "
+    "Progress Decision Challenge Reality Cycles Era Solidarity Season Parade Presidency"
+).split()
+
+MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December"]
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+</Types>"""
+
+ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+DOC_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"></Relationships>"""
+
+
+def document_xml(paragraphs: list) -> str:
+    body = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(p)}</w:t></w:r></w:p>' for p in paragraphs
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}<w:sectPr/></w:body></w:document>"
+    )
+
+
+def write_docx(path: Path, paragraphs: list):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", CONTENT_TYPES)
+        z.writestr("_rels/.rels", ROOT_RELS)
+        z.writestr("word/_rels/document.xml.rels", DOC_RELS)
+        z.writestr("word/document.xml", document_xml(paragraphs))
+
+
+def synth_article(rng: random.Random, i: int):
+    title = " ".join(rng.choice(TITLE_WORDS) for _ in range(rng.randint(2, 5))) + f" {i}"
+    d = date(2015, 1, 1) + timedelta(days=rng.randrange(365 * 11))
+    header = [title, "Local Commentaries", f"{MONTHS[d.month - 1]} {d.day}, {d.year}", "Rolland Kidder"]
+
+    body = []
+    remaining = rng.randint(500, 900)
+    while remaining > 0:
+        n = min(remaining, rng.randint(40, 120))
+        words = [rng.choice(WORDS) for _ in range(n)]
+        words[0] = words[0].capitalize()
+        body.append(" ".join(words) + ".")
+        remaining -= n
+    return f"{title} ({d.isoformat()}).docx", header + body
+
+
+def generate(out_dir: Path, count: int, seed: int = 0) -> list:
+    """
+    Write `count` synthetic articles into out_dir (created if needed). Returns their paths.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        name, paragraphs = synth_article(rng, i)
+        path = out_dir / name
+        write_docx(path, paragraphs)
+        paths.append(path)
+    return paths
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--count", type=int, default=100)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    paths = generate(Path(args.out), args.count, args.seed)
+    print(f"Wrote {len(paths)} synthetic articles to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+archive_db.py — SQLite store for the article archive (process_articles.py --db)
+===============================================================================
+One database holds what is otherwise spread over data.json and state.json:
+
+- files:     archive file -> sha256, size, mtime_ns (the state.json entries)
+- articles:  one row per sourceFile (the data.json articles); text_hash indexed
+- metadata:  the raw LLM response each article was built from
+- errors:    per-run, per-file errors
+- runs:      one row per processor run (status, counts, start/finish times)
+
+Every file's outcome (state entry + article + metadata, or state entry + error)
+is committed in its own transaction, so a crashed run leaves each file either
+fully recorded or not at all; data.json and state.json are exports of the db.
+Renames are found through the indexed files.hash column.
+
+  python3 scripts/archive_db.py export --db site/archive.db --output site/data.json
+  python3 scripts/archive_db.py runs --db site/archive.db
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from article_store import content_hash
+from json_stream import peak_rss_bytes, write_json_stream
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    size INTEGER,
+    mtime_ns INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_hash ON files(hash);
+
+CREATE TABLE IF NOT EXISTS articles (
+    source_file TEXT PRIMARY KEY,
+    title TEXT,
+    date TEXT,
+    date_iso TEXT,
+    date_source TEXT,
+    summary TEXT,
+    topics TEXT,
+    word_count INTEGER,
+    text TEXT,
+    text_hash TEXT,
+    updated_at TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS articles_text_hash ON articles(text_hash);
+
+CREATE TABLE IF NOT EXISTS metadata (
+    source_file TEXT PRIMARY KEY,
+    model TEXT,
+    meta TEXT NOT NULL,
+    updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    status TEXT NOT NULL,
+    processed INTEGER DEFAULT 0,
+    updated INTEGER DEFAULT 0,
+    renamed INTEGER DEFAULT 0,
+    pruned INTEGER DEFAULT 0,
+    errors INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS errors (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    source_file TEXT NOT NULL,
+    error TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS errors_run ON errors(run_id);
+"""
+
+# Article key <-> column, in data.json key order (see build_article)
+ARTICLE_COLUMNS = (
+    ("sourceFile", "source_file"),
+    ("title", "title"),
+    ("date", "date"),
+    ("dateISO", "date_iso"),
+    ("dateSource", "date_source"),
+    ("summary", "summary"),
+    ("topics", "topics"),
+    ("wordCount", "word_count"),
+    ("text", "text"),
+    ("updatedAt", "updated_at"),
+)
+KNOWN_KEYS = {k for k, _ in ARTICLE_COLUMNS}
+
+
+def now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def entry_values(name: str, entry) -> tuple:
+    if isinstance(entry, dict):
+        return name, entry.get("hash", ""), entry.get("size"), entry.get("mtime_ns")
+    return name, entry or "", None, None
+
+
+def article_values(article: dict) -> tuple:
+    values = []
+    for key, _ in ARTICLE_COLUMNS:
+        v = article.get(key)
+        values.append(json.dumps(v, ensure_ascii=False) if key == "topics" and v is not None else v)
+    extra = {k: v for k, v in article.items() if k not in KNOWN_KEYS}
+    values.insert(9, content_hash(article.get("text")))
+    values.append(json.dumps(extra, ensure_ascii=False) if extra else None)
+    return tuple(values)
+
+
+def row_article(row: sqlite3.Row) -> dict:
+    article = {}
+    for key, col in ARTICLE_COLUMNS:
+        v = row[col]
+        if v is None:
+            continue
+        article[key] = json.loads(v) if key == "topics" else v
+    if row["extra"]:
+        article.update(json.loads(row["extra"]))
+    return article
+
+
+class ArchiveDB:
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(str(path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def is_empty(self) -> bool:
+        return (self.conn.execute("SELECT 1 FROM files LIMIT 1").fetchone() is None
+                and self.conn.execute("SELECT 1 FROM articles LIMIT 1").fetchone() is None)
+
+    # --- loading / export -------------------------------------------------
+
+    def load_state(self) -> dict:
+        files = {}
+        for row in self.conn.execute("SELECT name, hash, size, mtime_ns FROM files ORDER BY name"):
+            if row["size"] is None:
+                files[row["name"]] = row["hash"]
+            else:
+                files[row["name"]] = {"hash": row["hash"], "size": row["size"], "mtime_ns": row["mtime_ns"]}
+        return {"files": files}
+
+    def iter_articles(self):
+        for row in self.conn.execute("SELECT * FROM articles ORDER BY rowid"):
+            yield row_article(row)
+
+    def iter_export(self):
+        """
+        Articles in data.json order (newest first, then title; see article_store.sort_key),
+        one row at a time.
+        """
+        for row in self.conn.execute("SELECT * FROM articles "
+                                     "ORDER BY COALESCE(date, '') DESC, COALESCE(title, '') DESC, rowid"):
+            yield row_article(row)
+
+    def export_articles(self) -> list:
+        return list(self.iter_export())
+
+    # --- writes (one transaction each) ------------------------------------
+
+    def import_snapshot(self, state: dict, articles: list):
+        """
+        Seed an empty db from state.json + data.json contents.
+        """
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                                  [entry_values(n, e) for n, e in (state.get("files") or {}).items()])
+            self.conn.executemany("INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  [article_values(a) for a in articles if a.get("sourceFile")])
+
+    def record_file(self, name: str, entry, article: dict = None, meta: dict = None, model: str = "",
+                    error: str = None, run_id: int = None):
+        """
+        Commit one file's outcome: its state entry plus either its article (+ LLM metadata)
+        or an error, atomically.
+        """
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", entry_values(name, entry))
+            if article is not None:
+                self.conn.execute("INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  article_values(article))
+            if meta is not None:
+                self.conn.execute("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?)",
+                                  (name, model, json.dumps(meta, ensure_ascii=False), now()))
+            if error is not None and run_id is not None:
+                self.conn.execute("INSERT INTO errors VALUES (?, ?, ?)", (run_id, name, error))
+
+    def rename(self, old: str, new: str, entry, article: dict = None):
+        with self.conn:
+            self.conn.execute("DELETE FROM files WHERE name = ?", (old,))
+            self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", entry_values(new, entry))
+            self.conn.execute("DELETE FROM articles WHERE source_file = ?", (old,))
+            if article is not None:
+                self.conn.execute("INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  article_values(article))
+            self.conn.execute("UPDATE OR REPLACE metadata SET source_file = ? WHERE source_file = ?", (new, old))
+
+    def prune(self, keep_names) -> int:
+        """
+        Drop files/articles/metadata rows whose name isn't in keep_names. Returns articles removed.
+        """
+        keep = set(keep_names)
+        gone_files = [r[0] for r in self.conn.execute("SELECT name FROM files") if r[0] not in keep]
+        gone_articles = [r[0] for r in self.conn.execute("SELECT source_file FROM articles") if r[0] not in keep]
+        with self.conn:
+            self.conn.executemany("DELETE FROM files WHERE name = ?", [(n,) for n in gone_files])
+            self.conn.executemany("DELETE FROM articles WHERE source_file = ?", [(n,) for n in gone_articles])
+            self.conn.executemany("DELETE FROM metadata WHERE source_file = ?", [(n,) for n in gone_articles])
+        return len(gone_articles)
+
+    def clear_articles(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM articles")
+
+    # --- runs --------------------------------------------------------------
+
+    def unfinished_runs(self) -> list:
+        return [dict(r) for r in self.conn.execute("SELECT * FROM runs WHERE status = 'running' ORDER BY id")]
+
+    def begin_run(self) -> int:
+        with self.conn:
+            # Anything still 'running' was interrupted
+            self.conn.execute("UPDATE runs SET status = 'interrupted' WHERE status = 'running'")
+            cur = self.conn.execute("INSERT INTO runs (started_at, status) VALUES (?, 'running')", (now(),))
+        return cur.lastrowid
+
+    def finish_run(self, run_id: int, counts: dict, status: str = "ok"):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE runs SET finished_at = ?, status = ?, processed = ?, updated = ?, renamed = ?, "
+                "pruned = ?, errors = ? WHERE id = ?",
+                (now(), status, counts.get("processed", 0), counts.get("updated", 0), counts.get("renamed", 0),
+                 counts.get("pruned", 0), counts.get("errors", 0), run_id),
+            )
+
+    def run_errors(self, run_id: int) -> list:
+        return [{"file": r["source_file"], "error": r["error"]}
+                for r in self.conn.execute("SELECT source_file, error FROM errors WHERE run_id = ? ORDER BY rowid",
+                                           (run_id,))]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("command", choices=["export", "runs"])
+    ap.add_argument("--db", default="site/archive.db")
+    ap.add_argument("--output", default="site/data.json", help="export: data.json path to write")
+    ap.add_argument("--compact", action="store_true", help="export: no indentation (smaller, same content)")
+    args = ap.parse_args()
+
+    db_path = Path(args.db).expanduser()
+    if not db_path.exists():
+        print(f"ERROR: Database not found: {db_path}")
+        sys.exit(1)
+    db = ArchiveDB(db_path)
+
+    if args.command == "runs":
+        for r in db.conn.execute("SELECT * FROM runs ORDER BY id DESC LIMIT 20"):
+            print(f"#{r['id']:<5} {r['started_at']}  {r['status']:<11} processed={r['processed']} "
+                  f"updated={r['updated']} renamed={r['renamed']} pruned={r['pruned']} errors={r['errors']}")
+        return
+
+    last = db.conn.execute("SELECT id FROM runs WHERE status = 'ok' ORDER BY id DESC LIMIT 1").fetchone()
+    out = Path(args.output).expanduser()
+    export = write_json_stream(out, {"generatedAt": now()}, "articles", db.iter_export(),
+                               {"errors": db.run_errors(last["id"]) if last else []}, args.compact)
+    print(f"Exported {export['items']} articles to {out} ({export['bytes']} bytes, "
+          f"peak RSS {peak_rss_bytes() / 2**20:.1f} MB)" + ("" if export["changed"] else " (unchanged, not rewritten)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+archive_index.py — persistent content index of the article archive
+===================================================================
+Maps every .docx in the archive folder to two hashes, so email_ingest.py can
+tell an incoming attachment is already there without reading the archive:
+
+- hash:     sha256 of the file bytes (as in state.json)
+- textHash: sha256 of its normalized text, which also matches the same
+            article re-saved or re-exported (different zip bytes) and sent
+            under another filename
+
+One JSON file (default: site/archive_index.json, next to state.json):
+
+  {"version": 1, "files": {"<name>": {"hash", "textHash", "size"}}}
+
+- Lookups are dict hits (hash -> name, textHash -> name), built at load
+- sync() reconciles the index with the folder from one directory scan: only
+  new files and files whose size changed are read and hashed. mtimes aren't
+  used (nor stored) since a fresh git checkout touches every file, and the
+  index is committed along with the archive
+- add() records a file just written, so the next attachment in the same run
+  is checked against it too
+"""
+
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+
+from atomic_io import atomic_write_text
+from docx_native import extract_docx_text
+from text_normalize import normalize_text
+
+INDEX_VERSION = 1
+
+
+def text_hash(data: bytes) -> str:
+    """
+    sha256 of a .docx's normalized text ("" if it has none, so empty or unreadable files never match).
+    """
+    text = normalize_text(extract_docx_text(io.BytesIO(data)))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest() if text else ""
+
+
+def content_entry(data: bytes) -> dict:
+    return {"hash": hashlib.sha256(data).hexdigest(), "textHash": text_hash(data)}
+
+
+class ArchiveIndex:
+    def __init__(self, path, folder: Path):
+        self.path = path
+        self.folder = folder
+        self.files = {}
+        self._by_hash = {}
+        self._by_text = {}
+        self._dirty = False
+
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("version") == INDEX_VERSION:
+                    self.files = data.get("files", {})
+            except Exception:
+                self.files = {}
+        self._rebuild()
+
+    def __len__(self):
+        return len(self.files)
+
+    def _rebuild(self):
+        self._by_hash.clear()
+        self._by_text.clear()
+        for name in sorted(self.files):
+            self._link(name, self.files[name])
+
+    def _link(self, name: str, entry: dict):
+        self._by_hash.setdefault(entry.get("hash"), name)
+        if entry.get("textHash"):
+            self._by_text.setdefault(entry["textHash"], name)
+
+    def sync(self) -> dict:
+        """
+        Bring the index in line with the folder. Returns {"hashed", "removed"} counts.
+        """
+        seen = set()
+        hashed = 0
+        with os.scandir(self.folder) as it:
+            for de in it:
+                if not de.name.lower().endswith(".docx") or not de.is_file():
+                    continue
+                seen.add(de.name)
+                size = de.stat().st_size
+                entry = self.files.get(de.name)
+                if entry and entry.get("size") == size:
+                    continue
+                data = Path(de.path).read_bytes()
+                self.files[de.name] = dict(content_entry(data), size=len(data))
+                hashed += 1
+        removed = [name for name in self.files if name not in seen]
+        for name in removed:
+            del self.files[name]
+        if hashed or removed:
+            self._dirty = True
+            self._rebuild()
+        return {"hashed": hashed, "removed": len(removed)}
+
+    def match(self, data: bytes):
+        """
+        (existing name, "bytes" | "text", entry) for attachment bytes already in the archive,
+        or (None, None, entry). Pass the entry on to add() if the attachment gets saved.
+        """
+        entry = content_entry(data)
+        name = self._by_hash.get(entry["hash"])
+        if name:
+            return name, "bytes", entry
+        name = self._by_text.get(entry["textHash"]) if entry["textHash"] else None
+        if name:
+            return name, "text", entry
+        return None, None, entry
+
+    def add(self, path: Path, entry: dict):
+        entry = dict(entry, size=path.stat().st_size)
+        self.files[path.name] = entry
+        self._link(path.name, entry)
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty or self.path is None:
+            return
+        payload = {"version": INDEX_VERSION, "files": {k: self.files[k] for k in sorted(self.files)}}
+        atomic_write_text(self.path, json.dumps(payload, ensure_ascii=False, indent=1))
+        self._dirty = False
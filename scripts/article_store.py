@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+article_store.py — indexed in-memory view of the data.json articles list
+========================================================================
+- Keyed by sourceFile (one entry per file; later upserts replace earlier ones)
+- Secondary index: sha256 of article text -> sourceFile
+- Stable export order: newest date first, then title (same as the dashboard default)
+
+Replaces the linear "find my sourceFile" scans and the separate dedup pass,
+so loading, upserting and pruning are O(1) per article.
+"""
+
+import hashlib
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def sort_key(article: dict):
+    return (article.get("date") or "", article.get("title") or "")
+
+
+class ArticleStore:
+    def __init__(self, articles=()):
+        self._by_source = {}
+        self._by_content = {}
+        self._hashes = {}
+        for a in articles:
+            self.upsert(a)
+
+    @classmethod
+    def from_payload(cls, data):
+        """
+        Accepts a data.json payload ({"articles": [...]}) or a bare list of articles.
+        """
+        if isinstance(data, dict):
+            data = data.get("articles", [])
+        return cls(data if isinstance(data, list) else [])
+
+    def __len__(self):
+        return len(self._by_source)
+
+    def __contains__(self, source_file: str):
+        return source_file in self._by_source
+
+    def __iter__(self):
+        return iter(self._by_source.values())
+
+    def get(self, source_file: str):
+        return self._by_source.get(source_file)
+
+    def text_hash(self, source_file: str):
+        return self._hashes.get(source_file)
+
+    def find_by_content(self, text_hash: str):
+        """
+        Article whose text hashes to text_hash (see content_hash), or None.
+        """
+        sf = self._by_content.get(text_hash)
+        return self._by_source.get(sf) if sf else None
+
+    def upsert(self, article: dict) -> bool:
+        """
+        Insert or replace by sourceFile. Returns True if it was a new entry.
+        Articles without a sourceFile are ignored (they can't be tracked or pruned).
+        """
+        sf = article.get("sourceFile")
+        if not sf:
+            return False
+        is_new = sf not in self._by_source
+        if not is_new:
+            self._unindex(sf)
+        h = content_hash(article.get("text"))
+        self._by_source[sf] = article
+        self._by_content[h] = sf
+        self._hashes[sf] = h
+        return is_new
+
+    def remove(self, source_file: str):
+        self._unindex(source_file)
+        return self._by_source.pop(source_file, None)
+
+    def prune(self, keep_names) -> int:
+        """
+        Drop every article whose sourceFile is not in keep_names. Returns count removed.
+        """
+        gone = [sf for sf in self._by_source if sf not in keep_names]
+        for sf in gone:
+            self.remove(sf)
+        return len(gone)
+
+    def rename(self, old_name: str, new_name: str) -> bool:
+        """
+        Move an article to a new sourceFile (no-op if old is missing or new is taken).
+        """
+        if old_name not in self._by_source or new_name in self._by_source:
+            return False
+        article = self.remove(old_name)
+        article["sourceFile"] = new_name
+        self.upsert(article)
+        return True
+
+    def export(self) -> list:
+        return sorted(self._by_source.values(), key=sort_key, reverse=True)
+
+    def _unindex(self, source_file: str):
+        h = self._hashes.pop(source_file, None)
+        if h is not None and self._by_content.get(h) == source_file:
+            del self._by_content[h]
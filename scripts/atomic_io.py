@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+atomic_io.py — crash-safe, change-aware file writes
+===================================================
+- atomic_write_text() / atomic_write_bytes() / atomic_write_chunks(): temp
+  file in the same folder + fsync + os.replace, so a reader (or an interrupted
+  run) only ever sees the old file or the new one, never a truncated mix
+- write_json_if_changed(): skips the write entirely when the new payload only
+  differs from what's on disk in timestamp fields (generatedAt / updatedAt)
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+TIMESTAMP_KEYS = ("generatedAt", "updatedAt")
+
+
+def atomic_write_text(path: Path, text: str):
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    atomic_write_chunks(path, [data])
+
+
+def atomic_write_chunks(path: Path, chunks, keep=None) -> bool:
+    """
+    Stream byte chunks into a temp file next to path, then rename it over path.
+    keep, if given, is called once every chunk is written; returning False discards
+    the temp file and leaves path untouched. Returns True if path was replaced.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        if keep is not None and not keep():
+            os.unlink(tmp)
+            return False
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+    # Persist the rename itself (no-op where directories can't be opened, e.g. Windows)
+    try:
+        dfd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dfd)
+        finally:
+            os.close(dfd)
+    except OSError:
+        pass
+    return True
+
+
+def strip_keys(obj, keys=TIMESTAMP_KEYS):
+    if isinstance(obj, dict):
+        return {k: strip_keys(v, keys) for k, v in obj.items() if k not in keys}
+    if isinstance(obj, list):
+        return [strip_keys(v, keys) for v in obj]
+    return obj
+
+
+def dump_json(data, compact: bool = False) -> str:
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def write_json_if_changed(path: Path, data, compact: bool = False, ignore_keys=TIMESTAMP_KEYS) -> bool:
+    """
+    Atomically write data as JSON unless the file already holds the same payload
+    (ignoring ignore_keys anywhere in the tree). Returns True if the file was written.
+    """
+    text = dump_json(data, compact)
+    if path.exists():
+        try:
+            old_text = path.read_text(encoding="utf-8")
+            if old_text == text:
+                return False
+            if ignore_keys and strip_keys(json.loads(old_text), ignore_keys) == strip_keys(data, ignore_keys):
+                return False
+        except (OSError, ValueError):
+            pass
+    atomic_write_text(path, text)
+    return True
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+batch_jsonl.py — OpenAI Batch API request/result files
+======================================================
+- write_batch(): one line per deferred inference request, in the Batch API
+  input format ({"custom_id", "method", "url", "body"})
+- read_results(): parses a Batch API output (or error) file back into
+  cache key -> metadata, plus per-file errors
+
+custom_id is "<llm cache key>:<sourceFile>". The key is the same content hash
+the LLM cache uses (model + prompt version + text sent), so collected results
+drop straight into the cache and only apply to a file whose text still matches.
+"""
+
+import json
+from pathlib import Path
+
+from atomic_io import atomic_write_text
+
+BATCH_URL = "/v1/chat/completions"
+
+
+def make_custom_id(source_file: str, key: str) -> str:
+    return f"{key}:{source_file}"
+
+
+def parse_custom_id(custom_id: str):
+    """
+    Returns (key, source_file). Keys are hex, so the first ":" is the separator.
+    """
+    key, _, source_file = (custom_id or "").partition(":")
+    return key, source_file
+
+
+def write_batch(path: Path, requests: list) -> int:
+    """
+    requests: [(source_file, key, body), ...]. Writes the batch file atomically and
+    returns its size in bytes.
+    """
+    lines = []
+    for source_file, key, body in requests:
+        lines.append(json.dumps({
+            "custom_id": make_custom_id(source_file, key),
+            "method": "POST",
+            "url": BATCH_URL,
+            "body": body,
+        }, ensure_ascii=False))
+    text = "".join(line + "\n" for line in lines)
+    atomic_write_text(path, text)
+    return len(text.encode("utf-8"))
+
+
+def result_meta(line: dict):
+    """
+    Metadata dict from one output line, or raises ValueError describing why not.
+    """
+    if line.get("error"):
+        err = line["error"]
+        raise ValueError(err.get("message") if isinstance(err, dict) else str(err))
+    response = line.get("response") or {}
+    status = response.get("status_code")
+    if status != 200:
+        raise ValueError(f"HTTP {status}")
+    content = response["body"]["choices"][0]["message"]["content"].strip()
+    meta = json.loads(content)
+    if not isinstance(meta, dict):
+        raise ValueError("response is not a JSON object")
+    return meta
+
+
+def read_results(path: Path):
+    """
+    Returns ({cache key: meta}, [{"file", "error"}, ...]) for a Batch API output file.
+    """
+    metas = {}
+    errors = []
+    with path.open("r", encoding="utf-8") as f:
+        for n, raw in enumerate(f, start=1):
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                line = json.loads(raw)
+            except ValueError:
+                errors.append({"file": f"{path.name}:{n}", "error": "invalid JSON line"})
+                continue
+            key, source_file = parse_custom_id(line.get("custom_id"))
+            try:
+                metas[key] = result_meta(line)
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                errors.append({"file": source_file or f"{path.name}:{n}", "error": f"batch result: {e}"})
+    return metas, errors
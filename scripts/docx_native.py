@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+docx_native.py — lightweight streaming .docx -> plain text
+==========================================================
+Opens the .docx zip and stream-parses word/document.xml with iterparse,
+emitting text as it goes and clearing finished elements so memory stays
+flat regardless of document size. No pandoc subprocess, no python-docx
+object model.
+
+Output is shaped like `pandoc -t plain --wrap=none`:
+- one paragraph per block, separated by a blank line
+- <w:tab/> -> tab, <w:br/> / <w:cr/> -> newline
+- deleted (tracked-change) text and field instructions are skipped
+
+  python3 scripts/docx_native.py "KIDDER_ARTICLE_ARCHIVES/Some Article.docx"
+"""
+
+import sys
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+WP = "{http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing}"
+
+T_TAG = W + "t"
+P_TAG = W + "p"
+R_TAG = W + "r"
+TAB_TAG = W + "tab"
+BR_TAG = W + "br"
+CR_TAG = W + "cr"
+NBH_TAG = W + "noBreakHyphen"
+TBL_TAG = W + "tbl"
+NUMPR_TAG = W + "numPr"
+VERTALIGN_TAG = W + "vertAlign"
+DOCPR_TAG = WP + "docPr"
+VAL_ATTR = W + "val"
+# Subtrees whose text pandoc drops from plain output (tracked deletions)
+SKIP_TAGS = {W + "del", W + "moveFrom"}
+
+
+def iter_paragraphs(docx_path: Path):
+    """
+    Yield the text of each body paragraph (possibly empty) in document order.
+
+    Mirrors the bits of pandoc's docx reader that show up in our archive:
+    superscript runs become ^(...), images become [alt text] and numbered
+    paragraphs get pandoc's "-   " list marker (our archive only has bullets).
+    """
+    with zipfile.ZipFile(docx_path) as z:
+        with z.open("word/document.xml") as f:
+            buf = []
+            skip_depth = 0
+            in_run = False
+            run_sup = False
+            is_list = False
+            sup_open = False
+
+            def emit(text: str, sup: bool = False):
+                nonlocal sup_open
+                if sup and not sup_open:
+                    buf.append("^(")
+                elif sup_open and not sup:
+                    buf.append(")")
+                sup_open = sup
+                buf.append(text)
+
+            for event, elem in ET.iterparse(f, events=("start", "end")):
+                tag = elem.tag
+                if event == "start":
+                    if tag in SKIP_TAGS:
+                        skip_depth += 1
+                    elif tag == R_TAG:
+                        in_run, run_sup = True, False
+                    continue
+
+                if tag in SKIP_TAGS:
+                    skip_depth -= 1
+                elif skip_depth:
+                    pass
+                elif tag == R_TAG:
+                    in_run = False
+                elif in_run and tag == VERTALIGN_TAG:
+                    run_sup = elem.get(VAL_ATTR) == "superscript"
+                elif tag == NUMPR_TAG:
+                    is_list = True
+                elif tag == T_TAG:
+                    if elem.text:
+                        emit(elem.text, run_sup)
+                elif tag == TAB_TAG:
+                    # <w:tab/> inside <w:pPr><w:tabs> is a tab-stop definition, not text;
+                    # those carry a w:val attribute while run-level tabs do not.
+                    if VAL_ATTR not in elem.attrib:
+                        emit("\t")
+                elif tag == BR_TAG or tag == CR_TAG:
+                    emit("\n")
+                elif tag == NBH_TAG:
+                    emit("-", run_sup)
+                elif tag == DOCPR_TAG:
+                    alt = elem.get("descr") or ""
+                    if alt:
+                        emit(f"[{alt}]")
+                elif tag == P_TAG:
+                    emit("")
+                    # Strip ASCII whitespace only: pandoc keeps paragraphs that hold just a nbsp
+                    text = "".join(buf).strip(" \t\r\n")
+                    yield ("-   " + text) if is_list else text
+                    buf = []
+                    is_list = False
+                    elem.clear()
+                elif tag == TBL_TAG:
+                    elem.clear()
+
+
+def extract_docx_text(docx_path: Path) -> str:
+    """
+    Plain text of a .docx, paragraphs separated by blank lines.
+    Returns "" on unreadable/corrupt files (same contract as the other extractors).
+    """
+    try:
+        paras = list(iter_paragraphs(docx_path))
+    except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError):
+        return ""
+    return "\n\n".join(p for p in paras if p)
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:]:
+        print(extract_docx_text(Path(arg)))
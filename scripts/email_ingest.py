@@ -1,23 +1,61 @@
 #!/usr/bin/env python3
+"""
+email_ingest.py — save .docx attachments from the Kidder mailbox
+================================================================
+- Remembers the mailbox's UIDVALIDITY and the highest UID ingested
+  (site/imap_checkpoint.json, see imap_checkpoint.py), so each run searches
+  UID n+1:* only (plus any --search criteria) and skips the search entirely
+  when SELECT's UIDNEXT says nothing arrived. Reading mail in the mailbox
+  doesn't hide it from the pipeline. A changed UIDVALIDITY means a full
+  rescan; without a checkpoint the first run takes the UNSEEN messages, as
+  before. --no-checkpoint searches --search (UNSEEN by default) every run
+- Fetches only each new message's BODYSTRUCTURE and Subject/From headers
+  first, --batch messages per UID FETCH over a message set ("1:40,42,45:90")
+- Only the .docx attachment sections are then fetched (BODY.PEEK[<part>]), so
+  message bodies, inline images, signatures and other attachments never cross
+  the wire; forwarded mails (message/rfc822 parts) are searched too. Messages
+  whose .docx sit at the same part numbers share a UID FETCH (up to --batch
+  messages / --batch-mb of attachments)
+- Attachments land in --folder as "Name.docx", "Name (2).docx", ...
+- ...unless the archive already holds the same bytes or the same text under
+  any name (site/archive_index.json, see archive_index.py): such duplicates
+  are reported and skipped (--keep-duplicates saves them anyway, --no-dedup
+  turns the check off)
+- Every message looked at is marked \\Seen afterwards (one UID STORE per
+  batch), as fetching RFC822 used to do implicitly; the checkpoint only moves
+  past messages that were fully handled
+- Optional --idle stays connected: after the first pass it waits in IMAP IDLE
+  and ingests each new mail the moment the server announces it, re-issuing
+  IDLE every --idle-timeout seconds and reconnecting (with backoff) whenever
+  the connection drops. --process then runs process_articles.py --resume
+  (plus --process-args) right after attachments are saved
+
+Exit codes: 0 = no new attachments, 8 = attachments saved, 2 = no credentials.
+(--idle runs until Ctrl-C and exits 0.)
+
+  KIDDER_GMAIL_USER=... KIDDER_GMAIL_APP_PASSWORD=... python3 scripts/email_ingest.py
+  python3 scripts/email_ingest.py --imap-host 127.0.0.1 --imap-port 1143 --no-ssl   # bench/fake_imap.py
+  python3 scripts/email_ingest.py --idle --process --process-args "--prune --manifest --search-index"
+"""
+
 import argparse
 import email
 import imaplib
 import os
 import re
+import shlex
+import subprocess
 import sys
-from email.header import decode_header
+import time
 from pathlib import Path
 
+from archive_index import ArchiveIndex
+from imap_checkpoint import Checkpoint
+from imap_fetch import decode_mime_words, decode_part, docx_parts, message_set, parse_fetch
+from imap_idle import IdleError, idle_wait
 
-def decode_mime_words(s: str) -> str:
-    parts = decode_header(s)
-    out = ""
-    for text, enc in parts:
-        if isinstance(text, bytes):
-            out += text.decode(enc or "utf-8", errors="ignore")
-        else:
-            out += text
-    return out
+HEADERS = "BODY.PEEK[HEADER.FIELDS (SUBJECT FROM)]"
+RECONNECT_MIN, RECONNECT_MAX = 1.0, 300.0
 
 
 def safe_filename(name: str) -> str:
@@ -27,97 +65,317 @@ def safe_filename(name: str) -> str:
     return name[:180] if len(name) > 180 else name
 
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--folder", default="KIDDER_ARTICLE_ARCHIVES")
-    ap.add_argument("--imap-host", default="imap.gmail.com")
-    ap.add_argument("--mailbox", default="INBOX")
-    ap.add_argument("--search", default="UNSEEN")  # could be 'UNSEEN SUBJECT "Article"' etc.
-    args = ap.parse_args()
+def unique_target(out_dir: Path, name: str) -> Path:
+    target = out_dir / name
+    if target.exists():
+        stem = target.stem
+        suffix = target.suffix
+        n = 2
+        while True:
+            alt = out_dir / f"{stem} ({n}){suffix}"
+            if not alt.exists():
+                target = alt
+                break
+            n += 1
+    return target
 
-    user = os.getenv("KIDDER_GMAIL_USER", "")
-    app_pass = os.getenv("KIDDER_GMAIL_APP_PASSWORD", "")
 
-    if not user or not app_pass:
-        print("ERROR: Missing env vars KIDDER_GMAIL_USER and/or KIDDER_GMAIL_APP_PASSWORD")
-        sys.exit(2)
+def chunked(items: list, size: int):
+    for i in range(0, len(items), max(1, size)):
+        yield items[i:i + size]
 
-    out_dir = Path(args.folder)
-    out_dir.mkdir(parents=True, exist_ok=True)
 
-    M = imaplib.IMAP4_SSL(args.imap_host)
+def parse_batch(data, uids: list) -> dict:
+    """
+    parse_fetch(data, by_uid=True), or {} (logged) when the server's reply doesn't parse:
+    the batch's messages are then left unhandled for the next poll instead of ending the run.
+    """
     try:
-        M.login(user, app_pass)
-        M.select(args.mailbox)
+        return parse_fetch(data, by_uid=True)
+    except ValueError as e:
+        print(f"FETCH: {e}; leaving UID(s) {message_set(uids)} for the next poll")
+        return {}
 
-        typ, data = M.search(None, args.search)
+
+def fetch_structures(M, uids: list, batch: int) -> dict:
+    """
+    {uid: (subject, sender, docx parts)}: BODYSTRUCTURE + Subject/From for `batch` messages
+    per UID FETCH. Messages in a failed or unparseable FETCH are left out.
+    """
+    found = {}
+    for chunk in chunked(uids, batch):
+        typ, data = M.uid("FETCH", message_set(chunk), f"(UID BODYSTRUCTURE {HEADERS})")
         if typ != "OK":
-            print("No new emails.")
-            sys.exit(0)
+            continue
+        for uid, items in parse_batch(data, chunk).items():
+            if "BODYSTRUCTURE" not in items:
+                continue
+            header = next((v for k, v in items.items() if k.startswith("BODY[HEADER")), None) or b""
+            msg = email.message_from_bytes(header if isinstance(header, bytes) else header.encode("utf-8"))
+            found[uid] = (decode_mime_words(msg.get("Subject", "") or ""),
+                          decode_mime_words(msg.get("From", "") or ""),
+                          docx_parts(items["BODYSTRUCTURE"]))
+    return found
 
-        ids = data[0].split()
-        if not ids:
-            print("No new emails.")
-            sys.exit(0)
 
-        saved_any = False
+def section_batches(found: dict, batch: int, batch_bytes: int):
+    """
+    (sections, uids) per UID FETCH of attachment bodies. A FETCH names the same sections for
+    every message in its set, so messages are grouped by their list of .docx sections, then
+    split to stay under `batch` messages and `batch_bytes` of (encoded) attachments.
+    """
+    groups = {}
+    for uid in sorted(found):
+        parts = found[uid][2]
+        if parts:
+            groups.setdefault(tuple(p["section"] for p in parts), []).append(uid)
+    for sections, uids in groups.items():
+        current, size = [], 0
+        for uid in uids:
+            n = sum(p["size"] for p in found[uid][2])
+            if current and (len(current) >= batch or size + n > batch_bytes):
+                yield sections, current
+                current, size = [], 0
+            current.append(uid)
+            size += n
+        if current:
+            yield sections, current
 
-        for msg_id in ids:
-            typ, msg_data = M.fetch(msg_id, "(RFC822)")
-            if typ != "OK":
+
+def ingest(M, uids: list, out_dir: Path, batch: int = 200, batch_bytes: int = 32 * 2**20, index=None,
+           keep_duplicates: bool = False):
+    """
+    Save the .docx attachments of the given messages (UIDs) into out_dir; returns the paths
+    written and the UIDs fully handled (a failed or unparseable FETCH leaves its messages out). Round trips
+    grow with batches, not messages: structures `batch` messages at a time, attachment
+    sections grouped (see section_batches()), and one UID STORE per batch.
+    With an ArchiveIndex, attachments already in the archive (same bytes or same text) are
+    skipped, or saved anyway and reported with keep_duplicates.
+    """
+    found = fetch_structures(M, uids, batch)
+    if index is not None and any(parts for _, _, parts in found.values()):
+        synced = index.sync()
+        if synced["hashed"] or synced["removed"]:
+            print(f"Index: {synced['hashed']} file(s) hashed, {synced['removed']} removed, {len(index)} in archive")
+
+    bodies = {}
+    for sections, chunk in section_batches(found, batch, batch_bytes):
+        items = " ".join(f"BODY.PEEK[{s}]" for s in sections)
+        typ, data = M.uid("FETCH", message_set(chunk), f"(UID {items})")
+        if typ != "OK":
+            continue
+        bodies.update(parse_batch(data, chunk))
+
+    saved = []
+    done = []
+    for uid in sorted(found):
+        subj, sender, parts = found[uid]
+        if parts and uid not in bodies:
+            continue
+        for p in parts:
+            payload = decode_part(bodies[uid].get(f"BODY[{p['section']}]"), p["encoding"])
+            if not payload:
                 continue
+            entry = None
+            if index is not None:
+                dup, how, entry = index.match(payload)
+                if dup:
+                    print(f"Email: {subj}")
+                    print(f"From:  {sender}")
+                    print(f"  Duplicate of {dup} (same {how}): {p['filename']} "
+                          + ("saved anyway" if keep_duplicates else "skipped"))
+                    if not keep_duplicates:
+                        continue
+            target = unique_target(out_dir, safe_filename(Path(p["filename"]).name))
+            target.write_bytes(payload)
+            if entry is not None:
+                index.add(target, entry)
+            print(f"Email: {subj}")
+            print(f"From:  {sender}")
+            print(f"  Saved: {target}")
+            saved.append(target)
+        done.append(uid)
+
+    if index is not None:
+        index.save()
+
+    # BODY.PEEK leaves the flags alone; mark them read as RFC822 did (and for --no-checkpoint)
+    for chunk in chunked(done, batch):
+        M.uid("STORE", message_set(chunk), "+FLAGS.SILENT", "(\\Seen)")
+    return saved, done
+
 
-            raw = msg_data[0][1]
-            msg = email.message_from_bytes(raw)
+def connect(args):
+    if args.no_ssl:
+        return imaplib.IMAP4(args.imap_host, args.imap_port or imaplib.IMAP4_PORT)
+    return imaplib.IMAP4_SSL(args.imap_host, args.imap_port or imaplib.IMAP4_SSL_PORT)
 
-            subj = decode_mime_words(msg.get("Subject", "") or "")
-            sender = decode_mime_words(msg.get("From", "") or "")
 
-            saved_this_msg = False
+def select(M, mailbox: str) -> dict:
+    """
+    SELECT the mailbox; returns {"uidvalidity", "uidnext"} from its response codes (None if absent).
+    """
+    typ, data = M.select(mailbox)
+    if typ != "OK":
+        raise imaplib.IMAP4.error(f"SELECT {mailbox} failed: {data}")
+    selected = {}
+    for code in ("UIDVALIDITY", "UIDNEXT"):
+        _, value = M.response(code)
+        selected[code.lower()] = int(value[-1]) if value and value[-1] else None
+    return selected
 
-            for part in msg.walk():
-                cdisp = part.get("Content-Disposition", "") or ""
-                if "attachment" not in cdisp.lower():
-                    continue
 
-                filename = part.get_filename()
-                if not filename:
-                    continue
-                filename = decode_mime_words(filename)
+def search(M, criteria: str):
+    """
+    UID SEARCH; the UIDs found, or None if the server refused it.
+    """
+    typ, data = M.uid("SEARCH", None, criteria)
+    if typ != "OK":
+        return None
+    return [int(u) for u in data[0].split()] if data and data[0] else []
 
-                if not filename.lower().endswith(".docx"):
-                    continue
 
-                payload = part.get_payload(decode=True)
-                if not payload:
-                    continue
+def poll(M, args, out_dir: Path, index=None, checkpoint=None, selected=None):
+    """
+    One search + ingest on the selected mailbox: None when nothing matched, else the paths saved.
+    With a Checkpoint and select()'s result, only UIDs above the last one ingested are searched
+    for, and the checkpoint is moved up to the first message not fully handled.
+    """
+    ingest_args = (out_dir, args.batch, int(args.batch_mb * 2**20), index, args.keep_duplicates)
+    uidvalidity = selected.get("uidvalidity") if selected else None
+    if checkpoint is None or uidvalidity is None:
+        uids = search(M, args.search or "UNSEEN")
+        return ingest(M, uids, *ingest_args)[0] if uids else None
 
-                clean = safe_filename(Path(filename).name)
-                target = out_dir / clean
+    key = f"{args.imap_host}/{args.mailbox}"
+    # UIDNEXT is only current right after SELECT; later polls (--idle) just search
+    uidnext = selected.pop("uidnext", None)
+    last = checkpoint.last_uid(key, uidvalidity)
+    if last is None:
+        print(f"Checkpoint: none for {key} yet; starting from its UNSEEN messages")
+        criteria, last = "UNSEEN", 0
+    elif uidnext is not None and uidnext <= last + 1:
+        return None
+    else:
+        criteria = f"UID {last + 1}:*"
+    uids = search(M, f"{criteria} {args.search}".strip())
+    if uids is None:
+        return None
+    # "n+1:*" always includes the highest UID, even when that is n or lower
+    uids = [u for u in uids if u > last]
+    saved, done = ingest(M, uids, *ingest_args) if uids else ([], [])
 
-                if target.exists():
-                    stem = target.stem
-                    suffix = target.suffix
-                    n = 2
-                    while True:
-                        alt = out_dir / f"{stem} ({n}){suffix}"
-                        if not alt.exists():
-                            target = alt
-                            break
-                        n += 1
+    missed = sorted(set(uids) - set(done))
+    high = max([last, (uidnext or 1) - 1] + uids)
+    checkpoint.advance(key, uidvalidity, missed[0] - 1 if missed else high)
+    checkpoint.save()
+    return saved if uids else None
 
-                target.write_bytes(payload)
-                print(f"Email: {subj}")
-                print(f"From:  {sender}")
-                print(f"  Saved: {target}")
-                saved_any = True
-                saved_this_msg = True
 
-            if saved_this_msg:
-                M.store(msg_id, "+FLAGS", "\\Seen")
+def hand_off(args, saved: list):
+    """
+    Run process_articles.py over the archive right away (--process).
+    """
+    cmd = [sys.executable, str(Path(__file__).with_name("process_articles.py")),
+           "--folder", args.folder, "--resume"] + shlex.split(args.process_args)
+    print(f"Processing {len(saved)} new file(s): {' '.join(cmd[1:])}")
+    code = subprocess.run(cmd, check=False).returncode
+    # 0 = nothing updated, 8 = updated JSON
+    print(f"  process_articles.py exit code {code}" + ("" if code in (0, 8) else " (error)"))
+
+
+def run_idle(args, user: str, app_pass: str, out_dir: Path, index=None, checkpoint=None):
+    """
+    --idle: ingest what is there, then IDLE until the server announces new mail, and again.
+    Any connection problem (drop, BYE, timeout) means log, back off, reconnect; runs until Ctrl-C.
+    """
+    delay = 0.0
+    while True:
+        M = None
+        try:
+            M = connect(args)
+            M.login(user, app_pass)
+            selected = select(M, args.mailbox)
+            print(f"IDLE: watching {args.mailbox} on {args.imap_host}")
+            # A server hanging up on an idle client is routine: the first retry is immediate
+            delay = 0.0
+            while True:
+                saved = poll(M, args, out_dir, index, checkpoint, selected)
+                if saved and args.process:
+                    hand_off(args, saved)
+                idle_wait(M, args.idle_timeout)
+        except (OSError, imaplib.IMAP4.error, IdleError) as e:
+            print(f"IDLE: {type(e).__name__}: {e}; reconnecting in {delay:g}s")
+            time.sleep(delay)
+            delay = min(max(RECONNECT_MIN, delay * 2), RECONNECT_MAX)
+        finally:
+            if M is not None:
+                try:
+                    M.logout()
+                except Exception:
+                    pass
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--folder", default="KIDDER_ARTICLE_ARCHIVES")
+    ap.add_argument("--imap-host", default="imap.gmail.com")
+    ap.add_argument("--imap-port", type=int, default=0, help="Default: 993 (143 with --no-ssl)")
+    ap.add_argument("--no-ssl", action="store_true", help="Plain IMAP, e.g. for bench/fake_imap.py")
+    ap.add_argument("--mailbox", default="INBOX")
+    ap.add_argument("--search", default="",
+                    help='Extra search criteria, e.g. \'SUBJECT "Article"\' (default: none; UNSEEN with --no-checkpoint)')
+    ap.add_argument("--batch", type=int, default=200, help="Messages per UID FETCH / UID STORE")
+    ap.add_argument("--batch-mb", type=float, default=32, help="Attachment megabytes per UID FETCH")
+    ap.add_argument("--idle", action="store_true", help="Stay connected and ingest new mail as it arrives (IMAP IDLE)")
+    ap.add_argument("--idle-timeout", type=float, default=600, help="Re-issue IDLE after this many quiet seconds")
+    ap.add_argument("--process", action="store_true",
+                    help="With --idle: run process_articles.py --resume as soon as attachments are saved")
+    ap.add_argument("--process-args", type=str, default="",
+                    help='Extra process_articles.py arguments, e.g. "--prune --manifest --search-index"')
+    ap.add_argument("--index", type=str, default="site/archive_index.json",
+                    help="Content hash index of the archive, for skipping attachments already in it")
+    ap.add_argument("--checkpoint", type=str, default="site/imap_checkpoint.json",
+                    help="UIDVALIDITY + last UID ingested per mailbox; each run only looks at newer UIDs")
+    ap.add_argument("--no-checkpoint", action="store_true",
+                    help="Search the whole mailbox every run (--search, UNSEEN by default) as before")
+    ap.add_argument("--no-dedup", action="store_true", help="Save every attachment; don't read or write the index")
+    ap.add_argument("--keep-duplicates", action="store_true", help="Save duplicates anyway (still reported)")
+    args = ap.parse_args()
+
+    user = os.getenv("KIDDER_GMAIL_USER", "")
+    app_pass = os.getenv("KIDDER_GMAIL_APP_PASSWORD", "")
+
+    if not user or not app_pass:
+        print("ERROR: Missing env vars KIDDER_GMAIL_USER and/or KIDDER_GMAIL_APP_PASSWORD")
+        sys.exit(2)
+
+    out_dir = Path(args.folder)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index = None if args.no_dedup else ArchiveIndex(Path(args.index), out_dir)
+    checkpoint = None if args.no_checkpoint else Checkpoint(Path(args.checkpoint))
+
+    if args.idle:
+        # A daemon's output usually goes to a pipe or a log file
+        sys.stdout.reconfigure(line_buffering=True)
+        try:
+            run_idle(args, user, app_pass, out_dir, index, checkpoint)
+        except KeyboardInterrupt:
+            print("IDLE: stopped.")
+        sys.exit(0)
+
+    M = connect(args)
+    try:
+        M.login(user, app_pass)
+        selected = select(M, args.mailbox)
+
+        saved = poll(M, args, out_dir, index, checkpoint, selected)
+        if saved is None:
+            print("No new emails.")
+            sys.exit(0)
 
         # 0 = nothing new, 8 = new attachments saved
-        sys.exit(8 if saved_any else 0)
+        sys.exit(8 if saved else 0)
 
     finally:
         try:
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+extract_cache.py — persistent cache of extracted + normalized article text
+==========================================================================
+One gzip-compressed JSON file per docx content hash (sha256, as in state.json):
+
+  <root>/<hash[:2]>/<hash>.json.gz
+  {"<extractor>": {"version": "<extractor chain version>", "raw": "...",
+                   "norm": {"version": "<normalize version>", "text": "...",
+                            "wordCount": N, "dateFromText": "YYYY-MM-DD" | null}}}
+
+- Two version keys: a new extractor version re-extracts; a new normalize
+  version only re-normalizes the cached raw text (no docx parsing)
+- Keyed by file bytes, so renamed/copied files hit too
+- Safe across the --extract-workers processes: entries are separate files,
+  each written atomically
+"""
+
+import gzip
+import json
+from pathlib import Path
+
+from atomic_io import atomic_write_bytes
+
+
+class ExtractCache:
+    def __init__(self, root: Path):
+        self.root = root
+
+    def _path(self, file_hash: str) -> Path:
+        return self.root / file_hash[:2] / f"{file_hash}.json.gz"
+
+    def load(self, file_hash: str) -> dict:
+        """
+        All cached extractions for a file ({} if none or unreadable).
+        """
+        if not file_hash:
+            return {}
+        try:
+            data = json.loads(gzip.decompress(self._path(file_hash).read_bytes()).decode("utf-8"))
+        except (OSError, ValueError, EOFError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def save(self, file_hash: str, data: dict):
+        if not file_hash:
+            return
+        raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        # mtime=0 keeps the bytes deterministic for identical content
+        atomic_write_bytes(self._path(file_hash), gzip.compress(raw, compresslevel=6, mtime=0))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+imap_checkpoint.py — where email_ingest.py left off, per mailbox
+================================================================
+One JSON file (default: site/imap_checkpoint.json, next to state.json):
+
+  {"version": 1, "mailboxes": {"imap.gmail.com/INBOX":
+      {"uidValidity": 1234, "lastUid": 5678, "updatedAt": "..."}}}
+
+- lastUid: every message up to it has been ingested, so the next poll asks
+  the server for UID lastUid+1:* only — independent of mailbox size and of
+  what anyone did to the \\Seen flags
+- uidValidity: UIDs are only comparable while the server keeps it; when it
+  changes, last_uid() returns 0 and the caller rescans the whole mailbox
+  (the archive index keeps that from re-saving what is already there)
+- No entry yet: last_uid() returns None, and the caller starts from what the
+  UNSEEN searches before it left unread
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+from atomic_io import atomic_write_text
+
+CHECKPOINT_VERSION = 1
+
+
+class Checkpoint:
+    def __init__(self, path: Path):
+        self.path = path
+        self.mailboxes = {}
+        self._dirty = False
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("version") == CHECKPOINT_VERSION:
+                    self.mailboxes = data.get("mailboxes", {})
+            except Exception:
+                self.mailboxes = {}
+
+    def last_uid(self, key: str, uidvalidity: int):
+        """
+        Highest UID already ingested from mailbox `key`: 0 if the checkpoint was taken under a
+        different UIDVALIDITY, None if there is none for it.
+        """
+        entry = self.mailboxes.get(key)
+        if not entry:
+            return None
+        if entry.get("uidValidity") != uidvalidity:
+            print(f"Checkpoint: UIDVALIDITY of {key} changed ({entry.get('uidValidity')} -> {uidvalidity}); "
+                  f"rescanning the whole mailbox")
+            return 0
+        return int(entry.get("lastUid") or 0)
+
+    def advance(self, key: str, uidvalidity: int, last_uid: int):
+        entry = self.mailboxes.get(key) or {}
+        if entry.get("uidValidity") == uidvalidity and entry.get("lastUid") == last_uid:
+            return
+        self.mailboxes[key] = {"uidValidity": uidvalidity, "lastUid": last_uid,
+                               "updatedAt": datetime.now().isoformat(timespec="seconds")}
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        payload = {"version": CHECKPOINT_VERSION, "mailboxes": self.mailboxes}
+        atomic_write_text(self.path, json.dumps(payload, indent=1))
+        self._dirty = False
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+imap_fetch.py — FETCH response parsing and BODYSTRUCTURE walking
+================================================================
+- parse_fetch(): turns imaplib's FETCH data (bytes lines and (prefix, literal)
+  tuples) into {message number or UID: {ITEM: value}}, with lists for
+  parenthesized values, str for atoms/quoted strings, bytes for literals and
+  None for NIL
+- message_set(): UIDs -> "1:3,5,7:8", for one command over many messages
+- docx_parts(): walks a BODYSTRUCTURE (nested multiparts and forwarded
+  message/rfc822 parts included) and returns the .docx attachments with
+  their section numbers, so only those sections need fetching
+- decode_part(): undoes the part's Content-Transfer-Encoding
+
+  typ, data = M.uid("FETCH", message_set(uids), "(UID BODYSTRUCTURE)")
+  for uid, items in parse_fetch(data, by_uid=True).items():
+      for part in docx_parts(items["BODYSTRUCTURE"]):
+          ...  # M.uid("FETCH", str(uid), f"(UID BODY.PEEK[{part['section']}])")
+"""
+
+import binascii
+import quopri
+import re
+from email.header import decode_header
+from itertools import takewhile
+from urllib.parse import unquote
+
+RX_TOKEN = re.compile(
+    rb'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|\{(\d+)\}\s*$|((?:[^\s()"\[\]]|\[[^\]]*\])+))',
+    re.DOTALL,
+)
+RX_QUOTED_ESCAPE = re.compile(rb"\\(.)")
+OPEN, CLOSE, LITERAL = object(), object(), object()
+
+
+def decode_mime_words(s: str) -> str:
+    parts = decode_header(s)
+    out = ""
+    for text, enc in parts:
+        if isinstance(text, bytes):
+            out += text.decode(enc or "utf-8", errors="ignore")
+        else:
+            out += text
+    return out
+
+
+def _tokens(data):
+    for line in data:
+        if line is None:
+            continue
+        text, literal = line if isinstance(line, tuple) else (line, None)
+        pos = 0
+        while pos < len(text):
+            m = RX_TOKEN.match(text, pos)
+            if not m or m.end() == pos:
+                if text[pos:].strip():
+                    raise ValueError(f"unparseable FETCH data: {text[pos:pos + 40]!r}")
+                break
+            pos = m.end()
+            if m.group(1):
+                yield OPEN
+            elif m.group(2):
+                yield CLOSE
+            elif m.group(3) is not None:
+                yield RX_QUOTED_ESCAPE.sub(rb"\1", m.group(3)).decode("utf-8", errors="replace")
+            elif m.group(4):
+                yield LITERAL
+            else:
+                atom = m.group(5).decode("utf-8", errors="replace")
+                yield None if atom.upper() == "NIL" else atom
+        if literal is not None:
+            yield literal
+
+
+def _values(tokens):
+    """
+    Nests the token stream: parenthesized groups become lists.
+    """
+    stack = [[]]
+    for tok in tokens:
+        if tok is OPEN:
+            stack.append([])
+        elif tok is CLOSE:
+            if len(stack) == 1:
+                raise ValueError("unbalanced ')' in FETCH data")
+            done = stack.pop()
+            stack[-1].append(done)
+        elif tok is not LITERAL:
+            stack[-1].append(tok)
+    if len(stack) != 1:
+        raise ValueError("unbalanced '(' in FETCH data")
+    return stack[0]
+
+
+def parse_fetch(data, by_uid: bool = False) -> dict:
+    """
+    {message number: {ITEM: value}} for every FETCH response in imaplib's data; items of
+    repeated responses for the same message are merged. Item names are uppercased, so
+    BODY.PEEK[2] comes back as "BODY[2]". With by_uid, keyed by UID instead (responses
+    without one, e.g. unsolicited flag updates, are dropped).
+    """
+    out = {}
+    values = _values(_tokens(data))
+    for num, items in zip(values[::2], values[1::2]):
+        fields = {key.upper(): value for key, value in zip(items[::2], items[1::2])}
+        if by_uid:
+            if not str(fields.get("UID", "")).isdigit():
+                continue
+            num = fields["UID"]
+        out.setdefault(int(num), {}).update(fields)
+    return out
+
+
+def message_set(nums) -> str:
+    """
+    Compact IMAP message set for the given numbers: [1, 2, 3, 5, 7, 8] -> "1:3,5,7:8".
+    """
+    out = []
+    start = prev = None
+    for n in sorted(set(map(int, nums))):
+        if prev is not None and n == prev + 1:
+            prev = n
+            continue
+        if start is not None:
+            out.append(f"{start}:{prev}" if prev > start else str(start))
+        start = prev = n
+    if start is not None:
+        out.append(f"{start}:{prev}" if prev > start else str(start))
+    return ",".join(out)
+
+
+def _text(v) -> str:
+    if isinstance(v, bytes):
+        return v.decode("utf-8", errors="replace")
+    return v or ""
+
+
+def _params(v) -> dict:
+    if not isinstance(v, list):
+        return {}
+    return {_text(k).lower(): _text(val) for k, val in zip(v[::2], v[1::2])}
+
+
+def _param(params: dict, key: str) -> str:
+    """
+    A body/disposition parameter, RFC 2231 forms included: key*=charset''value and the
+    key*0 / key*0* ... continuations.
+    """
+    if key in params:
+        return params[key]
+    pieces = []
+    encoded = False
+    for i in range(len(params)):
+        if f"{key}*{i}*" in params:
+            pieces.append(params[f"{key}*{i}*"])
+            encoded = True
+        elif f"{key}*{i}" in params:
+            pieces.append(params[f"{key}*{i}"])
+        else:
+            break
+    value = "".join(pieces) if pieces else params.get(f"{key}*")
+    if value is None:
+        return ""
+    if pieces and not encoded:
+        return value
+    if value.count("'") < 2:
+        return unquote(value)
+    charset, _lang, text = value.split("'", 2)
+    return unquote(text, encoding=charset or "utf-8", errors="replace")
+
+
+def _leaf(node: list, section: str, out: list):
+    ctype = _text(node[0]).lower()
+    subtype = _text(node[1]).lower() if len(node) > 1 else ""
+    if ctype == "message" and subtype == "rfc822" and len(node) > 8 and isinstance(node[8], list):
+        # A forwarded mail: its parts are numbered under this one (2 -> 2.1, 2.2, ...)
+        _walk(node[8], section, True, out)
+        return
+    # Extension data starts after the size (basic), the line count (text/*) or the
+    # envelope, body and line count (message/rfc822): MD5 first, then the disposition
+    ext = 7 + (1 if ctype == "text" else 3 if (ctype, subtype) == ("message", "rfc822") else 0)
+    disposition = node[ext + 1] if len(node) > ext + 1 and isinstance(node[ext + 1], list) else [None]
+    if _text(disposition[0]).lower() != "attachment":
+        return
+    filename = _param(_params(disposition[1] if len(disposition) > 1 else None), "filename") or \
+        _param(_params(node[2]), "name")
+    filename = decode_mime_words(filename)
+    if not filename.lower().endswith(".docx"):
+        return
+    out.append({
+        "section": section,
+        "filename": filename,
+        "encoding": _text(node[5]).lower() if len(node) > 5 else "",
+        "size": int(node[6]) if len(node) > 6 and str(node[6]).isdigit() else 0,
+    })
+
+
+def _walk(node: list, prefix: str, root: bool, out: list):
+    if node and isinstance(node[0], list):
+        # Multipart: the child parts, then the subtype and its extension data
+        for i, child in enumerate(takewhile(lambda n: isinstance(n, list), node), 1):
+            _walk(child, f"{prefix}.{i}" if prefix else str(i), False, out)
+    elif root:
+        # A message that isn't multipart has its body as part 1
+        _leaf(node, f"{prefix}.1" if prefix else "1", out)
+    else:
+        _leaf(node, prefix, out)
+
+
+def docx_parts(bodystructure) -> list:
+    """
+    The .docx attachments (Content-Disposition: attachment, filename ending in .docx) in a
+    BODYSTRUCTURE, as {"section", "filename", "encoding", "size"} in part order.
+    """
+    out = []
+    if isinstance(bodystructure, list) and bodystructure:
+        _walk(bodystructure, "", True, out)
+    return out
+
+
+def decode_part(payload: bytes, encoding: str) -> bytes:
+    """
+    The decoded body of a part fetched with BODY.PEEK[section].
+    """
+    if not payload:
+        return b""
+    if encoding == "base64":
+        try:
+            return binascii.a2b_base64(payload)
+        except binascii.Error:
+            # Missing padding, as email's own decoder tolerates
+            return binascii.a2b_base64(payload.rstrip() + b"==")
+    if encoding == "quoted-printable":
+        return quopri.decodestring(payload)
+    return payload
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+imap_idle.py — IMAP IDLE (RFC 2177) on an imaplib connection
+============================================================
+imaplib has no IDLE before Python 3.14, so idle_wait() speaks it directly on
+the connection's socket: IDLE, wait for the server to push an untagged
+response (EXISTS when a mail arrives), DONE, read the tagged reply.
+
+- Returns as soon as something arrives, or after `timeout` seconds so the
+  caller can re-issue IDLE before the server's own cut-off (RFC 2177: at
+  least every 29 minutes; Gmail drops idle connections after ~10-30)
+- Raises IdleError when the server says BYE or refuses IDLE, and
+  TimeoutError when it doesn't answer DONE (a silently dead connection)
+
+  while True:
+      ingest_new(M)
+      idle_wait(M, 600)
+"""
+
+import itertools
+import select
+import time
+
+DONE_TIMEOUT = 30.0
+_tags = itertools.count(1)
+
+
+class IdleError(Exception):
+    pass
+
+
+class _Lines:
+    """
+    Line reader on the raw socket. imaplib's buffered file can't be waited on with a
+    timeout (a timed-out read leaves it unusable), and every command before IDLE was read
+    up to its tagged line, so that buffer holds nothing while we read here.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buf = b""
+
+    def readline(self, deadline: float):
+        """
+        The next line, or None once `deadline` (time.monotonic()) has passed.
+        """
+        while b"\r\n" not in self.buf:
+            # Decrypted TLS data already inside the SSL object doesn't wake select()
+            pending = self.sock.pending() if hasattr(self.sock, "pending") else 0
+            if not pending:
+                left = deadline - time.monotonic()
+                if left <= 0 or not select.select([self.sock], [], [], left)[0]:
+                    return None
+            data = self.sock.recv(65536)
+            if not data:
+                raise IdleError("connection closed by server")
+            self.buf += data
+        line, self.buf = self.buf.split(b"\r\n", 1)
+        return line
+
+
+def idle_wait(M, timeout: float) -> list:
+    """
+    IDLE on M's selected mailbox until the server pushes something or `timeout` seconds
+    pass. Returns the untagged responses seen (e.g. [b"* 12 EXISTS"]); an empty list means
+    the timeout expired with nothing new.
+    """
+    tag = b"KIDLE%d" % next(_tags)
+    lines = _Lines(M.sock)
+    M.send(tag + b" IDLE\r\n")
+
+    seen = []
+    while True:
+        line = lines.readline(time.monotonic() + DONE_TIMEOUT)
+        if line is None:
+            raise TimeoutError("no reply to IDLE")
+        if line.startswith(b"+"):
+            break
+        if line.startswith(tag):
+            raise IdleError(f"IDLE refused: {line.decode('utf-8', 'replace')}")
+        seen.append(line)
+
+    deadline = time.monotonic() + timeout
+    while not seen:
+        line = lines.readline(deadline)
+        if line is None:
+            break
+        if line.upper().startswith(b"* BYE"):
+            raise IdleError(line.decode("utf-8", "replace"))
+        seen.append(line)
+
+    M.send(b"DONE\r\n")
+    while True:
+        line = lines.readline(time.monotonic() + DONE_TIMEOUT)
+        if line is None:
+            raise TimeoutError("no reply to DONE")
+        if line.startswith(tag):
+            if b" OK" not in line.upper():
+                raise IdleError(line.decode("utf-8", "replace"))
+            return seen
+        if line.upper().startswith(b"* BYE"):
+            raise IdleError(line.decode("utf-8", "replace"))
+        seen.append(line)
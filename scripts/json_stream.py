@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+json_stream.py — streamed data.json export in bounded memory
+============================================================
+- write_json_stream(): writes {head..., key: [items...], tail...} one item at a
+  time (manual framing around json.dumps of each item) into an atomic temp
+  file. The bytes are identical to dump_json() of the same payload, indented
+  or compact, but only one item is encoded at a time, so items can come
+  straight from a generator (e.g. an SQLite cursor in export order)
+- Change detection without loading either payload: the file on disk is read
+  back one item at a time alongside the export and compared item by item
+  (timestamps ignored, as in write_json_if_changed); an unchanged export is
+  discarded and the old file kept
+- peak_rss_bytes(): the process's peak resident set size, for the run report
+"""
+
+import json
+import sys
+from functools import partial
+from pathlib import Path
+
+from atomic_io import TIMESTAMP_KEYS, atomic_write_chunks, strip_keys
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+READ_CHUNK = 1 << 20
+WHITESPACE = " \t\r\n"
+DECODER = json.JSONDecoder()
+
+# Yielded by iter_json_members() where the streamed array opens
+ARRAY_START = object()
+
+
+def iter_json_chunks(head: dict, key: str, items, tail: dict, compact: bool = False):
+    """
+    Yields str pieces which, joined, equal dump_json({**head, key: list(items), **tail}, compact).
+    """
+    if compact:
+        enc = partial(json.dumps, ensure_ascii=False, separators=(",", ":"))
+        nl1 = nl2 = ""
+        colon = ":"
+    else:
+        enc = partial(json.dumps, ensure_ascii=False, indent=2)
+        nl1, nl2 = "\n  ", "\n    "
+        colon = ": "
+
+    # Strings never hold a raw newline, so re-indenting nested output is a plain replace
+    def member(k, v):
+        return nl1 + enc(k) + colon + enc(v).replace("\n", nl1)
+
+    yield "{"
+    for k, v in head.items():
+        yield member(k, v) + ","
+    yield nl1 + enc(key) + colon + "["
+    n = 0
+    for item in items:
+        yield ("," if n else "") + nl2 + enc(item).replace("\n", nl2)
+        n += 1
+    yield (nl1 if n else "") + "]"
+    for k, v in tail.items():
+        yield "," + member(k, v)
+    yield ("\n" if not compact else "") + "}"
+
+
+class _Reader:
+    """
+    Just enough of a pull parser to walk one top-level object, value by value,
+    holding at most one value (plus a read chunk) in memory.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _more(self) -> bool:
+        if self.eof:
+            return False
+        data = self.f.read(READ_CHUNK)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                raise ValueError("unexpected end of JSON")
+
+    def take(self, ch: str):
+        if self.peek() != ch:
+            raise ValueError(f"expected {ch!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._more():
+                    continue
+                raise
+            # A number ending exactly at the buffer edge may continue in the next chunk
+            if end == len(self.buf) and self._more():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_members(path: Path, array_key: str):
+    """
+    Yields (key, value) for each member of the top-level object in path; the members
+    of array_key are yielded one at a time, after (array_key, ARRAY_START).
+    """
+    with path.open("r", encoding="utf-8") as f:
+        r = _Reader(f)
+        r.take("{")
+        if r.peek() == "}":
+            return
+        while True:
+            key = r.value()
+            r.take(":")
+            if key == array_key and r.peek() == "[":
+                r.take("[")
+                yield key, ARRAY_START
+                if r.peek() == "]":
+                    r.take("]")
+                else:
+                    while True:
+                        yield key, r.value()
+                        if r.peek() != ",":
+                            r.take("]")
+                            break
+                        r.take(",")
+            else:
+                yield key, r.value()
+            if r.peek() != ",":
+                r.take("}")
+                return
+            r.take(",")
+
+
+class _Comparison:
+    """
+    Walks the file already at path alongside the payload being written, member by
+    member, until the first difference (ignore_keys excepted).
+    """
+
+    def __init__(self, path: Path, array_key: str, compact: bool, ignore_keys):
+        self.ignore_keys = ignore_keys
+        self.old = None
+        self.same = False
+        try:
+            with path.open("rb") as f:
+                # The layout counts as content, so switching --compact rewrites the file
+                self.same = (f.read(2) != b"{\n") == compact
+        except OSError:
+            return
+        if self.same:
+            self.old = iter_json_members(path, array_key)
+
+    def _next_old(self):
+        try:
+            return next(self.old)
+        except (StopIteration, OSError, UnicodeDecodeError, ValueError):
+            return None
+
+    def add(self, key: str, value):
+        if not self.same:
+            return
+        old = self._next_old()
+        if old is None or old[0] != key or (old[1] is ARRAY_START) != (value is ARRAY_START):
+            self.differ()
+        elif key not in self.ignore_keys and value is not ARRAY_START and \
+                strip_keys(old[1], self.ignore_keys) != strip_keys(value, self.ignore_keys):
+            self.differ()
+
+    def differ(self):
+        self.same = False
+        self.close()
+
+    def unchanged(self) -> bool:
+        """
+        True if the old file held exactly the members added, no more.
+        """
+        if self.same and self._next_old() is not None:
+            self.same = False
+        self.close()
+        return self.same
+
+    def close(self):
+        if self.old is not None:
+            self.old.close()
+            self.old = None
+
+
+def write_json_stream(path: Path, head: dict, key: str, items, tail: dict, compact: bool = False,
+                      ignore_keys=TIMESTAMP_KEYS) -> dict:
+    """
+    Atomically write {**head, key: [items...], **tail} as JSON, one item at a time, unless
+    the file already holds the same payload (ignoring ignore_keys). `tail` is read only
+    after the last item. Returns {"changed", "bytes", "items"}.
+    """
+    stats = {"changed": False, "bytes": 0, "items": 0}
+    cmp = _Comparison(path, key, compact, ignore_keys)
+
+    def compared():
+        for k, v in head.items():
+            cmp.add(k, v)
+        cmp.add(key, ARRAY_START)
+        for item in items:
+            cmp.add(key, item)
+            stats["items"] += 1
+            yield item
+        for k, v in tail.items():
+            cmp.add(k, v)
+
+    def chunks():
+        for text in iter_json_chunks(head, key, compared(), tail, compact):
+            data = text.encode("utf-8")
+            stats["bytes"] += len(data)
+            yield data
+
+    try:
+        stats["changed"] = atomic_write_chunks(path, chunks(), lambda: not cmp.unchanged())
+    finally:
+        cmp.close()
+    return stats
+
+
+def peak_rss_bytes() -> int:
+    """
+    Peak resident set size of this process so far (0 where the resource module is missing).
+    """
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+llm_cache.py — content-addressed cache of LLM metadata responses
+================================================================
+Maps sha256(model, prompt version, exact text sent) -> parsed metadata JSON,
+so renamed or rebuilt articles with byte-identical text never pay for a
+second API call.
+
+- Persistent: one JSON file (default: site/llm_cache.json, next to state.json)
+- Size-bounded: least-recently-used entries are evicted past max_entries
+- Written only when entries were added (or evicted): hits reorder the LRU in
+  memory, but a run with nothing but hits leaves the committed file alone
+- Thread-safe: shared by the --workers inference threads
+- path=None keeps it in memory only (save() is a no-op)
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from atomic_io import atomic_write_text
+
+
+def cache_key(model: str, prompt_version: str, text: str) -> str:
+    h = hashlib.sha256()
+    for part in (model, prompt_version, text):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path, max_entries: int = 5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries = OrderedDict()
+
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                # File order is LRU order (oldest first)
+                self._entries.update(data.get("entries", {}))
+            except Exception:
+                self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str):
+        with self._lock:
+            meta = self._entries.get(key)
+            if meta is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return meta
+
+    def put(self, key: str, meta: dict):
+        with self._lock:
+            self._entries[key] = meta
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or self.path is None:
+                return
+            payload = {"entries": self._entries}
+            atomic_write_text(self.path, json.dumps(payload, ensure_ascii=False, indent=1))
+            self._dirty = False
@@ -3,30 +3,56 @@
 process_articles.py — Kidder Article Dashboard Processor (Incremental + Prune)
 ==============================================================================
 - Scans a folder of .docx files
-- Extracts text (pandoc preferred; python-docx fallback)
-- Normalizes whitespace + fixes hard-wrapped lines (keeps paragraph breaks)
-- Uses OpenAI API to infer: title, date, summary, topics
-- Writes site/data.json for your static site
+- Extracts text (built-in streaming extractor by default; pandoc / python-docx selectable)
+- Normalizes whitespace, repairs mojibake, joins hard-wrapped lines (keeps paragraph breaks) in one pass
+- Caches extracted + normalized text per docx hash (.cache/extract), so rebuilds skip extraction
+- Uses OpenAI API to infer: title, date, summary, topics (responses cached by text hash)
+- Sends a token-budgeted sample (boilerplate header stripped, head + tail of long articles)
+- Optional --pack N asks for N articles' metadata per request (JSON array keyed by sourceFile)
+- Writes site/data.json for your static site (streamed article by article; --compact drops the indentation)
+- Optional --manifest also writes site/manifest.json + site/text/<shard>.json (text loaded on demand)
+- Optional --search-index also writes site/search.json (prebuilt inverted index for the search box)
 - Writes missing_dates.csv
-- Maintains site/state.json for incremental processing
+- Maintains site/state.json for incremental processing (sha256 per file); size + mtime_ns of each file
+  are kept out of it, in .cache/stat.json, so unchanged files skip hashing without churning state.json
+- Optional --workers N runs extraction + inference concurrently (output order stays deterministic)
+- Optional --extract-workers N pipelines a process pool of extractors into the inference workers
+- Optional --batch-submit / --batch-collect defer inference to the OpenAI Batch API (JSONL files)
+- API calls share one rate limiter (--rpm / --tpm budgets, Retry-After + jittered backoff on
+  429/5xx, concurrency adapts down when throttled and back up when there is headroom)
+- Detects renamed files by content hash (--resume) and carries their article over: no re-extract, no API call
+- Optional --db PATH keeps everything in SQLite (files, articles, LLM metadata, errors, runs), committed
+  per file; data.json and state.json are then exports of the db (see archive_db.py)
 - PRUNES entries whose sourceFile no longer exists in the archive folder
+- Times every stage per file and per run and appends one summary line per run to
+  kidder_logs/auto_publish.log; --profile (or --timings PATH) also writes the full report
+  (kidder_logs/run-<timestamp>.json), --cprofile also dumps cProfile stats
 - Skips empty/zero-word extracts so you don’t end up with zombie articles
 
 Exit codes:
-- 0 = nothing updated
+- 0 = nothing updated (output identical apart from timestamps, so nothing was rewritten)
 - 8 = updated JSON (including prune-only changes)
+
+All outputs are written atomically (temp file + fsync + rename).
 """
 
 import argparse
+import cProfile
 import csv
 import hashlib
+import io
 import json
 import os
+import queue
 import re
 import subprocess
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 
 try:
@@ -39,6 +65,20 @@ try:
 except ImportError:
     OpenAI = None
 
+from docx_native import extract_docx_text
+from archive_db import ArchiveDB
+from article_store import ArticleStore
+from atomic_io import atomic_write_text, write_json_if_changed
+from batch_jsonl import read_results, write_batch
+from extract_cache import ExtractCache
+from json_stream import peak_rss_bytes, write_json_stream
+from llm_cache import LLMCache, cache_key
+from rate_limit import RateLimiter
+from run_profile import RunProfile, append_log, summary_line
+from site_export import write_search_index, write_sharded
+from text_normalize import normalize_text
+from token_budget import LEGACY_CHAR_LIMIT, InputBudget
+
 
 DUMMY_DATE_FOR_UNKNOWN = "0001-01-01"
 
@@ -51,6 +91,99 @@ def sha256_file(path: Path) -> str:
     return h.hexdigest()
 
 
+def file_state_entry(path: Path, prev, paranoid: bool = False):
+    """
+    Return (entry, changed) for a file, where entry is the in-memory state record
+    {"hash", "size", "mtime_ns"} (the hash goes to state.json, the rest to the stat cache).
+
+    Fast path: if size and mtime_ns match the previous entry, the file is taken as
+    unchanged after a single stat() and the stored hash is reused. Only when the
+    metadata differs (or paranoid=True, or prev is a legacy bare-hash string) is
+    the file hashed; `changed` then reflects the hash comparison, so a touched but
+    byte-identical file is not reprocessed.
+    """
+    st = path.stat()
+    if (not paranoid and isinstance(prev, dict) and prev.get("hash")
+            and prev.get("size") == st.st_size and prev.get("mtime_ns") == st.st_mtime_ns):
+        return prev, False
+
+    prev_hash = prev.get("hash", "") if isinstance(prev, dict) else (prev or "")
+    file_hash = sha256_file(path)
+    entry = {"hash": file_hash, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    return entry, prev_hash != file_hash
+
+
+def entry_hash(entry) -> str:
+    # In memory entries are {"hash", "size", "mtime_ns"}, or a bare hash string (state.json on disk)
+    return entry.get("hash", "") if isinstance(entry, dict) else (entry or "")
+
+
+def merge_stat_cache(state: dict, stats: dict):
+    """
+    Turn state.json's bare hashes back into {"hash", "size", "mtime_ns"} entries from the local
+    stat cache, wherever the cached hash is still the one in state.json.
+    """
+    files = state.get("files") or {}
+    for name, entry in files.items():
+        cached = stats.get(name)
+        if isinstance(cached, dict) and cached.get("hash") and cached.get("hash") == entry_hash(entry):
+            files[name] = {"hash": cached["hash"], "size": cached.get("size"), "mtime_ns": cached.get("mtime_ns")}
+
+
+def split_state(state: dict):
+    """
+    (state.json payload, stat cache payload). state.json gets bare hashes only: size/mtime_ns
+    differ on every checkout, so committing them would rewrite every entry on every run.
+    """
+    files = state.get("files") or {}
+    committed = dict(state, files={name: entry_hash(files[name]) for name in sorted(files)})
+    stats = {name: files[name] for name in sorted(files) if isinstance(files[name], dict)}
+    return committed, stats
+
+
+def carry_over_renames(docx_files: list, files: dict, store: ArticleStore, verbose: bool = False):
+    """
+    Match files that have no state entry against state entries whose file has vanished,
+    by content hash. A match is a rename: the state entry and the article move to the new
+    name (the filename date is re-derived), so the rest of the run sees an unchanged file.
+
+    Returns ([(old, new), ...], {name: fresh state entry}) - the entries hashed here for
+    files with no match, so the discovery pass doesn't hash them again.
+    """
+    names = {p.name for p in docx_files}
+    vanished = {}
+    for name, entry in files.items():
+        if name not in names and entry_hash(entry):
+            vanished.setdefault(entry_hash(entry), []).append(name)
+
+    renamed = []
+    fresh = {}
+    if not vanished:
+        return renamed, fresh
+    for p in docx_files:
+        if p.name in files:
+            continue
+        entry, _ = file_state_entry(p, None)
+        olds = vanished.get(entry["hash"])
+        if not olds:
+            fresh[p.name] = entry
+            continue
+        old = olds.pop()
+        del files[old]
+        files[p.name] = entry
+        if store.rename(old, p.name):
+            article = store.get(p.name)
+            date_guess = parse_date_from_filename(p.name) or parse_date_from_text(article.get("text") or "")
+            if date_guess and date_guess != article.get("date"):
+                article["date"] = article["dateISO"] = date_guess
+                article["dateSource"] = "filename/text"
+            article["updatedAt"] = datetime.now().isoformat(timespec="seconds")
+        renamed.append((old, p.name))
+        if verbose:
+            print(f"Renamed: {old} -> {p.name}")
+    return renamed, fresh
+
+
 def load_json(path: Path, default):
     if not path.exists():
         return default
@@ -60,9 +193,12 @@ def load_json(path: Path, default):
         return default
 
 
-def save_json(path: Path, data):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+def save_json(path: Path, data) -> bool:
+    """
+    Atomic write (temp + fsync + rename), skipped when only timestamps would change.
+    Returns True if the file was written.
+    """
+    return write_json_if_changed(path, data)
 
 
 def run_pandoc_extract(docx_path: Path) -> str:
@@ -98,36 +234,6 @@ def docx_extract_fallback(docx_path: Path) -> str:
         return ""
 
 
-def normalize_whitespace(s: str) -> str:
-    """
-    Normalize whitespace while preserving paragraph boundaries.
-    - Normalize newlines
-    - Collapse runs of spaces/tabs
-    - Collapse 3+ newlines to a single blank line (paragraph break)
-    """
-    s = s.replace("\r\n", "\n").replace("\r", "\n")
-    s = re.sub(r"[ \t]+", " ", s)
-    s = re.sub(r"\n{3,}", "\n\n", s)
-    return s.strip()
-
-
-def fix_hard_wrapped_lines(s: str) -> str:
-    """
-    Many doc exports contain single newlines every ~60-90 chars (hard wraps).
-    We want:
-    - Keep real paragraph breaks (blank line) as paragraph breaks
-    - Convert single newlines within a paragraph into spaces
-
-    Precondition: normalize_whitespace() has already run, so paragraphs are
-    separated by \n\n, and within a paragraph there may still be single \n.
-    """
-    # Convert single newlines to spaces, leaving \n\n intact
-    s = re.sub(r"\n(?!\n)", " ", s)
-    # Clean up any weird spacing caused by the join
-    s = re.sub(r"[ \t]+", " ", s).strip()
-    return s
-
-
 def word_count(text: str) -> int:
     return len(re.findall(r"\b\w+\b", text))
 
@@ -180,7 +286,34 @@ def parse_date_from_text(text: str):
     return None
 
 
-def openai_infer(client: OpenAI, model: str, text: str):
+# Bump when the prompt or request shape changes so cached responses are not reused
+PROMPT_VERSION = "1"
+
+
+# Completion tokens reserved per request when estimating against the --tpm budget
+MAX_COMPLETION_TOKENS_EST = 400
+
+
+def estimate_tokens(s: str) -> int:
+    # ~4 characters per token for English prose; settled against real usage after each call
+    return len(s) // 4 + 1
+
+
+class BatchDeferred(Exception):
+    """
+    Raised by openai_infer() when there's no client (batch mode) and no cached answer.
+    """
+
+    def __init__(self, key: str, body: dict):
+        super().__init__("deferred to batch")
+        self.key = key
+        self.body = body
+
+
+def build_request(model: str, text: str):
+    """
+    Returns (cache key, chat.completions request body) for the article text to send.
+    """
     prompt = (
         "You are extracting metadata for a newspaper opinion archive.\n"
         "Given the article text, return STRICT JSON with keys:\n"
@@ -188,18 +321,459 @@ def openai_infer(client: OpenAI, model: str, text: str):
         "If date is not explicitly stated, infer conservatively from context; otherwise return empty string.\n"
     )
 
-    article_snip = text[:12000]
+    article_snip = text
+
+    messages = [
+        {"role": "system", "content": "Return only valid JSON. No markdown."},
+        {"role": "user", "content": prompt + "\n\nARTICLE:\n" + article_snip},
+    ]
+    body = {"model": model, "messages": messages, "temperature": 0.2}
+    return cache_key(model, PROMPT_VERSION, article_snip), body
 
-    r = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": "Return only valid JSON. No markdown."},
-            {"role": "user", "content": prompt + "\n\nARTICLE:\n" + article_snip},
-        ],
-        temperature=0.2,
+
+def build_packed_request(model: str, items: list) -> dict:
+    """
+    One chat.completions request body asking for metadata of several articles.
+    items: [(sourceFile, text to send), ...]
+    """
+    prompt = (
+        "You are extracting metadata for a newspaper opinion archive.\n"
+        "Several articles follow, each under a header line giving its sourceFile.\n"
+        "Return a STRICT JSON array with one object per article, each with keys:\n"
+        "sourceFile (copied exactly from the header), title (string), date (YYYY-MM-DD or empty string), "
+        "summary (string), topics (array of short strings).\n"
+        "If date is not explicitly stated, infer conservatively from context; otherwise return empty string.\n"
     )
-    content = r.choices[0].message.content.strip()
-    return json.loads(content)
+    parts = [f"=== ARTICLE {i} | sourceFile: {name} ===\n{text}" for i, (name, text) in enumerate(items, start=1)]
+    messages = [
+        {"role": "system", "content": "Return only valid JSON. No markdown."},
+        {"role": "user", "content": prompt + "\n\n" + "\n\n".join(parts)},
+    ]
+    return {"model": model, "messages": messages, "temperature": 0.2}
+
+
+def chat_json(client: OpenAI, body: dict, limiter=None, answers: int = 1):
+    """
+    Send one chat request (through the limiter if given) and parse the reply as JSON.
+    `answers` scales the completion-token estimate for packed requests.
+    """
+    def call():
+        return client.chat.completions.create(**body)
+
+    if limiter is None:
+        r = call()
+    else:
+        est = sum(estimate_tokens(m["content"]) for m in body["messages"]) + MAX_COMPLETION_TOKENS_EST * answers
+        r = limiter.call(call, est)
+    return json.loads(r.choices[0].message.content.strip())
+
+
+def openai_infer(client: OpenAI, model: str, text: str, cache=None, limiter=None):
+    """
+    Metadata for one article: (meta, True) after one chat call, or (meta, False) from the cache.
+    client=None (batch mode) raises BatchDeferred instead of calling the API.
+    """
+    key, body = build_request(model, text)
+    if cache is not None:
+        meta = cache.get(key)
+        if meta is not None:
+            return meta, False
+    if client is None:
+        raise BatchDeferred(key, body)
+
+    meta = chat_json(client, body, limiter)
+    if cache is not None and isinstance(meta, dict):
+        cache.put(key, meta)
+    return meta, True
+
+
+def packed_answers(answer) -> dict:
+    """
+    sourceFile -> metadata from a packed reply (a JSON array, or an object wrapping one).
+    """
+    if isinstance(answer, dict):
+        answer = next((v for v in answer.values() if isinstance(v, list)), [])
+    out = {}
+    for item in answer if isinstance(answer, list) else []:
+        if isinstance(item, dict) and isinstance(item.get("sourceFile"), str):
+            out[item["sourceFile"]] = {k: v for k, v in item.items() if k != "sourceFile"}
+    return out
+
+
+def infer_packed(client: OpenAI, model: str, items: list, cache=None, limiter=None):
+    """
+    items: [(sourceFile, result, key, snippet, single-request body), ...] all cache misses.
+    Asks for all of them in one request; articles the reply leaves out (or everything, if
+    it's not usable JSON) are retried as smaller packs, down to one-article requests.
+    Fills result["meta"] / result["error"]. Never raises.
+    """
+    if not items:
+        return
+    if len(items) == 1:
+        name, res, key, snippet, body = items[0]
+        try:
+            meta = chat_json(client, body, limiter)
+            if not isinstance(meta, dict):
+                raise ValueError("response is not a JSON object")
+            res["meta"] = meta
+            res["apiCall"] = True
+            if cache is not None:
+                cache.put(key, meta)
+        except Exception as e:
+            res["error"] = str(e)
+        return
+
+    try:
+        body = build_packed_request(model, [(name, snippet) for name, _, _, snippet, _ in items])
+        by_name = packed_answers(chat_json(client, body, limiter, answers=len(items)))
+    except Exception:
+        by_name = {}
+
+    missing = []
+    for item in items:
+        name, res, key = item[:3]
+        meta = by_name.get(name)
+        if meta:
+            res["meta"] = meta
+            res["apiCall"] = True
+            if cache is not None:
+                cache.put(key, meta)
+        else:
+            missing.append(item)
+
+    if len(missing) == len(items):
+        half = len(items) // 2
+        infer_packed(client, model, items[:half], cache, limiter)
+        infer_packed(client, model, items[half:], cache, limiter)
+    else:
+        infer_packed(client, model, missing, cache, limiter)
+
+
+EXTRACTORS = {
+    "native": extract_docx_text,
+    "pandoc": run_pandoc_extract,
+    "python-docx": docx_extract_fallback,
+}
+
+# Extraction cache keys. Bump an extractor's version when its output changes (re-extracts);
+# bump NORMALIZE_VERSION when text_normalize.normalize_text, word_count or
+# parse_date_from_text change (re-normalizes the cached raw text, no docx parsing).
+EXTRACTOR_VERSIONS = {"native": "1", "pandoc": "1", "python-docx": "1"}
+NORMALIZE_VERSION = "2"
+
+
+def extractor_chain(extractor: str) -> list:
+    return [extractor] + [n for n in EXTRACTORS if n != extractor]
+
+
+def extract_raw(docx_path: Path, extractor: str = "native") -> str:
+    """
+    Run the chosen extractor, falling back to the others (in EXTRACTORS order)
+    if it yields nothing.
+    """
+    text = ""
+    for name in extractor_chain(extractor):
+        text = EXTRACTORS[name](docx_path)
+        if text:
+            break
+    return text
+
+
+def extract_text(docx_path: Path, extractor: str = "native") -> str:
+    return normalize_text(extract_raw(docx_path, extractor))
+
+
+def extract_file(docx_path: Path, extractor: str = "native", xcache=None, file_hash: str = "") -> dict:
+    """
+    Extraction stage for one file. Module-level and returns a plain dict so it can
+    run in a process pool. Never raises.
+
+    With an ExtractCache and the file's sha256, cached text is reused when both version
+    keys match, and re-normalized from the cached raw text when only NORMALIZE_VERSION
+    moved. result["extractCache"] is "hit", "renormalized" or "miss" (None without a cache).
+    """
+    result = {"text": "", "wordCount": 0, "dateFromText": None, "meta": None, "error": None,
+              "deferred": None, "inputTokens": None, "apiCall": False, "extractCache": None,
+              "extractSeconds": 0.0, "normalizeSeconds": 0.0, "inferSeconds": 0.0}
+    t0 = time.perf_counter()
+    try:
+        entries = xcache.load(file_hash) if xcache is not None else {}
+        chain_version = ",".join(f"{n}:{EXTRACTOR_VERSIONS[n]}" for n in extractor_chain(extractor))
+        rec = entries.get(extractor)
+        status = "hit"
+        if not isinstance(rec, dict) or rec.get("version") != chain_version or not isinstance(rec.get("raw"), str):
+            rec = {"version": chain_version, "raw": extract_raw(docx_path, extractor)}
+            status = "miss"
+        norm = rec.get("norm")
+        if not isinstance(norm, dict) or norm.get("version") != NORMALIZE_VERSION:
+            t_norm = time.perf_counter()
+            text = normalize_text(rec["raw"])
+            norm = {"version": NORMALIZE_VERSION, "text": text, "wordCount": word_count(text),
+                    "dateFromText": parse_date_from_text(text)}
+            result["normalizeSeconds"] = time.perf_counter() - t_norm
+            rec["norm"] = norm
+            status = "renormalized" if status == "hit" else status
+            # Empty output isn't cached: a missing pandoc / python-docx may be installed later
+            if xcache is not None and rec["raw"]:
+                entries[extractor] = rec
+                xcache.save(file_hash, entries)
+        result["text"] = norm["text"]
+        result["wordCount"] = norm["wordCount"]
+        result["dateFromText"] = norm["dateFromText"]
+        if xcache is not None:
+            result["extractCache"] = status
+    except Exception as e:
+        result["error"] = str(e)
+    # Includes normalizeSeconds
+    result["extractSeconds"] = time.perf_counter() - t0
+    return result
+
+
+def extract_job(job: tuple, extractor: str = "native", xcache=None) -> dict:
+    # job = (path, sha256); module-level so it pickles into the extraction process pool
+    docx_path, file_hash = job
+    return extract_file(docx_path, extractor, xcache, file_hash)
+
+
+def sample_text(result: dict, budget=None) -> str:
+    """
+    The article text to send: budget.sample() (recording result["inputTokens"]) or,
+    without a budget, the legacy first-12000-characters slice.
+    """
+    if budget is None:
+        return result["text"][:LEGACY_CHAR_LIMIT]
+    snippet, result["inputTokens"] = budget.sample(result["text"])
+    return snippet
+
+
+def infer_result(client: OpenAI, model: str, result: dict, cache=None, limiter=None, budget=None) -> dict:
+    """
+    Inference stage: fill result["meta"] for an extracted file (skips errors and 0-word text),
+    or result["deferred"] = (cache key, request body) in batch mode. Never raises.
+    The text sent comes from sample_text().
+    """
+    if result["error"] is not None or result["wordCount"] == 0:
+        return result
+    t0 = time.perf_counter()
+    try:
+        snippet = sample_text(result, budget)
+        result["meta"], result["apiCall"] = openai_infer(client, model, snippet, cache, limiter)
+    except BatchDeferred as d:
+        result["deferred"] = (d.key, d.body)
+    except Exception as e:
+        result["error"] = str(e)
+    result["inferSeconds"] = time.perf_counter() - t0
+    return result
+
+
+def process_file(client: OpenAI, model: str, job: tuple, extractor: str = "native", cache=None,
+                 limiter=None, budget=None, xcache=None) -> dict:
+    """
+    Extract + infer metadata for one file; job = (path, sha256).
+    Safe to run in a worker thread: only shares the (locked) cache and limiter, never raises.
+    """
+    return infer_result(client, model, extract_job(job, extractor, xcache), cache, limiter, budget)
+
+
+def process_pack(client: OpenAI, model: str, group: list, extractor: str = "native", cache=None,
+                 limiter=None, budget=None, xcache=None) -> list:
+    """
+    Extract a group of files and infer their metadata with packed requests (see infer_packed).
+    group: [(path, sha256), ...]. Returns results in group order. Cache hits and batch-mode
+    deferrals are handled per article exactly as in infer_result. Never raises.
+    """
+    results = [extract_job(job, extractor, xcache) for job in group]
+    t0 = time.perf_counter()
+    todo = []
+    for (p, _), res in zip(group, results):
+        if res["error"] is not None or res["wordCount"] == 0:
+            continue
+        snippet = sample_text(res, budget)
+        key, body = build_request(model, snippet)
+        meta = cache.get(key) if cache is not None else None
+        if meta is not None:
+            res["meta"] = meta
+        elif client is None:
+            res["deferred"] = (key, body)
+        else:
+            todo.append((p.name, res, key, snippet, body))
+    infer_packed(client, model, todo, cache, limiter)
+
+    # One wall-clock span covers the whole pack; split it evenly for per-file timings
+    inferred = [res for res in results if res["wordCount"] > 0]
+    elapsed = time.perf_counter() - t0
+    for res in inferred:
+        res["inferSeconds"] = elapsed / len(inferred)
+    return results
+
+
+def iter_packed(client: OpenAI, model: str, pending: list, workers: int, pack: int, extractor: str = "native",
+                cache=None, limiter=None, budget=None, xcache=None):
+    """
+    Like the thread-pool path of iter_processed, but each worker takes `pack` files at a time
+    and infers them together. Yields (path, file_entry, result) in input order.
+    """
+    groups = [pending[i:i + pack] for i in range(0, len(pending), pack)]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        jobs = ((g, None, [(p, entry_hash(file_entry)) for p, file_entry in g]) for g in groups)
+        fn = partial(process_pack, client, model, extractor=extractor, cache=cache, limiter=limiter,
+                     budget=budget, xcache=xcache)
+        for g, _, results in iter_bounded(ex, fn, jobs, max(1, workers) * 2):
+            for (p, file_entry), res in zip(g, results):
+                yield p, file_entry, res
+
+
+def iter_bounded(ex, fn, jobs, window: int):
+    """
+    jobs yields (path, file_entry, arg). Runs fn(arg) on executor ex with at most
+    `window` calls in flight and yields (path, file_entry, fn(arg)) in input order.
+    """
+    inflight = deque()
+    for p, file_entry, arg in jobs:
+        inflight.append((p, file_entry, ex.submit(fn, arg)))
+        if len(inflight) >= window:
+            p0, h0, fut = inflight.popleft()
+            yield p0, h0, fut.result()
+    while inflight:
+        p0, h0, fut = inflight.popleft()
+        yield p0, h0, fut.result()
+
+
+def iter_pipelined(client: OpenAI, model: str, pending: list, workers: int, extractor: str,
+                   extract_workers: int, queue_size: int, stats: dict, cache=None, limiter=None,
+                   budget=None, xcache=None):
+    """
+    Two-stage pipeline: a process pool extracts + normalizes files ahead of time into a
+    bounded queue, and a thread pool of `workers` drains it into openai_infer.
+    The queue bound gives back-pressure, so a slow API never lets extracted text pile up.
+
+    stats gets "extractBlockedSeconds" (extraction waiting on a full queue, i.e. inference
+    is the bottleneck) and "inferStarvedSeconds" (inference waiting on an empty queue).
+    """
+    q = queue.Queue(maxsize=max(1, queue_size))
+    done = object()
+
+    def extract_stage():
+        try:
+            with ProcessPoolExecutor(max_workers=extract_workers) as pool:
+                jobs = ((p, file_entry, (p, entry_hash(file_entry))) for p, file_entry in pending)
+                fn = partial(extract_job, extractor=extractor, xcache=xcache)
+                for item in iter_bounded(pool, fn, jobs, extract_workers * 2):
+                    t0 = time.perf_counter()
+                    q.put(item)
+                    stats["extractBlockedSeconds"] += time.perf_counter() - t0
+        except Exception as e:
+            q.put(e)
+        q.put(done)
+
+    def extracted():
+        while True:
+            t0 = time.perf_counter()
+            item = q.get()
+            stats["inferStarvedSeconds"] += time.perf_counter() - t0
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    stats.setdefault("extractBlockedSeconds", 0.0)
+    stats.setdefault("inferStarvedSeconds", 0.0)
+    feeder = threading.Thread(target=extract_stage, name="extract-stage", daemon=True)
+    feeder.start()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        fn = partial(infer_result, client, model, cache=cache, limiter=limiter, budget=budget)
+        yield from iter_bounded(ex, fn, extracted(), workers * 2)
+    feeder.join()
+
+
+def iter_processed(client: OpenAI, model: str, pending: list, workers: int, extractor: str = "native",
+                   extract_workers: int = 0, queue_size: int = 16, stats: dict = None, cache=None,
+                   limiter=None, budget=None, pack: int = 1, xcache=None):
+    """
+    Yield (path, file_entry, result) for each pending file, in input order.
+
+    pack > 1 groups files into packed requests (see iter_packed), extracting in the same threads.
+    extract_workers > 0 runs the pipelined extract/infer stages (see iter_pipelined).
+    Otherwise workers <= 1 is the original serial path (with its small pause between
+    API calls when no rate limiter paces them), and workers > 1 a bounded thread pool
+    doing extract + infer per file, keeping at most 2*workers files in flight so memory
+    stays flat on big archives.
+    """
+    workers = max(1, workers)
+    if pack > 1:
+        yield from iter_packed(client, model, pending, workers, pack, extractor, cache, limiter, budget, xcache)
+        return
+    if extract_workers > 0:
+        yield from iter_pipelined(client, model, pending, workers, extractor,
+                                  extract_workers, queue_size, stats if stats is not None else {}, cache, limiter,
+                                  budget, xcache)
+        return
+
+    if workers == 1:
+        for p, file_entry in pending:
+            res = process_file(client, model, (p, entry_hash(file_entry)), extractor, cache, limiter, budget, xcache)
+            yield p, file_entry, res
+            # Pause only after a real API call, not after a cache hit
+            if limiter is None and res["apiCall"]:
+                time.sleep(0.1)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        jobs = ((p, file_entry, (p, entry_hash(file_entry))) for p, file_entry in pending)
+        fn = partial(process_file, client, model, extractor=extractor, cache=cache, limiter=limiter,
+                     budget=budget, xcache=xcache)
+        yield from iter_bounded(ex, fn, jobs, workers * 2)
+
+
+def format_utilization(stage_busy: dict, wall: float, extract_workers: int, workers: int,
+                       stats: dict) -> list:
+    """
+    Human-readable per-stage utilization lines: busy time / (wall time * stage slots).
+    Without a separate extraction pool both stages share the same worker slots.
+    """
+    workers = max(1, workers)
+    slots = {"extract": extract_workers or workers, "infer": workers}
+    lines = []
+    for stage in ("extract", "infer"):
+        busy = stage_busy.get(stage, 0.0)
+        cap = wall * slots[stage]
+        pct = (100.0 * busy / cap) if cap > 0 else 0.0
+        lines.append(f"  {stage:<8} {pct:5.1f}%  busy={busy:.2f}s  slots={slots[stage]}")
+    if extract_workers > 0:
+        lines.append(f"  queue    extract blocked={stats.get('extractBlockedSeconds', 0.0):.2f}s  "
+                     f"infer starved={stats.get('inferStarvedSeconds', 0.0):.2f}s")
+    return lines
+
+
+def build_article(p: Path, text: str, wc: int, meta: dict, date_guess: str) -> dict:
+    title = (meta.get("title") or "").strip() or p.stem
+    date_ai = (meta.get("date") or "").strip()
+    summary = (meta.get("summary") or "").strip()
+    topics = meta.get("topics") or []
+    if not isinstance(topics, list):
+        topics = []
+
+    final_date = date_guess or date_ai or ""
+    date_source = "filename/text" if date_guess else ("ai" if date_ai else "")
+
+    # Use a dummy date for unknowns so UI sorting/filtering stays stable
+    if not final_date:
+        final_date = DUMMY_DATE_FOR_UNKNOWN
+        date_source = date_source or "dummy"
+
+    return {
+        "sourceFile": p.name,
+        "title": title,
+        "date": final_date,
+        "dateISO": final_date,
+        "dateSource": date_source,
+        "summary": summary,
+        "topics": [t.strip() for t in topics if isinstance(t, str) and t.strip()],
+        "wordCount": wc,
+        "text": text,
+        "updatedAt": datetime.now().isoformat(timespec="seconds"),
+    }
 
 
 def main():
@@ -212,9 +786,64 @@ def main():
     ap.add_argument("--model", type=str, default="gpt-4o-mini")
     ap.add_argument("--resume", action="store_true")
     ap.add_argument("--prune", action="store_true", help="Remove JSON entries whose sourceFile no longer exists")
+    ap.add_argument("--extractor", choices=list(EXTRACTORS), default="native", help="Text extractor to try first")
+    ap.add_argument("--workers", type=int, default=1, help="Files to extract/infer concurrently (1 = serial)")
+    ap.add_argument("--extract-workers", type=int, default=0,
+                    help="Extraction processes feeding the --workers inference threads (0 = extract inline)")
+    ap.add_argument("--queue-size", type=int, default=16, help="Max extracted files waiting for inference")
+    ap.add_argument("--llm-cache", type=str, default="", help="LLM response cache path. Default: next to output as llm_cache.json")
+    ap.add_argument("--llm-cache-max", type=int, default=5000, help="Max cached responses (least recently used are evicted)")
+    ap.add_argument("--no-llm-cache", action="store_true", help="Always call the API; don't read or write the response cache")
+    ap.add_argument("--input-tokens", type=int, default=3000,
+                    help="Token budget for the article text sent per request; longer articles are sent as "
+                         "head + tail (0 = whole article)")
+    ap.add_argument("--pack", type=int, default=1,
+                    help="Articles per API request (1 = one call per article; >1 ignores --extract-workers)")
+    ap.add_argument("--rpm", type=float, default=0,
+                    help="Requests-per-minute budget for API calls, e.g. your account tier's limit (0 = unlimited)")
+    ap.add_argument("--tpm", type=float, default=0,
+                    help="Tokens-per-minute budget for API calls (0 = unlimited)")
+    ap.add_argument("--max-retries", type=int, default=6,
+                    help="Retries per API call on 429/5xx/connection errors (backoff honours Retry-After)")
+    ap.add_argument("--batch-submit", type=str, default="",
+                    help="Make no API calls: apply cached answers, write the rest as a Batch API JSONL file here")
+    ap.add_argument("--batch-collect", type=str, default="",
+                    help="Merge a Batch API results JSONL into the output (no API calls; unanswered files stay pending)")
+    ap.add_argument("--extract-cache", type=str, default="",
+                    help="Extracted-text cache folder. Default: .cache/extract next to the archive folder")
+    ap.add_argument("--no-extract-cache", action="store_true", help="Always extract; don't read or write the text cache")
+    ap.add_argument("--db", type=str, default="",
+                    help="SQLite archive store (e.g. site/archive.db), updated per file; seeded from the JSON on first use")
+    ap.add_argument("--paranoid", action="store_true", help="Hash every file instead of trusting unchanged size/mtime")
+    ap.add_argument("--stat-cache", type=str, default="",
+                    help="Size/mtime of each archive file (hash fast path). Default: .cache/stat.json next to the archive folder")
+    ap.add_argument("--compact", action="store_true", help="Write data.json without indentation (smaller, same content)")
+    ap.add_argument("--manifest", action="store_true", help="Also write manifest.json + per-shard text files next to output")
+    ap.add_argument("--shard-by", choices=["year", "article"], default="year", help="How --manifest groups article text")
+    ap.add_argument("--search-index", action="store_true", help="Also write search.json (inverted index) next to output")
+    ap.add_argument("--search-positions", action="store_true",
+                    help="Store word positions in search.json so multi-word queries match exact phrases (~5x larger)")
+    ap.add_argument("--profile", action="store_true",
+                    help="Write the per-file (hash/extract/normalize/infer/commit) and per-run stage timings to "
+                         "<log-dir>/run-<timestamp>.json and print them")
+    ap.add_argument("--timings", type=str, default="", help="Write that same timing report to this JSON path instead")
+    ap.add_argument("--cprofile", type=str, default="",
+                    help="Also run under cProfile and dump the stats here (implies --profile; only the main "
+                         "thread is profiled, so use --workers 1 to see extraction and inference)")
+    ap.add_argument("--log-dir", type=str, default="",
+                    help="auto_publish.log (one line per run) and --profile reports. "
+                         "Default: kidder_logs next to the output's folder (the repo root for site/data.json)")
     ap.add_argument("--verbose", action="store_true")
     args = ap.parse_args()
 
+    profiler = None
+    if args.cprofile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    # Always on (a perf_counter() per stage): the run log line needs the stage times too
+    profile = RunProfile()
+    timed = profile.stage
+
     folder = Path(args.folder).expanduser()
     out_json = Path(args.output).expanduser()
     missing_csv = Path(args.missing_csv).expanduser()
@@ -227,6 +856,9 @@ def main():
 
     state_path = Path(args.state).expanduser() if args.state else (out_json.parent / "state.json")
     state = load_json(state_path, default={"files": {}})
+    stat_path = (Path(args.stat_cache).expanduser() if args.stat_cache
+                 else folder.resolve().parent / ".cache" / "stat.json")
+    merge_stat_cache(state, load_json(stat_path, default={}))
 
     existing = {"articles": [], "generatedAt": "", "errors": []}
     if args.resume and out_json.exists():
@@ -234,109 +866,198 @@ def main():
         if "articles" not in existing:
             existing = {"articles": existing if isinstance(existing, list) else [], "generatedAt": "", "errors": []}
 
-    articles = existing.get("articles", [])
-
+    db, run_id = None, None
+    if args.db:
+        db = ArchiveDB(Path(args.db).expanduser())
+        if db.is_empty():
+            db.import_snapshot(state, existing["articles"])
+        else:
+            state = db.load_state()
+            existing = {"articles": list(db.iter_articles()) if args.resume else [], "generatedAt": "", "errors": []}
+        if not args.resume:
+            db.clear_articles()
+        interrupted = db.unfinished_runs()
+        if interrupted:
+            # Per-file commits mean what they recorded is consistent; the rest is simply still pending
+            print(f"Note: {len(interrupted)} earlier run(s) did not finish; continuing from what they committed")
+        run_id = db.begin_run()
+
+    store = ArticleStore.from_payload(existing)
+
+    t_discover = time.perf_counter()
     docx_files = sorted(folder.glob("*.docx"))
     print(f"Found {len(docx_files)} .docx files in {folder}")
 
+    # Renames must be matched before pruning drops the old names
+    renames, fresh_entries = [], {}
+    if args.resume:
+        renames, fresh_entries = carry_over_renames(docx_files, state.setdefault("files", {}), store, args.verbose)
+        if db is not None:
+            for old, new in renames:
+                db.rename(old, new, state["files"][new], store.get(new))
+    renamed = len(renames)
+
     pruned_count = 0
     if args.prune:
-        existing_names = {p.name for p in docx_files}
-        kept = []
-        for a in articles:
-            sf = a.get("sourceFile")
-            if sf and sf not in existing_names:
-                pruned_count += 1
-                continue
-            kept.append(a)
-        articles = kept
-        existing["articles"] = articles
+        names = {p.name for p in docx_files}
+        pruned_count = store.prune(names)
+        for name in [n for n in state.get("files", {}) if n not in names]:
+            del state["files"][name]
+        if db is not None:
+            db.prune(names)
         if args.verbose:
             print(f"Pruned entries: {pruned_count}")
 
-    api_key = args.api_key or os.getenv("OPENAI_API_KEY", "")
-    if not api_key:
-        print("ERROR: No API key. Set OPENAI_API_KEY env var or pass --api-key.")
-        sys.exit(1)
-    if OpenAI is None:
-        print("ERROR: openai package not installed. Run: pip install openai")
+    batch_mode = bool(args.batch_submit or args.batch_collect)
+    batch_collect = Path(args.batch_collect).expanduser() if args.batch_collect else None
+    if batch_collect is not None and not batch_collect.exists():
+        print(f"ERROR: Batch results not found: {batch_collect}")
         sys.exit(1)
 
-    client = OpenAI(api_key=api_key)
+    client = None
+    if not batch_mode:
+        api_key = args.api_key or os.getenv("OPENAI_API_KEY", "")
+        if not api_key:
+            print("ERROR: No API key. Set OPENAI_API_KEY env var or pass --api-key.")
+            sys.exit(1)
+        if OpenAI is None:
+            print("ERROR: openai package not installed. Run: pip install openai")
+            sys.exit(1)
+
+        # Retries/backoff are handled by the shared limiter, not per-call inside the client
+        client = OpenAI(api_key=api_key, max_retries=0)
+    limiter = RateLimiter(rpm=args.rpm, tpm=args.tpm, max_concurrency=max(1, args.workers),
+                          max_retries=args.max_retries)
+    budget = InputBudget(args.model, args.input_tokens)
+
+    llm_cache = None
+    if not args.no_llm_cache:
+        cache_path = Path(args.llm_cache).expanduser() if args.llm_cache else (out_json.parent / "llm_cache.json")
+        llm_cache = LLMCache(cache_path, args.llm_cache_max)
+    elif batch_mode:
+        # Batch results are matched to files through the cache; keep it in memory only
+        llm_cache = LLMCache(None, args.llm_cache_max)
+
+    xcache = None
+    if not args.no_extract_cache:
+        xcache = ExtractCache(Path(args.extract_cache).expanduser() if args.extract_cache
+                              else folder.resolve().parent / ".cache" / "extract")
 
     errors = []
+    deferred = []
+    collected = 0
+    if batch_collect is not None:
+        batch_metas, batch_errors = read_results(batch_collect)
+        errors.extend(batch_errors)
+        # Room for every collected answer, so none is evicted before this run applies it
+        llm_cache.max_entries = max(llm_cache.max_entries, len(llm_cache) + len(batch_metas))
+        for key, meta in batch_metas.items():
+            llm_cache.put(key, meta)
+        collected = len(batch_metas)
+        print(f"Batch results: {collected} answers, {len(batch_errors)} errors from {batch_collect}")
+
     processed = 0
     updated = 0
     missing_date_rows = []
 
+    def commit_file(name, entry, article=None, meta=None, error=None):
+        t0 = time.perf_counter()
+        state.setdefault("files", {})[name] = entry
+        if db is not None:
+            db.record_file(name, entry, article, meta, args.model, error, run_id)
+        profile.add(name, "commit", time.perf_counter() - t0)
+
+    pending = []
+    hashed = len(fresh_entries) + renamed
     for i, p in enumerate(docx_files, start=1):
-        file_hash = sha256_file(p)
-        prev_hash = state.get("files", {}).get(p.name, "")
-        already = (prev_hash == file_hash)
+        prev_entry = state.get("files", {}).get(p.name)
+        if p.name in fresh_entries:
+            file_entry, changed = fresh_entries[p.name], True
+        else:
+            t0 = time.perf_counter()
+            file_entry, changed = file_state_entry(p, prev_entry, args.paranoid)
+            if file_entry is not prev_entry:
+                profile.add(p.name, "hash", time.perf_counter() - t0)
+        if file_entry is not prev_entry and p.name not in fresh_entries:
+            hashed += 1
+            # Same bytes, new size/mtime: refresh the stat fields so next run takes the fast path
+            if not changed:
+                commit_file(p.name, file_entry)
+        already = not changed
 
         if args.resume and already:
             if args.verbose:
                 print(f"[{i}/{len(docx_files)}] Skip unchanged: {p.name}")
             continue
 
+        pending.append((p, file_entry))
+    profile.record("discover", time.perf_counter() - t_discover)
+
+    if args.verbose:
+        print(f"Hashed {hashed}/{len(docx_files)} files (rest unchanged by size/mtime)")
+    if args.verbose and pending:
+        print(f"Pending: {len(pending)} (workers={max(1, args.workers)})")
+
+    input_tokens = {"baseline": 0, "sent": 0}
+    api_articles = 0
+    xcache_counts = {"hit": 0, "renormalized": 0, "miss": 0}
+    pipe_stats = {}
+    t_start = time.perf_counter()
+    results = iter_processed(client, args.model, pending, args.workers, args.extractor,
+                             args.extract_workers, args.queue_size, pipe_stats, llm_cache, limiter, budget,
+                             args.pack, xcache)
+
+    for i, (p, file_entry, res) in enumerate(results, start=1):
+        profile.add(p.name, "extract", res["extractSeconds"] - res["normalizeSeconds"])
+        if res["normalizeSeconds"]:
+            profile.add(p.name, "normalize", res["normalizeSeconds"])
+        if res["inferSeconds"]:
+            profile.add(p.name, "infer", res["inferSeconds"])
+        api_articles += res["apiCall"]
+        if res["extractCache"]:
+            xcache_counts[res["extractCache"]] += 1
+        if res["inputTokens"]:
+            input_tokens["baseline"] += res["inputTokens"]["baseline"]
+            input_tokens["sent"] += res["inputTokens"]["sent"]
+
         if args.verbose:
-            print(f"[{i}/{len(docx_files)}] Processing: {p.name}")
+            print(f"[{i}/{len(pending)}] Processing: {p.name}")
 
-        text = run_pandoc_extract(p) or docx_extract_fallback(p)
-        text = normalize_whitespace(text)
-        text = fix_hard_wrapped_lines(text)
-        wc = word_count(text)
+        text = res["text"]
+        wc = res["wordCount"]
 
-        if wc == 0:
+        if res["deferred"] is not None:
+            # No answer yet: leave out of state so the file stays pending
+            key, body = res["deferred"]
+            deferred.append((p.name, key, body))
+            if args.verbose:
+                print(f"  DEFERRED to batch: {p.name}")
+            continue
+
+        if res["error"] is None and wc == 0:
             if args.verbose:
                 print(f"  SKIP (0 words): {p.name}")
-            state.setdefault("files", {})[p.name] = file_hash
+            commit_file(p.name, file_entry)
             continue
 
-        date_guess = parse_date_from_filename(p.name) or parse_date_from_text(text) or ""
+        if res["error"] is not None:
+            errors.append({"file": p.name, "error": res["error"]})
+            if args.verbose:
+                print(f"  ERROR on {p.name}: {res['error']}")
+            commit_file(p.name, file_entry, error=res["error"])
+            continue
 
+        date_guess = parse_date_from_filename(p.name) or res["dateFromText"] or ""
+
+        article = err = None
         try:
-            meta = openai_infer(client, args.model, text)
-            title = (meta.get("title") or "").strip() or p.stem
-            date_ai = (meta.get("date") or "").strip()
-            summary = (meta.get("summary") or "").strip()
-            topics = meta.get("topics") or []
-            if not isinstance(topics, list):
-                topics = []
-
-            final_date = date_guess or date_ai or ""
-            date_source = "filename/text" if date_guess else ("ai" if date_ai else "")
-
-            # Use a dummy date for unknowns so UI sorting/filtering stays stable
-            if not final_date:
-                final_date = DUMMY_DATE_FOR_UNKNOWN
-                date_source = date_source or "dummy"
-
-            article = {
-                "sourceFile": p.name,
-                "title": title,
-                "date": final_date,
-                "dateISO": final_date,
-                "dateSource": date_source,
-                "summary": summary,
-                "topics": [t.strip() for t in topics if isinstance(t, str) and t.strip()],
-                "wordCount": wc,
-                "text": text,
-                "updatedAt": datetime.now().isoformat(timespec="seconds"),
-            }
-
-            existing_entry = None
-            for idx_a, a in enumerate(articles):
-                if a.get("sourceFile") == p.name:
-                    existing_entry = idx_a
-                    break
-
-            if existing_entry is None:
-                articles.append(article)
-                updated += 1
-            else:
-                articles[existing_entry] = article
-                updated += 1
+            article = build_article(p, text, wc, res["meta"], date_guess)
+            title = article["title"]
+            final_date = article["date"]
+            date_source = article["dateSource"]
+
+            store.upsert(article)
+            updated += 1
 
             processed += 1
 
@@ -349,53 +1070,134 @@ def main():
                 print(f"  OK  {title}  [{d_disp}]  ({date_source or '-'} / wc={wc})")
 
         except Exception as e:
-            err = {"file": p.name, "error": str(e)}
-            errors.append(err)
+            article, err = None, str(e)
+            errors.append({"file": p.name, "error": err})
             if args.verbose:
                 print(f"  ERROR on {p.name}: {e}")
 
-        state.setdefault("files", {})[p.name] = file_hash
-        time.sleep(0.1)
-
-    dedup = {}
-    for a in articles:
-        sf = a.get("sourceFile")
-        if sf:
-            dedup[sf] = a
-
-    articles = sorted(
-        dedup.values(),
-        key=lambda x: (x.get("date") or "", x.get("title") or ""),
-        reverse=True,
-    )
-
-    payload = {
-        "generatedAt": datetime.now().isoformat(timespec="seconds"),
-        "articles": articles,
-        "errors": errors,
-    }
-    save_json(out_json, payload)
-    save_json(state_path, state)
-
-    missing_csv.parent.mkdir(parents=True, exist_ok=True)
-    with open(missing_csv, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["sourceFile", "title", "wordCount"])
-        for row in missing_date_rows:
-            w.writerow(row)
+        commit_file(p.name, file_entry, article, res["meta"] if article is not None else None, err)
+
+    stage_wall = time.perf_counter() - t_start
+    profile.record("process", stage_wall)
+
+    # data.json is streamed one article at a time; with --db straight off an SQLite cursor
+    generated_at = datetime.now().isoformat(timespec="seconds")
+    articles = None
+    if db is None or args.manifest or args.search_index:
+        articles = db.export_articles() if db is not None else store.export()
+    with timed("export"):
+        export = write_json_stream(out_json, {"generatedAt": generated_at}, "articles",
+                                   articles if articles is not None else db.iter_export(), {"errors": errors},
+                                   args.compact)
+    data_changed = export["changed"]
+    with timed("state"):
+        committed_state, stats = split_state(state)
+        save_json(state_path, committed_state)
+        save_json(stat_path, stats)
+    shard_stats = None
+    if args.manifest:
+        with timed("manifest"):
+            shard_stats = write_sharded(out_json.parent, articles, generated_at, args.shard_by)
+        data_changed = data_changed or shard_stats["changed"]
+    search_stats = None
+    if args.search_index:
+        with timed("search"):
+            search_stats = write_search_index(out_json.parent, articles, args.search_positions)
+        data_changed = data_changed or search_stats["changed"]
+    if llm_cache is not None:
+        llm_cache.save()
+    if db is not None:
+        db.finish_run(run_id, {"processed": processed, "updated": updated, "renamed": renamed,
+                               "pruned": pruned_count, "errors": len(errors)})
+        db.close()
+    batch_bytes = 0
+    if args.batch_submit:
+        batch_bytes = write_batch(Path(args.batch_submit).expanduser(), deferred)
+
+    buf = io.StringIO(newline="")
+    w = csv.writer(buf)
+    w.writerow(["sourceFile", "title", "wordCount"])
+    for row in missing_date_rows:
+        w.writerow(row)
+    if not missing_csv.exists() or missing_csv.read_bytes().decode("utf-8") != buf.getvalue():
+        atomic_write_text(missing_csv, buf.getvalue())
 
     print("\n" + "=" * 50)
-    print(f"Done. processed={processed}, updated={updated}, pruned={pruned_count}")
-    print(f"Total articles in JSON: {len(articles)}")
+    print(f"Done. processed={processed}, updated={updated}, renamed={renamed}, pruned={pruned_count}")
+    print(f"Total articles in JSON: {export['items']}")
     print(f"Missing dates: {len(missing_date_rows)} (see {missing_csv})")
     print(f"Errors: {len(errors)}")
-    print(f"Output: {out_json}")
+    if batch_mode:
+        print(f"Batch: collected={collected}, still pending={len(deferred)}")
+    if args.batch_submit:
+        print(f"Batch requests: {len(deferred)} written to {args.batch_submit} ({batch_bytes} bytes)")
+        if deferred:
+            print("Next: run them through the Batch API (or bench/fake_batch.py offline), then "
+                  "re-run with --resume --batch-collect <results.jsonl>")
+    if xcache is not None and pending:
+        print(f"Extract cache: hits={xcache_counts['hit']}, renormalized={xcache_counts['renormalized']}, "
+              f"misses={xcache_counts['miss']}")
+    if llm_cache is not None:
+        print(f"LLM cache: hits={llm_cache.hits}, misses={llm_cache.misses}, entries={len(llm_cache)}")
+    if input_tokens["baseline"]:
+        saved = input_tokens["baseline"] - input_tokens["sent"]
+        print(f"Input tokens ({budget.counter.name}): sent={input_tokens['sent']}, "
+              f"first-{LEGACY_CHAR_LIMIT}-chars={input_tokens['baseline']}, "
+              f"saved={saved} ({100.0 * saved / input_tokens['baseline']:.1f}%)")
+    if limiter.stats["calls"] or limiter.stats["retries"]:
+        print(f"Rate limiter: {limiter.summary()}")
+    if api_articles:
+        calls = limiter.stats["calls"]
+        used = limiter.stats["usedTokens"]
+        print(f"API: {calls} requests, {used} tokens for {api_articles} articles "
+              f"({calls / api_articles:.2f} requests, {used / api_articles:.0f} tokens per article; pack={args.pack})")
+    if pending:
+        print(f"Stage utilization ({stage_wall:.2f}s wall):")
+        stage_busy = {"extract": profile.total("extract") + profile.total("normalize"),
+                      "infer": profile.total("infer")}
+        for line in format_utilization(stage_busy, stage_wall, args.extract_workers, args.workers, pipe_stats):
+            print(line)
+    print(f"Output: {out_json}" + ("" if data_changed else " (unchanged, not rewritten)"))
+    print(f"Export: {export['bytes']} bytes ({'compact' if args.compact else 'indented'}), "
+          f"peak RSS {peak_rss_bytes() / 2**20:.1f} MB")
+    if shard_stats:
+        print(f"Manifest: {shard_stats['manifestBytes']} bytes + {shard_stats['shards']} text shards "
+              f"({shard_stats['shardBytes']} bytes, by {args.shard_by})")
+    if search_stats:
+        print(f"Search index: {search_stats['terms']} terms, {search_stats['searchBytes']} bytes")
     print(f"State:  {state_path}")
+    if args.db:
+        print(f"DB:     {args.db} (run #{run_id})")
+
+    exit_code = 8 if data_changed else 0
+    report = profile.report(exitCode=exit_code, archiveFiles=len(docx_files), pending=len(pending),
+                            processed=processed, updated=updated, renamed=renamed, pruned=pruned_count,
+                            errors=len(errors), workers=args.workers, extractWorkers=args.extract_workers,
+                            pack=args.pack, model=args.model)
+    log_dir = (Path(args.log_dir).expanduser() if args.log_dir
+               else out_json.resolve().parent.parent / "kidder_logs")
+    report_path = None
+    if args.timings:
+        report_path = profile.write(log_dir, report, Path(args.timings).expanduser())
+    elif args.profile or args.cprofile:
+        report_path = profile.write(log_dir, report)
+    append_log(log_dir / "auto_publish.log", summary_line(report, report_path))
+    if args.profile or args.cprofile:
+        print(f"Profile: {report_path}")
+        for stage, s in report["stages"].items():
+            if s["count"]:
+                print(f"  {stage:<10} n={s['count']:<5} total={s['total']:.2f}s  p50={s['p50']:.4f}s  "
+                      f"p95={s['p95']:.4f}s  max={s['max']:.4f}s")
+        print("  run: " + ", ".join(f"{k} {v:.2f}s" for k, v in report["runStages"].items()))
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+        print(f"cProfile stats: {args.cprofile} (python3 -m pstats {args.cprofile})")
 
     # Exit codes:
-    # 0 = nothing updated
+    # 0 = nothing updated (site JSON identical apart from timestamps)
     # 8 = updated JSON (including prune-only changes)
-    sys.exit(8 if (updated > 0 or pruned_count > 0) else 0)
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
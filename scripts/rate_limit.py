@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+rate_limit.py — shared rate limiting + retry for OpenAI calls
+=============================================================
+One RateLimiter is shared by every inference thread:
+
+- Token buckets for requests-per-minute and tokens-per-minute budgets
+  (0 disables a budget)
+- Retries 429 / 408 / 5xx / connection errors with exponential backoff and
+  full jitter, honouring Retry-After / retry-after-ms when the server sends it
+- A throttle response pauses *all* callers until the retry time, rather than
+  every thread discovering the limit separately
+- Adaptive concurrency (AIMD): halve the allowed in-flight calls on a 429,
+  add one back after a run of successes, never above max_concurrency
+
+Errors are inspected by duck typing (status_code / response.headers), so this
+module does not import openai.
+"""
+
+import random
+import threading
+import time
+
+RETRYABLE_STATUS = {408, 409, 429}
+RETRYABLE_NAMES = {"APIConnectionError", "APITimeoutError", "ConnectionError", "TimeoutError"}
+
+
+def error_status(exc) -> int:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else 0
+
+
+def is_retryable(exc) -> bool:
+    status = error_status(exc)
+    if status in RETRYABLE_STATUS or status >= 500:
+        return True
+    return any(cls.__name__ in RETRYABLE_NAMES for cls in type(exc).__mro__)
+
+
+def retry_after_seconds(exc):
+    """
+    Server-requested wait from Retry-After / retry-after-ms headers, or None.
+    """
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        ms = headers.get("retry-after-ms")
+        if ms is not None:
+            return max(0.0, float(ms) / 1000.0)
+        s = headers.get("retry-after")
+        if s is not None:
+            return max(0.0, float(s))
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+class TokenBucket:
+    """
+    Refills continuously at per_minute/60 units per second and holds at most
+    `burst_seconds` worth, so a fresh bucket can't fire a whole minute's budget at
+    once (the API replenishes continuously too). per_minute <= 0 = unlimited.
+
+    A request bigger than the burst only waits for a full bucket, but is charged
+    in full: the level goes negative and later callers wait out the debt, so the
+    long-run rate stays at per_minute whatever the request size.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = 1.0):
+        self.rate = max(0.0, float(per_minute)) / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds) if self.rate > 0 else 0.0
+        self.level = self.capacity
+        self.stamp = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """
+        Seconds until `amount` is available (0 = take it now). Caller holds the limiter lock.
+        """
+        if self.capacity <= 0:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        if self.capacity > 0:
+            self.level -= amount
+
+    def give(self, amount: float):
+        if self.capacity > 0:
+            self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    def __init__(self, rpm: float = 0, tpm: float = 0, max_concurrency: int = 1,
+                 min_concurrency: int = 1, max_retries: int = 6,
+                 base_delay: float = 1.0, max_delay: float = 60.0):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = self.max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._cond = threading.Condition()
+        self._inflight = 0
+        self._paused_until = 0.0
+        self._streak = 0
+
+        self.stats = {"calls": 0, "retries": 0, "throttled": 0, "usedTokens": 0, "waitSeconds": 0.0,
+                      "minLimit": self.limit, "finalLimit": self.limit}
+
+    def _acquire(self, est_tokens: float):
+        t0 = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = max(
+                    self._paused_until - now,
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(est_tokens, now),
+                    0.0,
+                )
+                if wait <= 0 and self._inflight < self.limit:
+                    self.requests.take(1)
+                    self.tokens.take(est_tokens)
+                    self._inflight += 1
+                    self.stats["waitSeconds"] += now - t0
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def _release(self):
+        with self._cond:
+            self._inflight -= 1
+            self._cond.notify_all()
+
+    def _on_success(self, est_tokens: float, used_tokens):
+        with self._cond:
+            self.stats["calls"] += 1
+            if isinstance(used_tokens, int) and used_tokens > 0:
+                self.stats["usedTokens"] += used_tokens
+                # Settle the estimate (charged in full by _acquire) against what the API counted
+                diff = est_tokens - used_tokens
+                if diff > 0:
+                    self.tokens.give(diff)
+                else:
+                    self.tokens.take(-diff)
+            self._streak += 1
+            if self._streak >= self.limit and self.limit < self.max_concurrency:
+                self.limit += 1
+                self._streak = 0
+                self._cond.notify_all()
+            self.stats["finalLimit"] = self.limit
+
+    def _on_retry(self, delay: float, throttled: bool):
+        with self._cond:
+            self.stats["retries"] += 1
+            if not throttled:
+                return
+            self.stats["throttled"] += 1
+            self._streak = 0
+            self.limit = max(self.min_concurrency, self.limit // 2)
+            self.stats["minLimit"] = min(self.stats["minLimit"], self.limit)
+            self.stats["finalLimit"] = self.limit
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    def backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(max_delay, base * 2^attempt)]
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, fn, est_tokens: float = 0):
+        """
+        Run fn() within the budgets, retrying retryable errors. Re-raises the last
+        error once max_retries is exhausted (or immediately for non-retryable ones).
+        """
+        attempt = 0
+        while True:
+            self._acquire(est_tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                self._release()
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                server_wait = retry_after_seconds(e)
+                delay = server_wait if server_wait is not None else self.backoff(attempt)
+                self._on_retry(delay, error_status(e) == 429)
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self._release()
+            usage = getattr(result, "usage", None)
+            self._on_success(est_tokens, getattr(usage, "total_tokens", None))
+            return result
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"calls={s['calls']}, retries={s['retries']}, throttled={s['throttled']}, "
+                f"concurrency min/final={s['minLimit']}/{s['finalLimit']} of {self.max_concurrency}, "
+                f"queued={s['waitSeconds']:.1f}s (summed over threads)")
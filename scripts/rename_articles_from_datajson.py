@@ -14,6 +14,7 @@ New filename format:
 - Title comes from data.json "title", cleaned (removes PJ/Post-Journal/etc suffixes)
 - Handles duplicates by appending " - 2", " - 3", etc.
 - Optionally updates site/state.json file keys to match new filenames.
+- Optionally updates data.json sourceFile fields too (--update-data), so no reprocess is needed.
 
 Usage examples:
   python3 scripts/rename_articles_from_datajson.py \
@@ -25,7 +26,7 @@ Usage examples:
     --data site/data.json \
     --folder KIDDER_ARTICLE_ARCHIVES \
     --mapping rename_map.csv \
-    --apply --update-state
+    --apply --update-state --update-data
 """
 
 import argparse
@@ -36,6 +37,10 @@ import sys
 from pathlib import Path
 from datetime import datetime
 
+from article_store import ArticleStore
+from atomic_io import atomic_write_text
+from text_normalize import clean_title
+
 
 DUMMY_DATE = "0001-01-01"
 
@@ -80,38 +85,6 @@ def safe_filename(name: str) -> str:
     return name
 
 
-def clean_title(title: str) -> str:
-    t = (title or "").strip()
-
-    # Remove common suffix junk (case-insensitive)
-    # Examples: "Some Title - PJ", "Some Title (Post Journal)", "Some Title — Local Commentaries"
-    junk_patterns = [
-        r"\bP\.?\s*J\.?\b",
-        r"\bPost[-\s]?Journal\b",
-        r"\bJamestown\s+Post[-\s]?Journal\b",
-        r"\bLocal\s+Commentaries?\b",
-        r"\bOpinion\s*&\s*Commentar(y|ies)\b",
-        r"\bOpinion\s+and\s+Commentar(y|ies)\b",
-    ]
-
-    # Strip trailing segments that are just junk tokens
-    # e.g., "Title — PJ" or "Title - Post Journal"
-    t2 = t
-    for pat in junk_patterns:
-        t2 = re.sub(rf"(\s*[-—:|]\s*{pat}\s*)$", "", t2, flags=re.IGNORECASE).strip()
-        t2 = re.sub(rf"(\s*\(\s*{pat}\s*\)\s*)$", "", t2, flags=re.IGNORECASE).strip()
-
-    # Also remove standalone trailing "PJ" in parentheses or after dash
-    t2 = re.sub(r"\s*[-—:|]\s*(PJ)\s*$", "", t2, flags=re.IGNORECASE).strip()
-    t2 = re.sub(r"\(\s*PJ\s*\)\s*$", "", t2, flags=re.IGNORECASE).strip()
-
-    # Collapse whitespace again
-    t2 = re.sub(r"\s+", " ", t2).strip()
-
-    # Fallback if title becomes empty
-    return t2 if t2 else (t or "Untitled")
-
-
 def make_target_name(title: str, date_iso: str) -> str:
     title = clean_title(title)
     title = safe_filename(title)
@@ -157,7 +130,9 @@ def uniquify(target: Path) -> Path:
 def update_state_keys(state_path: Path, mapping: list[tuple[str, str]]) -> bool:
     """
     state.json format: { "files": { "<filename.docx>": "<hash>", ... } }
-    We move hashes from old filename to new filename.
+    We move entries from old filename to new filename, so the processor still sees
+    the renamed files as unchanged. Their size/mtime entries in .cache/stat.json are
+    not moved: each renamed file is hashed once more on the next run.
     """
     if not state_path.exists():
         print(f"[state] No state.json found at {state_path} (skipping).")
@@ -182,18 +157,35 @@ def update_state_keys(state_path: Path, mapping: list[tuple[str, str]]) -> bool:
             moved += 1
 
     state["files"] = files
-    state_path.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    atomic_write_text(state_path, json.dumps(state, ensure_ascii=False, indent=2))
     print(f"[state] Updated {state_path}: moved {moved} keys.")
     return moved > 0
 
 
+def update_data_sources(data_path: Path, data, store: ArticleStore, mapping: list[tuple[str, str]]) -> bool:
+    """
+    Point data.json sourceFile fields at the renamed files.
+    """
+    moved = sum(1 for old_name, new_name in mapping if store.rename(old_name, new_name))
+    if isinstance(data, dict):
+        data["articles"] = store.export()
+    else:
+        data = store.export()
+    atomic_write_text(data_path, json.dumps(data, ensure_ascii=False, indent=2))
+    print(f"[data] Updated {data_path}: moved {moved} sourceFile entries.")
+    return moved > 0
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--data", required=True, help="Path to site/data.json")
     ap.add_argument("--folder", required=True, help="Folder containing .docx files (KIDDER_ARTICLE_ARCHIVES)")
     ap.add_argument("--mapping", default="rename_map.csv", help="CSV output: old,new")
     ap.add_argument("--apply", action="store_true", help="Actually rename files (default is dry-run)")
-    ap.add_argument("--update-state", action="store_true", help="Update site/state.json keys to match renamed filenames")
+    ap.add_argument("--update-state", action="store_true",
+                    help="Update site/state.json keys to match renamed filenames "
+                         "(optional: process_articles.py --resume also detects renames by content hash)")
+    ap.add_argument("--update-data", action="store_true", help="Update data.json sourceFile fields to match renamed filenames")
     ap.add_argument("--state", default="", help="Optional state.json path (default: <data parent>/state.json)")
     args = ap.parse_args()
 
@@ -210,10 +202,11 @@ def main():
         sys.exit(2)
 
     data = load_json(data_path)
-    articles = data.get("articles", data if isinstance(data, list) else [])
+    articles = data.get("articles") if isinstance(data, dict) else data
     if not isinstance(articles, list):
         print("ERROR: data.json doesn't contain an 'articles' list.")
         sys.exit(2)
+    store = ArticleStore.from_payload(data)
 
     # Build rename plan based on sourceFile
     # We only rename if the sourceFile exists in the folder and ends with .docx
@@ -223,7 +216,7 @@ def main():
     skipped_missing = 0
     skipped_nochange = 0
 
-    for a in articles:
+    for a in store.export():
         source = (a.get("sourceFile") or "").strip()
         if not source.lower().endswith(".docx"):
             continue
@@ -294,10 +287,13 @@ def main():
     # Optionally update state.json keys
     if args.update_state and applied:
         update_state_keys(state_path, applied)
+    if args.update_data and applied:
+        update_data_sources(data_path, data, store, applied)
 
     print("\nNext step:")
-    print("1) Run your processor to regenerate site/data.json so sourceFile fields match new filenames.")
-    print("2) Commit + push changes to GitHub.")
+    if not args.update_data:
+        print("- Run your processor to regenerate site/data.json so sourceFile fields match new filenames.")
+    print("- Commit + push changes to GitHub.")
     sys.exit(0)
 
 
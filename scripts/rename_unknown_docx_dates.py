@@ -1,27 +1,12 @@
 #!/usr/bin/env python3
-import csv, glob, os, re, shutil, sys, unicodedata
+import csv, glob, os, re, shutil, sys
 from pathlib import Path
 
+from text_normalize import fold_title
+
 UNKNOWN = "0001-01-01"
 RX_DATE = re.compile(r"\s*\((\d{4}-\d{2}-\d{2})\)\.docx$", re.I)
 
-def fix_mojibake(s: str) -> str:
-    return (s.replace("â€™", "’").replace("â€˜", "‘")
-             .replace("â€”", "—").replace("â€“", "–")
-             .replace("â€œ", "“").replace("â€�", "”")
-             .replace("Â", ""))
-
-def norm_title(s: str) -> str:
-    s = str(s).strip()
-    s = fix_mojibake(s)
-    s = unicodedata.normalize("NFKC", s)
-    s = s.replace("–", "-").replace("—", "-")
-    s = s.replace("’", "'").replace("‘", "'").replace("“", '"').replace("”", '"')
-    s = re.sub(r"\s+", " ", s).strip()
-    s = re.sub(r"[?]+$", "-", s)
-    s = re.sub(r"\s*-\s*$", "-", s)
-    return s.lower()
-
 def base_title(filename: str) -> str:
     # removes (YYYY-MM-DD).docx suffix
     return RX_DATE.sub("", filename).strip()
@@ -55,7 +40,7 @@ def main():
 
     for p in unknown_files:
         t = base_title(p.name)
-        tn = norm_title(t)
+        tn = fold_title(t)
         d = date_map.get(tn, "")
         if not d:
             print("NO DATE MAP FOR:", p.name)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+run_profile.py — per-stage timing report for process_articles.py
+================================================================
+- Per file:  hash, extract (docx -> raw text, incl. the extract cache),
+  normalize, infer (LLM call incl. rate-limit waits and retries; split evenly
+  across a pack) and commit (state / --db write)
+- Per run:   discover (scan, renames, hashing), process (the whole extract +
+  infer pipeline), export (data.json), state, manifest, search
+- Each per-file stage is summarized as count / total / p50 / p95 / max, and
+  the slowest files are listed
+
+Every run appends a one-line summary to kidder_logs/auto_publish.log; with
+--profile the full report goes to kidder_logs/run-<timestamp>.json (or to
+the --timings path).
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from atomic_io import atomic_write_text
+
+FILE_STAGES = ("hash", "extract", "normalize", "infer", "commit")
+SLOWEST_FILES = 10
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = min(len(s) - 1, max(0, int(round(pct / 100.0 * (len(s) - 1)))))
+    return s[k]
+
+
+def stage_summary(values: list) -> dict:
+    return {
+        "count": len(values),
+        "total": round(sum(values), 6),
+        "p50": round(percentile(values, 50), 6),
+        "p95": round(percentile(values, 95), 6),
+        "max": round(max(values), 6) if values else 0.0,
+    }
+
+
+class RunProfile:
+    def __init__(self):
+        self.started = datetime.now()
+        self.t0 = time.perf_counter()
+        self.files = {}
+        self.run_stages = {}
+
+    def add(self, name: str, stage: str, seconds: float):
+        stages = self.files.setdefault(name, {})
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+    def total(self, stage: str) -> float:
+        return sum(st.get(stage, 0.0) for st in self.files.values())
+
+    def record(self, stage: str, seconds: float):
+        self.run_stages[stage] = self.run_stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, stage: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - t0)
+
+    def report(self, **extra) -> dict:
+        wall = time.perf_counter() - self.t0
+        stages = {s: stage_summary([f[s] for f in self.files.values() if s in f]) for s in FILE_STAGES}
+        totals = sorted(((sum(st.values()), name) for name, st in self.files.items()), reverse=True)
+        return {
+            "startedAt": self.started.isoformat(timespec="seconds"),
+            "wallSeconds": round(wall, 4),
+            **extra,
+            "runStages": {k: round(v, 6) for k, v in self.run_stages.items()},
+            "stages": stages,
+            "slowestFiles": [{"file": name, "seconds": round(total, 6),
+                              "stages": {k: round(v, 6) for k, v in self.files[name].items()}}
+                             for total, name in totals[:SLOWEST_FILES]],
+            "files": [{"file": name, **{k: round(v, 6) for k, v in st.items()}}
+                      for name, st in self.files.items()],
+        }
+
+    def write(self, log_dir: Path, report: dict, path: Path = None) -> Path:
+        path = path or log_dir / f"run-{self.started.strftime('%Y%m%d-%H%M%S')}.json"
+        atomic_write_text(path, json.dumps(report, indent=1))
+        return path
+
+
+def summary_line(report: dict, report_path: Path = None) -> str:
+    """
+    One line for auto_publish.log: outcome counts, wall time, every run stage, and
+    the per-file stage with the most total time.
+    """
+    counts = " ".join(f"{k}={report[k]}" for k in ("exitCode", "archiveFiles", "pending", "processed", "updated",
+                                                    "renamed", "pruned", "errors") if k in report)
+    run_stages = ", ".join(f"{k} {v:.2f}s" for k, v in report["runStages"].items())
+    busiest = max(((v["total"], k) for k, v in report["stages"].items() if v["count"]), default=None)
+    per_file = "no files"
+    if busiest:
+        s = report["stages"][busiest[1]]
+        per_file = f"{busiest[1]} p50 {s['p50']:.3f}s p95 {s['p95']:.3f}s max {s['max']:.3f}s"
+    return (f"{report['startedAt']} process_articles {counts} wall={report['wallSeconds']:.2f}s"
+            f" | {run_stages} | busiest per-file stage: {per_file}"
+            + (f" | report={report_path}" if report_path else ""))
+
+
+def append_log(path: Path, line: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        f.write(line + "\n")
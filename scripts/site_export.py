@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+site_export.py — sharded static-site output
+===========================================
+Splits the article list into:
+- manifest.json: everything the dashboard needs to draw cards and filter
+  (no article text), so first paint stays small as the archive grows
+- text/<shard>.json: full article text, fetched only when an article is opened
+
+Shards are per year (default) or per article. The manifest/shards sit next to
+data.json, which is still written for the scripts that read it.
+
+Also builds search.json, a prebuilt inverted index over title, summary, text
+and topics, so the page answers queries without scanning article text.
+"""
+
+import hashlib
+import re
+from pathlib import Path
+
+from atomic_io import write_json_if_changed
+
+MANIFEST_FIELDS = ("sourceFile", "title", "date", "summary", "topics", "wordCount")
+SHARD_DIR = "text"
+SEARCH_FIELDS = ("title", "summary", "text", "topics")
+
+# Must match tokenize() in site/index.html
+TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+
+def shard_id(article: dict, shard_by: str) -> str:
+    if shard_by == "article":
+        return hashlib.sha1(article["sourceFile"].encode("utf-8")).hexdigest()[:12]
+    return (article.get("date") or "0000")[:4]
+
+
+def _write_json(path: Path, data) -> bool:
+    return write_json_if_changed(path, data, compact=True)
+
+
+def write_sharded(out_dir: Path, articles: list, generated_at: str, shard_by: str = "year") -> dict:
+    """
+    Write manifest.json + text/<shard>.json under out_dir and remove stale shards.
+    `articles` should already be in export order. Files whose content is unchanged are
+    left untouched. Returns size stats plus whether anything changed on disk.
+    """
+    shards = {}
+    manifest = []
+    for a in articles:
+        sid = shard_id(a, shard_by)
+        shards.setdefault(sid, {})[a["sourceFile"]] = a.get("text") or ""
+        entry = {k: a[k] for k in MANIFEST_FIELDS if k in a}
+        entry["shard"] = sid
+        manifest.append(entry)
+
+    shard_dir = out_dir / SHARD_DIR
+    shard_bytes = 0
+    changed = False
+    for sid, texts in shards.items():
+        path = shard_dir / f"{sid}.json"
+        changed = _write_json(path, {"texts": texts}) or changed
+        shard_bytes += path.stat().st_size
+
+    if shard_dir.exists():
+        for old in shard_dir.glob("*.json"):
+            if old.stem not in shards:
+                old.unlink()
+                changed = True
+
+    manifest_path = out_dir / "manifest.json"
+    changed = _write_json(manifest_path, {
+        "generatedAt": generated_at,
+        "shardBase": SHARD_DIR + "/",
+        "articles": manifest,
+    }) or changed
+
+    return {
+        "manifestBytes": manifest_path.stat().st_size,
+        "shards": len(shards),
+        "shardBytes": shard_bytes,
+        "changed": changed,
+    }
+
+
+def tokenize(s: str) -> list:
+    return TOKEN_RE.findall((s or "").lower().replace("\u2019", "'").replace("\u2018", "'"))
+
+
+def build_search_index(articles: list, positions: bool = False) -> dict:
+    """
+    Inverted index: term -> postings of docs (and, optionally, word positions).
+
+    Layout (all ints delta-encoded, terms front-coded):
+      docs:      [sourceFile, ...]                 doc number = list index
+      prefix:    [shared prefix length with previous term, ...]
+      suffix:    [rest of term, ...]               terms are sorted
+      postings:  positions=False: [[docDelta, ...], ...]
+                 positions=True:  [[docDelta, nPos, posDelta..., docDelta, ...], ...]
+
+    Positions make multi-word queries exact phrases but cost ~5x the size;
+    without them a multi-word query matches docs containing every word.
+    Positions run across the searched fields with a gap between fields, so a
+    phrase never matches across the end of the title and the start of the summary.
+    """
+    index = {}
+    docs = []
+    for doc, a in enumerate(articles):
+        docs.append(a.get("sourceFile") or "")
+        pos = 0
+        for field in SEARCH_FIELDS:
+            val = a.get(field)
+            if isinstance(val, list):
+                val = " ".join(v for v in val if isinstance(v, str))
+            for tok in tokenize(val):
+                index.setdefault(tok, {}).setdefault(doc, []).append(pos)
+                pos += 1
+            pos += 1
+
+    prefix, suffix, postings = [], [], []
+    prev_term = ""
+    for term in sorted(index):
+        k = 0
+        while k < len(term) and k < len(prev_term) and term[k] == prev_term[k]:
+            k += 1
+        prefix.append(k)
+        suffix.append(term[k:])
+        prev_term = term
+
+        flat = []
+        prev_doc = 0
+        for doc, doc_pos in index[term].items():
+            flat.append(doc - prev_doc)
+            prev_doc = doc
+            if not positions:
+                continue
+            flat.append(len(doc_pos))
+            prev_pos = 0
+            for p in doc_pos:
+                flat.append(p - prev_pos)
+                prev_pos = p
+        postings.append(flat)
+
+    return {"v": 1, "positions": positions, "docs": docs,
+            "prefix": prefix, "suffix": suffix, "postings": postings}
+
+
+def write_search_index(out_dir: Path, articles: list, positions: bool = False) -> dict:
+    path = out_dir / "search.json"
+    idx = build_search_index(articles, positions)
+    changed = _write_json(path, idx)
+    return {"searchBytes": path.stat().st_size, "terms": len(idx["suffix"]), "changed": changed}
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+text_normalize.py — shared text / title normalization
+=====================================================
+- normalize_text(): article body cleanup in one regex pass. Mojibake repair,
+  whitespace collapsing and hard-wrap joining (paragraph breaks kept), i.e.
+  what fix_mojibake() + normalize_whitespace() + fix_hard_wrapped_lines() did
+  in eleven chained passes
+- fix_mojibake(): UTF-8-read-as-cp1252 repair ("â€™" -> "’", stray "Â")
+- fold_title(): matching key for titles (mojibake, NFKC, dashes/quotes folded
+  to ASCII, whitespace collapsed, lowercased); the title_norm of the date maps
+- clean_title(): strips "- PJ", "(Post Journal)", "— Local Commentaries" and
+  similar suffixes from LLM titles before they become filenames
+
+All patterns and tables are compiled once, at import.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+MOJIBAKE = {
+    "â€™": "’",
+    "â€˜": "‘",
+    "â€”": "—",
+    "â€“": "–",
+    "â€œ": "“",
+    "â€�": "”",
+}
+RX_MOJIBAKE = re.compile("|".join(map(re.escape, MOJIBAKE)) + "|Â")
+
+# One match per whitespace run that isn't already a single space (a stray "Â" counts
+# as part of the run it sits in), or per mojibake sequence
+RX_TEXT = re.compile("[ \t\r\nÂ]{2,}|[\t\r\nÂ]|" + "|".join(map(re.escape, MOJIBAKE)))
+RX_PARAGRAPH = re.compile(r"\n{2,}")
+RX_SPACES = re.compile(r" {2,}")
+RUN_TO_SPACE = str.maketrans({"\t": " ", "\n": " "})
+
+# str.replace per pair beats str.translate on short strings with non-ASCII text
+TITLE_FOLD = (("–", "-"), ("—", "-"), ("’", "'"), ("‘", "'"), ("“", '"'), ("”", '"'))
+RX_TITLE_QMARKS = re.compile(r"[?]+$")
+RX_TITLE_DASH = re.compile(r"\s*-\s*$")
+
+TITLE_JUNK = [
+    r"\bP\.?\s*J\.?\b",
+    r"\bPost[-\s]?Journal\b",
+    r"\bJamestown\s+Post[-\s]?Journal\b",
+    r"\bLocal\s+Commentaries?\b",
+    r"\bOpinion\s*&\s*Commentar(y|ies)\b",
+    r"\bOpinion\s+and\s+Commentar(y|ies)\b",
+]
+# Per junk pattern: as a trailing "- junk" segment, then as a trailing "(junk)"
+RX_TITLE_JUNK = [
+    rx
+    for pat in TITLE_JUNK
+    for rx in (re.compile(rf"(\s*[-—:|]\s*{pat}\s*)$", re.IGNORECASE),
+               re.compile(rf"(\s*\(\s*{pat}\s*\)\s*)$", re.IGNORECASE))
+]
+# Titles mentioning none of the junk can skip the suffix patterns altogether
+RX_TITLE_ANY_JUNK = re.compile("|".join(TITLE_JUNK), re.IGNORECASE)
+RX_TITLE_PJ = [
+    re.compile(r"\s*[-—:|]\s*(PJ)\s*$", re.IGNORECASE),
+    re.compile(r"\(\s*PJ\s*\)\s*$", re.IGNORECASE),
+]
+
+
+@lru_cache(maxsize=1024)
+def _fold_run(run: str) -> str:
+    """
+    Replacement for one whitespace run: a group of 2+ newlines (after CR/CRLF -> LF) is a
+    paragraph break and becomes "\\n " as the old line-joining pass left it; single
+    newlines and tabs are spaces; spaces collapse. Runs repeat a lot, hence the cache.
+    """
+    run = run.replace("Â", "").replace("\r\n", "\n").replace("\r", "\n")
+    run = RX_PARAGRAPH.sub("\0 ", run).translate(RUN_TO_SPACE)
+    return RX_SPACES.sub(" ", run).replace("\0", "\n")
+
+
+def _text_sub(m: re.Match) -> str:
+    s = m.group()
+    return MOJIBAKE.get(s) or _fold_run(s)
+
+
+def normalize_text(s: str) -> str:
+    """
+    Normalize extracted article text: repair mojibake, normalize newlines, collapse
+    spaces/tabs, join hard-wrapped lines into their paragraph (paragraph breaks stay).
+    """
+    return RX_TEXT.sub(_text_sub, s).strip()
+
+
+def fix_mojibake(s: str) -> str:
+    if "â€" not in s and "Â" not in s:
+        return s
+    return RX_MOJIBAKE.sub(lambda m: MOJIBAKE.get(m.group(), ""), s)
+
+
+def collapse_ws(s: str) -> str:
+    # Same as re.sub(r"\s+", " ", s).strip(): str.split() and \s agree on what is whitespace
+    return " ".join(s.split())
+
+
+def fold_title(s: str) -> str:
+    s = unicodedata.normalize("NFKC", fix_mojibake(str(s).strip()))
+    for a, b in TITLE_FOLD:
+        s = s.replace(a, b)
+    s = collapse_ws(s)
+    # Both end patterns can only match a (stripped) title ending in "?" or "-"
+    if s.endswith("?"):
+        s = RX_TITLE_QMARKS.sub("-", s)
+    if s.endswith("-"):
+        s = RX_TITLE_DASH.sub("-", s)
+    return s.lower()
+
+
+def clean_title(title: str) -> str:
+    t = (title or "").strip()
+
+    # Strip trailing segments that are just junk tokens, e.g. "Title — PJ" or "Title - Post Journal"
+    t2 = t
+    if RX_TITLE_ANY_JUNK.search(t2):
+        for rx in RX_TITLE_JUNK:
+            t2 = rx.sub("", t2).strip()
+        for rx in RX_TITLE_PJ:
+            t2 = rx.sub("", t2).strip()
+    t2 = collapse_ws(t2)
+
+    # Fallback if title becomes empty
+    return t2 if t2 else (t or "Untitled")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+token_budget.py — token-aware article sampling for the metadata prompt
+======================================================================
+Replaces the fixed text[:12000] slice:
+
+- Counts tokens with tiktoken when it's installed (the model's own encoding),
+  otherwise with a conservative local estimate
+- Drops boilerplate: the header lines ("Local Commentaries", the date line,
+  the "Rolland Kidder" byline), the sign-off ("Rolland Kidder is a Stow
+  resident.", "Stow, NY", "Published in the Post-Journal") and Word's
+  "Top of Form" / "Bottom of Form" artifacts. The title line stays: it is what
+  the model returns as "title". Header dates are parsed locally from the full
+  text anyway; dates in the sign-off are kept for the model
+- Articles over the budget are sent as head + tail (paragraph-aligned,
+  "[...]" between), since the opening and the conclusion carry the topic
+
+  pip install tiktoken   # optional, exact counts
+"""
+
+import math
+import re
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# What openai_infer() used to send, kept for the "tokens saved" report
+LEGACY_CHAR_LIMIT = 12000
+
+HEADER_SCAN_LINES = 6
+FOOTER_SCAN_LINES = 6
+GAP_MARKER = "[...]"
+
+RX_SECTION = re.compile(r"local\s+commentar(?:y|ies)", re.IGNORECASE)
+RX_BYLINE = re.compile(r"(?:by\s+)?rolland\s+kidder", re.IGNORECASE)
+RX_DATE_LINE = re.compile(
+    r"(?:(?:mon|tues|wednes|thurs|fri|satur|sun)day,?\s+)?"
+    r"(?:jan|january|feb|february|mar|march|apr|april|may|jun|june|jul|july|aug|august|"
+    r"sep|sept|september|oct|october|nov|november|dec|december)\.?\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}",
+    re.IGNORECASE,
+)
+RX_SIGNOFF = re.compile(
+    r"(?:by\s+)?rolland\s+kidder\b.{0,60}|stow,?\s+n\.?\s?y\.?|published\s+(?:in|by)\s+the\s+.{1,60}",
+    re.IGNORECASE,
+)
+RX_FORM = re.compile(r"(?:top|bottom)\s+of\s+form", re.IGNORECASE)
+RX_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def is_boilerplate(line: str, i: int, n: int) -> bool:
+    s = line.strip()
+    if RX_FORM.fullmatch(s):
+        return True
+    if i < HEADER_SCAN_LINES and (RX_SECTION.fullmatch(s) or RX_BYLINE.fullmatch(s) or RX_DATE_LINE.fullmatch(s)):
+        return True
+    return i >= n - FOOTER_SCAN_LINES and bool(RX_SIGNOFF.fullmatch(s))
+
+
+def strip_boilerplate(text: str) -> str:
+    """
+    Remove header/sign-off boilerplate lines (the first line, the title, always stays).
+    """
+    lines = text.split("\n")
+    n = len(lines)
+    return "\n".join(line for i, line in enumerate(lines) if i == 0 or not is_boilerplate(line, i, n))
+
+
+class TokenCounter:
+    def __init__(self, model: str):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("o200k_base")
+        self.name = self.encoding.name if self.encoding is not None else "estimate"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        # No tokenizer: words + punctuation, or ~4 chars/token, whichever is larger
+        return max(len(RX_PIECES.findall(text)), math.ceil(len(text) / 4))
+
+
+class InputBudget:
+    def __init__(self, model: str, max_tokens: int = 3000, head_share: float = 0.7):
+        self.counter = TokenCounter(model)
+        self.max_tokens = max_tokens
+        self.head_share = head_share
+
+    def _cut(self, para: str, tokens: int, from_end: bool) -> str:
+        """
+        Longest word-aligned prefix (or suffix) of para that fits in `tokens`.
+        """
+        words = para.split(" ")
+        lo, hi = 0, len(words)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            part = " ".join(words[-mid:] if from_end else words[:mid])
+            if self.counter.count(part) <= tokens:
+                lo = mid
+            else:
+                hi = mid - 1
+        if lo == 0:
+            return ""
+        return " ".join(words[-lo:] if from_end else words[:lo])
+
+    def _take(self, paras: list, tokens: int, from_end: bool) -> list:
+        taken = []
+        left = tokens
+        for para in (reversed(paras) if from_end else paras):
+            # +1 for the newline joining it to its neighbour
+            n = self.counter.count(para) + 1
+            if n <= left:
+                taken.append(para)
+                left -= n
+                continue
+            part = self._cut(para, left - 1, from_end)
+            if part:
+                taken.append(part)
+            break
+        return taken[::-1] if from_end else taken
+
+    def sample(self, text: str):
+        """
+        Returns (text to send, {"baseline": tokens of text[:12000], "sent": tokens sent}).
+        max_tokens <= 0 sends the whole (boilerplate-stripped) text.
+        """
+        body = strip_boilerplate(text)
+        sent = self.counter.count(body)
+        if 0 < self.max_tokens < sent:
+            paras = body.split("\n")
+            budget = self.max_tokens - self.counter.count(GAP_MARKER) - 2
+            head = self._take(paras, int(budget * self.head_share), from_end=False)
+            tail_paras = paras[len(head):]
+            tail = self._take(tail_paras, budget - self.counter.count("\n".join(head)), from_end=True)
+            body = "\n".join(head + [GAP_MARKER] + tail)
+            sent = self.counter.count(body)
+        return body, {"baseline": self.counter.count(text[:LEGACY_CHAR_LIMIT]), "sent": sent}